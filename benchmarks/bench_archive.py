@@ -0,0 +1,64 @@
+"""Checks and benchmarks the raw acquisition archive with the simulated driver.
+
+Every compression archives the same acquisition, the RX window read from the archive is compared to the window read
+from the acquisition file of the driver. Prints the size of the archive files and the time to write them.
+Run with ``python benchmarks/bench_archive.py``.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+
+from nqrduck_spectrometer_limenqr.archive import COMPRESSIONS, AcquisitionArchive, read_archive_metadata
+from nqrduck_spectrometer_limenqr.readback import AcquisitionReader
+from nqrduck_spectrometer_limenqr.simulator import SimulatedLimeConfig, SpinSystem
+from nqrduck_spectrometer_limenqr.worker import snapshot_lime_config
+
+ACQUISITION_TIME = 20e-3
+REPETITIONS = 8
+# RX window in µs
+RX_BEGIN = 100.0
+RX_STOP = 15000.0
+
+
+def main() -> None:
+    """Runs the check and the benchmark."""
+    SimulatedLimeConfig.spin_system = SpinSystem(seed=0)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        lime = SimulatedLimeConfig(0)
+        lime.rectime_secs = ACQUISITION_TIME
+        lime.repetitions = REPETITIONS
+        lime.save_path = str(directory) + "/"
+        lime.file_pattern = "acquisition"
+        lime.run()
+        source = lime.get_path()
+        metadata = snapshot_lime_config(lime)
+        with AcquisitionReader(source) as reader:
+            reference = reader.read(reader.find_window(RX_BEGIN, RX_STOP), scale=lime.averages)
+        source_size = Path(source).stat().st_size
+
+        print(f"{REPETITIONS} traces of {ACQUISITION_TIME * 1e3:g} ms, {source_size / 2**20:.1f} MiB acquisition file")
+        print(f"{'compression':>12} {'size [MiB]':>11} {'ratio':>6} {'time [ms]':>10}")
+        for compression in COMPRESSIONS:
+            archive = AcquisitionArchive(directory / compression, compression)
+            start = time.perf_counter()
+            path, future = archive.submit(source, metadata)
+            future.result()
+            elapsed = time.perf_counter() - start
+            archive.shutdown()
+
+            stored = read_archive_metadata(path)
+            assert stored["averages"] == lime.averages
+            assert stored["rectime_secs"] == lime.rectime_secs
+            with AcquisitionReader(path) as reader:
+                result = reader.read(reader.find_window(RX_BEGIN, RX_STOP), scale=stored["averages"])
+            np.testing.assert_array_equal(result, reference)
+
+            size = path.stat().st_size
+            print(f"{compression:>12} {size / 2**20:>11.2f} {source_size / size:>6.2f} {elapsed * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compares fft_resample with scipy.signal.resample for record lengths with large prime factors.
+
+Run with ``python benchmarks/bench_fft_resample.py``.
+"""
+
+import timeit
+import numpy as np
+from scipy.signal import resample
+
+from nqrduck_spectrometer_limenqr.resampling import fft_resample
+
+# Stated tolerance of fft_resample relative to the largest output sample
+TOLERANCE = 1e-12
+
+# Input and output lengths, including primes, fast lengths and up- and downsampling
+CASES = (
+    (61_440, 1_919),
+    (61_447, 7_680),
+    (100_003, 1_914),
+    (99_991, 2_000),
+    (2_048, 99_991),
+    (1_000_003, 30_000),
+    (4_097, 4_096),
+    (614, 92),
+)
+
+
+def main() -> None:
+    """Runs the check and the benchmark."""
+    rng = np.random.default_rng(0)
+    print(f"{'samples':>9} {'points':>7} {'scipy [ms]':>11} {'fast [ms]':>10} {'speedup':>8} {'rel. error':>11}")
+    for n_in, n_out in CASES:
+        for x in (rng.standard_normal(n_in), rng.standard_normal(n_in) + 1j * rng.standard_normal(n_in)):
+            reference = resample(x, n_out)
+            result = fft_resample(x, n_out)
+            assert result.dtype == reference.dtype
+            error = np.max(np.abs(result - reference)) / np.max(np.abs(reference))
+            assert error < TOLERANCE, f"{n_in} to {n_out} samples: {error}"
+
+        repeat, number = 3, 3
+        legacy = min(timeit.repeat(lambda: resample(x, n_out), number=number, repeat=repeat)) / number
+        fast = min(timeit.repeat(lambda: fft_resample(x, n_out), number=number, repeat=repeat)) / number
+        print(
+            f"{n_in:>9} {n_out:>7} {legacy * 1e3:>11.2f} {fast * 1e3:>10.2f} {legacy / fast:>8.2f} {error:>11.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Compares the footprint of the headless API with the GUI plugin and runs headless measurements with the simulator.
+
+The import time and the memory of importing nqrduck_spectrometer_limenqr.headless and of the plugin entry point are
+measured in fresh interpreters, each starting from nothing. Like nqrduck, the interpreter of the plugin creates a
+QApplication first, the nqrduck spectrometer package creates widgets when it is imported. The headless API is checked to
+import neither PyQt6 nor the GUI modules of nqrduck. Then a measurement and a streamed measurement with a target SNR are run with the simulated driver.
+Run with ``python benchmarks/bench_headless.py``.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from bench_import import parse_importtime, top_level_time
+
+HEADLESS = "nqrduck_spectrometer_limenqr.headless"
+GUI = "nqrduck_spectrometer_limenqr.limenqr"
+
+# Packages that import Qt or build the GUI of nqrduck
+GUI_PACKAGES = ("PyQt6", "matplotlib", "nqrduck_spectrometer", "nqrduck_pulseprogrammer")
+
+PROBE = """
+import importlib, json, os, resource, sys
+if {application!r}:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt6.QtWidgets import QApplication
+        application = QApplication([])
+    except ImportError:
+        pass
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print("--- import ---", file=sys.stderr)
+importlib.import_module({module!r})
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+qt = sorted(name for name in sys.modules if name.split(".")[0] in {packages!r})
+print(json.dumps({{"rss_kb": after - before, "qt": qt}}))
+"""
+
+
+def footprint(module: str, application: bool) -> dict:
+    """Imports a module in a fresh interpreter and returns the import time in µs, the memory in kB and the Qt modules.
+
+    The memory and the import time of the QApplication are not included.
+    """
+    code = PROBE.format(module=module, application=application, packages=GUI_PACKAGES)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    _, imports = parse_importtime(result.stderr.replace("--- import ---", "--- plugin ---"))
+    measured = json.loads(result.stdout.strip().splitlines()[-1])
+    measured["import_us"] = top_level_time(imports)
+    return measured
+
+
+def compare_footprints(repeat: int) -> dict:
+    """Returns the median import time and memory of the headless API and the GUI plugin."""
+    results = {}
+    for label, module, application in (("headless", HEADLESS, False), ("gui", GUI, True)):
+        runs = [footprint(module, application) for _ in range(repeat)]
+        results[label] = {
+            "module": module,
+            "import_ms": statistics.median(run["import_us"] for run in runs) / 1e3,
+            "rss_mb": statistics.median(run["rss_kb"] for run in runs) / 1024,
+            "qt_modules": runs[-1]["qt"],
+        }
+    return results
+
+
+def run_measurements() -> dict:
+    """Runs a measurement and a streamed measurement with the simulated driver."""
+    from nqrduck_spectrometer_limenqr.headless import (
+        HeadlessLimeNQR,
+        PulseSequence,
+        blank_event,
+        rx_event,
+        tx_event,
+    )
+    from nqrduck_spectrometer_limenqr.settings import LimeNQRSettings
+    from nqrduck_spectrometer_limenqr.simulator import SimulatedLimeConfig, SpinSystem
+
+    SimulatedLimeConfig.spin_system = SpinSystem(seed=0)
+    SimulatedLimeConfig.realtime = True
+    sequence = PulseSequence(
+        "FID",
+        [
+            tx_event("pi/2", "3e-6"),
+            blank_event("dead time", "20e-6"),
+            rx_event("rx", "100e-6"),
+            blank_event("repetition", "1e-3"),
+        ],
+    )
+    settings = {
+        LimeNQRSettings.DRIVER_BACKEND: LimeNQRSettings.SIMULATOR,
+        LimeNQRSettings.ACQUISITION_TIME: 200e-6,
+        LimeNQRSettings.RX_DWELL_TIME: "1u",
+    }
+
+    with HeadlessLimeNQR(settings) as spectrometer:
+        started = time.perf_counter()
+        measurement = spectrometer.measure(sequence, target_frequency=83.56e6, averages=100)
+        measure_s = time.perf_counter() - started
+        print(f"measure: {len(measurement.tdx)} points in {measure_s:.3f} s, {measurement.name}")
+
+        started = time.perf_counter()
+        updates = list(
+            spectrometer.stream(
+                averages=5000, update_interval=0.1, settings={LimeNQRSettings.TARGET_SNR: 300.0}
+            )
+        )
+        stream_s = time.perf_counter() - started
+        snrs = [update.snr for update in updates[:-1] if update.snr is not None]
+        print(f"stream:  {len(updates) - 1} updates in {stream_s:.3f} s, final SNR {snrs[-1]:.0f}, {updates[-1].name}")
+        assert snrs[-1] >= 300.0
+
+    return {
+        "measure_s": measure_s,
+        "measure_points": len(measurement.tdx),
+        "stream_s": stream_s,
+        "stream_updates": len(updates) - 1,
+        "stream_snr": float(snrs[-1]),
+    }
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="The number of interpreters, the median is reported")
+    parser.add_argument("--output", help="The JSON file the results are written to")
+    args = parser.parse_args()
+
+    footprints = compare_footprints(args.repeat)
+    for label, result in footprints.items():
+        print(f"{label:>8}: import {result['import_ms']:7.1f} ms, {result['rss_mb']:6.1f} MB, "
+              f"Qt modules: {len(result['qt_modules'])}")
+    assert not footprints["headless"]["qt_modules"], footprints["headless"]["qt_modules"]
+
+    results = {"python": sys.version, "footprint": footprints, "measurements": run_measurements()}
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
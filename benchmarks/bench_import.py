@@ -0,0 +1,125 @@
+"""Measures the share of the plugin in the import time of nqrduck.
+
+nqrduck imports the entry point of every spectrometer plugin when it starts. The benchmark runs a fresh interpreter
+with ``python -X importtime`` that, like nqrduck, first creates a QApplication and imports the modules nqrduck loads
+before the plugins and then imports the entry point of this plugin. Everything that is imported for the first time by the entry point is charged to the plugin.
+The modules that should only be imported with the first measurement are checked not to be imported by the plugin.
+
+The results are written as JSON, so runs of different releases can be compared.
+Run with ``python benchmarks/bench_import.py --output import.json``.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINT = "nqrduck_spectrometer_limenqr.limenqr"
+# Modules that nqrduck loads itself, the pulse programmer is a module of nqrduck that the plugin sets up when it is loaded
+BASELINE = ["numpy", "PyQt6.QtWidgets", "nqrduck_spectrometer", "nqrduck_pulseprogrammer.pulseprogrammer"]
+# Modules that are only needed for measurements
+DEFERRED = ["scipy", "h5py", "limedriver"]
+
+PROBE = """
+import importlib, json, os, sys
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+try:
+    from PyQt6.QtWidgets import QApplication
+    application = QApplication([])
+except ImportError:
+    pass
+for name in {baseline!r}:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+baseline = set(sys.modules)
+print("--- plugin ---", file=sys.stderr)
+importlib.import_module({entry_point!r})
+print(json.dumps(sorted(name for name in {deferred!r} if name in sys.modules and name not in baseline)))
+"""
+
+
+def parse_importtime(stderr: str) -> tuple:
+    """Returns the baseline and the plugin imports as lists of module, self time and cumulative time in µs."""
+    baseline, plugin = [], []
+    current = baseline
+    for line in stderr.splitlines():
+        if line.startswith("--- plugin ---"):
+            current = plugin
+            continue
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        current.append((name.rstrip(), int(self_time), int(cumulative)))
+    return baseline, plugin
+
+
+def top_level_time(imports: list) -> int:
+    """Returns the time of the imports that were not nested in other imports in µs."""
+    return sum(cumulative for name, _, cumulative in imports if not name.startswith("  "))
+
+
+def measure(entry_point: str, baseline: list) -> dict:
+    """Imports the entry point in a fresh interpreter and returns the times and the deferred modules."""
+    code = PROBE.format(baseline=baseline, entry_point=entry_point, deferred=DEFERRED)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(f"Importing {entry_point} failed:\n{result.stderr[-2000:]}")
+    baseline_imports, plugin_imports = parse_importtime(result.stderr)
+    return {
+        "baseline_us": top_level_time(baseline_imports),
+        "plugin_us": top_level_time(plugin_imports),
+        "plugin_modules": [
+            {"module": name.strip(), "self_us": self_time, "cumulative_us": cumulative}
+            for name, self_time, cumulative in plugin_imports
+        ],
+        "deferred_imported": json.loads(result.stdout.strip().splitlines()[-1]),
+    }
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entry-point", default=ENTRY_POINT, help="The module of the plugin entry point")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of interpreters, the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="The number of slowest plugin modules that are listed")
+    parser.add_argument("--output", help="The JSON file the results are written to")
+    args = parser.parse_args()
+
+    runs = [measure(args.entry_point, BASELINE) for _ in range(args.repeat)]
+    baseline_us = statistics.median(run["baseline_us"] for run in runs)
+    plugin_us = statistics.median(run["plugin_us"] for run in runs)
+    deferred_imported = sorted(set().union(*(run["deferred_imported"] for run in runs)))
+    slowest = sorted(runs[-1]["plugin_modules"], key=lambda module: module["self_us"], reverse=True)[: args.top]
+
+    print(f"baseline: {baseline_us / 1e3:8.1f} ms", file=sys.stderr)
+    print(f"plugin:   {plugin_us / 1e3:8.1f} ms, {plugin_us / (baseline_us + plugin_us):.1%} of the import time",
+          file=sys.stderr)
+    for module in slowest:
+        print(f"  {module['self_us'] / 1e3:8.2f} ms  {module['module']}", file=sys.stderr)
+    if deferred_imported:
+        print(f"imported at startup: {', '.join(deferred_imported)}", file=sys.stderr)
+
+    results = {
+        "entry_point": args.entry_point,
+        "baseline": BASELINE,
+        "python": sys.version,
+        "baseline_ms": baseline_us / 1e3,
+        "plugin_ms": plugin_us / 1e3,
+        "plugin_share": plugin_us / (baseline_us + plugin_us),
+        "slowest_modules": slowest,
+        "deferred_imported": deferred_imported,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""End-to-end benchmark of the measurement pipeline with the simulated driver.
+
+Every stage of a measurement is timed separately, in the order the controller runs them:
+
+- compile: the pulse sequence is compiled to the pulse arrays
+- settings_push: a driver configuration is created, the settings and pulse arrays are applied and the changes are
+  prepared for the driver process like the measurement worker does
+- acquisition: SimulatedLimeConfig synthesizes the signal and writes the HDF file
+- window: the acquisition file is opened and the RX window and its time axis are computed
+- read: the samples of the RX window are read and scaled by the averages
+- resample: the data is resampled to the dwell time
+- measurement: the Measurement is constructed, which includes its FFT
+
+One parameter is swept at a time while the others stay at BASELINE. The results are written as JSON, so runs of
+different releases can be compared. Run with ``python benchmarks/bench_pipeline.py --output pipeline.json``.
+"""
+
+import argparse
+import json
+import pickle
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import h5py
+import numpy as np
+import scipy
+
+from nqrduck_spectrometer.measurement import Measurement
+from nqrduck_spectrometer_limenqr.readback import AcquisitionReader
+from nqrduck_spectrometer_limenqr.resampling import AUTO, ENGINES, resample_fid
+from nqrduck_spectrometer_limenqr.sequence import PulseSequenceCompiler
+from nqrduck_spectrometer_limenqr.session import LimeSession
+from nqrduck_spectrometer_limenqr.simulator import SimulatedLimeConfig, SpinSystem
+from nqrduck_spectrometer_limenqr.worker import snapshot_lime_config
+from fakes import cpmg_sequence
+
+SRATE = 30.72e6
+IF_FREQUENCY = 5e6
+TARGET_FREQUENCY = 83.56e6
+OFFSET_FIRST_PULSE = 300
+RX_OFFSET = 2.4e-6
+# Acquisition time after the end of the RX event in s
+ACQUISITION_MARGIN = 10e-6
+
+# The device settings as update_settings applies them with the defaults of the model
+SETTINGS = {
+    "srate": SRATE,
+    "channel": 0,
+    "TX_matching": 0,
+    "RX_matching": 0,
+    "frq": TARGET_FREQUENCY - IF_FREQUENCY,
+    "RX_LPF": 30e6,
+    "TX_LPF": 130e6,
+    "RX_gain": 55,
+    "TX_gain": 40,
+    "TX_IcorrDC": -45,
+    "TX_QcorrDC": 0,
+    "TX_IcorrGain": 2047,
+    "TX_QcorrGain": 2039,
+    "TX_IQcorrPhase": 3,
+    "RX_IcorrGain": 2047,
+    "RX_QcorrGain": 2047,
+    "RX_IQcorrPhase": 0,
+    "c3_tim": [1, 0, 0, 0],
+}
+
+STAGES = ("compile", "settings_push", "acquisition", "window", "read", "resample", "measurement")
+
+# The parameters of the pipeline when they are not swept
+BASELINE = {
+    "echoes": 8,
+    "resolution": 1 / SRATE,
+    "acquisition_time": 200e-6,
+    "averages": 100,
+}
+
+# The values of every swept parameter, the acquisition time is the duration of the RX event in s
+SWEEPS = {
+    "echoes": (0, 8, 64, 256),
+    "resolution": (1 / SRATE, 100e-9, 1e-6),
+    "acquisition_time": (50e-6, 200e-6, 1e-3, 5e-3),
+    "averages": (1, 100, 10_000),
+}
+
+
+class Stopwatch:
+    """Collects the wall times of the stages of repeated pipeline runs.
+
+    Attributes:
+        times (dict): The measured times in s for every stage
+    """
+
+    def __init__(self) -> None:
+        """Initializes the Stopwatch."""
+        self.times = {stage: [] for stage in STAGES}
+        self._stage = None
+        self._start = None
+
+    def start(self, stage: str) -> None:
+        """Starts the timing of a stage."""
+        self._stage = stage
+        self._start = time.perf_counter()
+
+    def stop(self) -> None:
+        """Stops the timing of the current stage."""
+        self.times[self._stage].append(time.perf_counter() - self._start)
+
+    def summary(self) -> dict:
+        """Returns the minimum, median and mean time in s of every stage."""
+        return {
+            stage: {
+                "min": min(times),
+                "median": statistics.median(times),
+                "mean": statistics.fmean(times),
+            }
+            for stage, times in self.times.items()
+        }
+
+
+def run_pipeline(
+    parameters: dict, compiler: PulseSequenceCompiler, session: LimeSession, directory: Path, index: int,
+    stopwatch: Stopwatch, engine: str, dwell_time: float,
+) -> dict:
+    """Runs the pipeline once and records the time of every stage.
+
+    Args:
+        parameters (dict): The echoes, pulse shape resolution, acquisition time and averages of the run
+        compiler (PulseSequenceCompiler): The compiler of the pulse sequence
+        session (LimeSession): The session that tracks the configuration sent to the driver
+        directory (Path): The directory of the acquisition files
+        index (int): The number of the run, every run writes its own file
+        stopwatch (Stopwatch): The stopwatch that collects the times
+        engine (str): The resampling engine
+        dwell_time (float): The dwell time in s
+
+    Returns:
+        dict: The sizes of the data handled by the stages
+    """
+    events = cpmg_sequence(
+        parameters["echoes"],
+        resolution=parameters["resolution"],
+        rx_duration=repr(parameters["acquisition_time"]),
+    )
+
+    stopwatch.start("compile")
+    compiled = compiler.compile(events, IF_FREQUENCY, SRATE)
+    stopwatch.stop()
+
+    previous_events_duration, rx_duration = compiled.rx_window
+    rx_begin = previous_events_duration + OFFSET_FIRST_PULSE / SRATE + RX_OFFSET
+    rx_stop = rx_begin + rx_duration
+
+    stopwatch.start("settings_push")
+    lime = SimulatedLimeConfig(compiled.n_pulses)
+    for name, value in SETTINGS.items():
+        setattr(lime, name, value)
+    compiled.apply(lime)
+    lime.averages = parameters["averages"]
+    lime.repetitions = 1
+    lime.rectime_secs = rx_stop + ACQUISITION_MARGIN
+    lime.save_path = str(directory) + "/"
+    lime.file_pattern = f"run_{index}"
+    session.prepare(lime)
+    changes = session.changes(snapshot_lime_config(lime), lime.Npulses)
+    pickle.dumps((lime.Npulses, changes))
+    stopwatch.stop()
+
+    stopwatch.start("acquisition")
+    lime.run()
+    stopwatch.stop()
+    session.commit(lime)
+
+    stopwatch.start("window")
+    reader = AcquisitionReader(lime.get_path())
+    window = reader.find_window(rx_begin * 1e6, rx_stop * 1e6)
+    tdx = reader.time_axis.values(window.start, window.stop)
+    tdx = tdx - tdx[0]
+    stopwatch.stop()
+
+    stopwatch.start("read")
+    tdy = reader.read(window, scale=lime.averages)
+    reader.close()
+    stopwatch.stop()
+
+    stopwatch.start("resample")
+    n_data_points = int(tdx[-1] / (dwell_time * 1e6))
+    tdx = np.linspace(0, tdx[-1], n_data_points, endpoint=False)
+    tdy = resample_fid(tdy, n_data_points, engine, ratio=dwell_time * SRATE)
+    stopwatch.stop()
+
+    stopwatch.start("measurement")
+    Measurement("benchmark", tdx, tdy, TARGET_FREQUENCY, frequency_shift=False, IF_frequency=IF_FREQUENCY)
+    stopwatch.stop()
+
+    Path(lime.get_path()).unlink()
+    return {
+        "pulse_samples": compiled.n_pulses,
+        "acquired_samples": reader.n_samples,
+        "window_samples": window.stop - window.start,
+        "data_points": n_data_points,
+    }
+
+
+def git_revision() -> str:
+    """Returns the commit of the working tree or None outside of a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    """Returns the versions and the machine the benchmark was run on."""
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "h5py": h5py.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def main() -> None:
+    """Runs the sweeps and writes the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="JSON file for the results, printed to stdout if omitted")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per sweep point")
+    parser.add_argument("--sweep", choices=SWEEPS, action="append", help="sweep only this parameter, repeatable")
+    parser.add_argument("--engine", choices=ENGINES, default=AUTO, help="resampling engine")
+    parser.add_argument("--dwell-time", type=float, default=1e-6, help="dwell time in s")
+    args = parser.parse_args()
+
+    # A fixed seed makes the simulated data, and with it the work of the stages, identical between runs
+    SimulatedLimeConfig.spin_system = SpinSystem(seed=0)
+    compiler = PulseSequenceCompiler("TX", "RX", OFFSET_FIRST_PULSE)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for parameter in args.sweep or SWEEPS:
+            for value in SWEEPS[parameter]:
+                parameters = dict(BASELINE, **{parameter: value})
+                session = LimeSession()
+                stopwatch = Stopwatch()
+                # The first run warms up the caches and the imports and is not recorded
+                run_pipeline(parameters, compiler, session, Path(directory), 0, Stopwatch(), args.engine, args.dwell_time)
+                for index in range(1, args.repeat + 1):
+                    sizes = run_pipeline(
+                        parameters, compiler, session, Path(directory), index, stopwatch, args.engine, args.dwell_time
+                    )
+                stages = stopwatch.summary()
+                results.append(
+                    {"sweep": parameter, "parameters": parameters, "sizes": sizes, "stages": stages}
+                )
+                timings = " ".join(f"{stage}={stages[stage]['median'] * 1e3:.2f}" for stage in STAGES)
+                print(f"{parameter}={value:g}: {timings} ms", file=sys.stderr)
+
+    report = {
+        "environment": environment(),
+        "settings": {"repeat": args.repeat, "engine": args.engine, "dwell_time": args.dwell_time, "srate": SRATE},
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Compares processing on the acquisition thread with the process pool for a series of measurements.
+
+A minimal controller drives the MeasurementWorker with the simulated driver in real time, like a sweep of the
+LimeNQRController. The measurements of both post-processing modes are checked to be identical and to be emitted in
+the order they were acquired. Run with ``python benchmarks/bench_postprocessing.py``.
+"""
+
+import time
+from concurrent.futures import Future
+import numpy as np
+
+from nqrduck_spectrometer_limenqr.postprocessing import (
+    INLINE,
+    PROCESSING_MODES,
+    POOL,
+    ProcessingJob,
+    ProcessingPool,
+    process_acquisition,
+)
+from nqrduck_spectrometer_limenqr.profiling import DISABLED
+from nqrduck_spectrometer_limenqr.resampling import FFT
+from nqrduck_spectrometer_limenqr.simulator import SimulatedLimeConfig, SpinSystem
+from nqrduck_spectrometer_limenqr.storage import AcquisitionStorage
+from nqrduck_spectrometer_limenqr.worker import MeasurementWorker
+
+N_MEASUREMENTS = 12
+AVERAGES = 25
+REPETITION_TIME = 4e-3
+ACQUISITION_TIME = 20e-3
+DWELL_TIME = 1.1  # µs
+SRATE = 30.72e6
+
+
+class SweepController:
+    """The part of LimeNQRController that the MeasurementWorker uses, every measurement shifts the pulse frequency.
+
+    Args:
+        mode (str): One of PROCESSING_MODES
+    """
+
+    def __init__(self, mode: str) -> None:
+        """Initializes the SweepController."""
+        self.mode = mode
+        self.storage = AcquisitionStorage()
+        self.pool = ProcessingPool()
+        self.emitted = []
+        self._index = 0
+
+    def create_measurement_profile(self):
+        """Profiling is off."""
+        return DISABLED
+
+    def prepare_measurement(self, profile=DISABLED) -> tuple:
+        """Configures one pulse at the frequency of the point."""
+        lime = SimulatedLimeConfig(1)
+        lime.srate = SRATE
+        lime.p_offs = [300]
+        lime.p_dur = [3e-6]
+        lime.p_amp = [1.0]
+        lime.p_frq = [1.2e6 + 10e3 * self._index]
+        lime.averages = AVERAGES
+        lime.repetitions = 1
+        lime.reptime_secs = REPETITION_TIME
+        lime.rectime_secs = ACQUISITION_TIME
+        lime.save_path, lime.file_pattern = self.storage.allocate()
+        self._index += 1
+        return lime, {"name": lime.file_pattern}
+
+    def perform_measurement(self, lime: SimulatedLimeConfig, context: dict, cancelled=None) -> bool:
+        """Runs the simulation."""
+        lime.run()
+        return True
+
+    def start_processing(self, lime: SimulatedLimeConfig, context: dict, profile=DISABLED) -> Future:
+        """Processes the acquisition like LimeNQRController.start_processing."""
+        job = ProcessingJob(
+            context["name"],
+            83.56e6,
+            path=lime.get_path(),
+            rx_begin=20.0,
+            rx_stop=ACQUISITION_TIME * 1e6,
+            scale=lime.averages,
+            if_frequency=lime.p_frq[0],
+            dwell_time=DWELL_TIME,
+            engine=FFT,
+            srate=SRATE,
+        )
+        if self.mode == POOL:
+            return self.pool.submit(job)
+        processing = Future()
+        processing.set_result(process_acquisition(job))
+        return processing
+
+    def finish_measurement(self, lime, processing: Future, profile=DISABLED):
+        """Records the emitted measurement."""
+        measurement_data, _ = processing.result()
+        self.emitted.append(measurement_data)
+        return measurement_data
+
+    def release_temporary_storage(self, lime: SimulatedLimeConfig) -> None:
+        """Removes the acquisition file."""
+        self.storage.release(lime.save_path, lime.file_pattern)
+
+    def emit_measurement_progress(self, progress: float) -> None:
+        """Ignores the progress."""
+
+    def emit_measurement_cancelled(self) -> None:
+        """Ignores the cancellation."""
+
+    def emit_status_message(self, message: str) -> None:
+        """Ignores the status."""
+
+    def emit_measurement_error(self, message: str) -> None:
+        """Raises the error."""
+        raise RuntimeError(message)
+
+
+def run(mode: str) -> tuple:
+    """Runs the measurements and returns the emitted measurements and the elapsed time."""
+    controller = SweepController(mode)
+    worker = MeasurementWorker(controller, isolate_driver=False)
+    # Starts the pool processes and warms up the imports
+    worker.submit().result()
+    controller.emitted.clear()
+
+    start = time.perf_counter()
+    futures = [worker.submit_serial(lambda: None) for _ in range(N_MEASUREMENTS)]
+    results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    worker.shutdown()
+    controller.pool.shutdown()
+    controller.storage.close()
+    assert [id(result) for result in results] == [id(result) for result in controller.emitted]
+    return results, elapsed
+
+
+def main() -> None:
+    """Runs the check and the benchmark."""
+    SimulatedLimeConfig.spin_system = SpinSystem(seed=0)
+    SimulatedLimeConfig.realtime = True
+    acquisition = AVERAGES * REPETITION_TIME
+    print(f"{N_MEASUREMENTS} measurements of {acquisition * 1e3:g} ms, resampled with FFT to {DWELL_TIME} µs")
+
+    results = {}
+    for mode in PROCESSING_MODES:
+        results[mode], elapsed = run(mode)
+        print(f"{mode:>20}: {elapsed:6.2f} s, {elapsed / N_MEASUREMENTS * 1e3:6.1f} ms per measurement")
+
+    for inline, pooled in zip(results[INLINE], results[POOL]):
+        assert inline.name == pooled.name
+        np.testing.assert_array_equal(inline.tdy, pooled.tdy)
+    print("The measurements are identical and emitted in order")
+
+
+if __name__ == "__main__":
+    main()
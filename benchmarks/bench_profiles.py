@@ -0,0 +1,81 @@
+"""Compares switching between two settings profiles with setting every setting one by one.
+
+The settings are held by the headless model, so the benchmark runs without Qt. After every switch the settings are
+converted for the driver like before a measurement. Loading a profile only sets and converts the settings that
+differ, setting them one by one converts all of them. The profile keys are checked to be stable.
+Run with ``python benchmarks/bench_profiles.py``.
+"""
+
+import time
+
+from nqrduck_spectrometer_limenqr.configuration import DriverSettings
+from nqrduck_spectrometer_limenqr.headless import HeadlessModel
+from nqrduck_spectrometer_limenqr.profiles import SettingsProfile
+from nqrduck_spectrometer_limenqr.settings import LimeNQRSettings
+
+N_SWITCHES = 2000
+TARGET_FREQUENCY = 83.56e6
+
+
+def profiles() -> tuple:
+    """Two standard configurations that differ in the channel, the gains, the calibration and the gate timing."""
+    first = SettingsProfile("channel 0", {LimeNQRSettings.RX_GAIN: 40, LimeNQRSettings.TX_GAIN: 20})
+    second = SettingsProfile(
+        "channel 1",
+        {
+            LimeNQRSettings.CHANNEL: "1",
+            LimeNQRSettings.RX_GAIN: 50,
+            LimeNQRSettings.TX_GAIN: 35,
+            LimeNQRSettings.TX_I_DC_CORRECTION: -30,
+            LimeNQRSettings.TX_PHASE_ADJUSTMENT: 5,
+            LimeNQRSettings.GATE_SHIFT: 60,
+        },
+    )
+    return first, second
+
+
+def run(switch) -> tuple:
+    """Switches between the profiles and converts the settings, returns the time per switch and the conversions."""
+    model = HeadlessModel()
+    model.target_frequency = TARGET_FREQUENCY
+    driver_settings = DriverSettings()
+    driver_settings.update(model)
+    converted = 0
+    first, second = profiles()
+    start = time.perf_counter()
+    for index in range(N_SWITCHES):
+        switch(model, second if index % 2 else first)
+        converted += len(driver_settings.update(model))
+    return (time.perf_counter() - start) / N_SWITCHES, converted / N_SWITCHES
+
+
+def set_one_by_one(model: HeadlessModel, profile: SettingsProfile) -> None:
+    """Sets every setting of a profile, as by editing them individually."""
+    for name, value in profile.values.items():
+        setting = model.get_setting_by_name(name)
+        setting.value = value
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    first, second = profiles()
+    print(f"{len(first.values)} settings, {len(first.differences(second))} differ, "
+          f"{len(first.to_json())} bytes of JSON")
+
+    for label, switch in (
+        ("one by one", set_one_by_one),
+        ("profile", lambda model, profile: model.load_profile(profile)),
+    ):
+        seconds, converted = run(switch)
+        print(f"{label:>10}: {seconds * 1e6:7.1f} µs per switch, {converted:4.1f} settings converted")
+
+    model = HeadlessModel()
+    model.load_profile(second)
+    assert SettingsProfile.from_settings("channel 1", model) == second
+    assert SettingsProfile.from_json(second.to_json()).key == second.key
+    assert SettingsProfile("copy", {LimeNQRSettings.RX_GAIN: "40.0", LimeNQRSettings.TX_GAIN: 20.0}).key == first.key
+    print(f"keys: {first.key[:12]} {second.key[:12]}")
+
+
+if __name__ == "__main__":
+    main()
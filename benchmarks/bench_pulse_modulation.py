@@ -0,0 +1,72 @@
+"""Compares the cached carrier tables and the fused amplitude and phase computation with the former complex modulation.
+
+Run with ``python benchmarks/bench_pulse_modulation.py``.
+"""
+
+import timeit
+import numpy as np
+from scipy.signal import resample
+
+from nqrduck_spectrometer_limenqr.sequence import PulseSequenceCompiler
+from fakes import tx_event
+
+SRATE = 30.72e6
+IF_FREQUENCY = 5e6
+
+
+def modulate_with_complex_carrier(pulse_amplitude: np.ndarray, event, if_frequency: float, srate: float) -> tuple:
+    """The modulation that was used before the carrier tables."""
+    num_samples = int(float(event.duration) * srate)
+    tdx = np.linspace(0, float(event.duration), num_samples, endpoint=False)
+    shift_signal = np.exp(1j * 2 * np.pi * if_frequency * tdx)
+    pulse_amplitude = resample(pulse_amplitude, num_samples)
+    pulse_complex = pulse_amplitude * shift_signal
+    modulated_amplitude = np.abs(pulse_complex)
+    modulated_phase = (np.unwrap(np.angle(pulse_complex)) + 2 * np.pi) % (2 * np.pi)
+    return modulated_amplitude, modulated_phase
+
+
+def main() -> None:
+    """Runs the check and the benchmark."""
+    compiler = PulseSequenceCompiler("TX", "RX", 300)
+    print(f"{'length [µs]':>12} {'samples':>8} {'complex [µs]':>13} {'fused [µs]':>11} {'speedup':>8} {'phase error':>12}")
+    for pulse_length in ("3e-6", "20e-6", "160e-6", "1e-3"):
+        event = tx_event("pulse", pulse_length, resolution=100e-9)
+        parameter = event.parameters["TX"]
+        _, envelope = compiler.prepare_pulse_amplitude(event, parameter)
+        # A signed envelope, the sinc shape of the fakes is already made positive by prepare_pulse_amplitude
+        envelope = envelope * np.sign(np.cos(np.linspace(0, 7, len(envelope))))
+
+        reference_amplitude, reference_phase = modulate_with_complex_carrier(envelope, event, IF_FREQUENCY, SRATE)
+        amplitude, phase = compiler.modulate_pulse_amplitude(envelope, event, IF_FREQUENCY, SRATE)
+        np.testing.assert_allclose(amplitude, reference_amplitude, rtol=1e-12, atol=1e-15)
+        # Phases are compared on the circle, the phase of samples without amplitude is meaningless
+        nonzero = reference_amplitude > 0
+        phase_error = np.max(np.abs(np.angle(np.exp(1j * (phase - reference_phase)))[nonzero]))
+        # Both carriers lose precision with the accumulated carrier phase
+        assert phase_error < 1e-12 * 2 * np.pi * IF_FREQUENCY * float(pulse_length), phase_error
+        assert np.all((phase >= 0) & (phase < 2 * np.pi))
+
+        repeat, number = 5, 20
+        legacy = min(
+            timeit.repeat(
+                lambda: modulate_with_complex_carrier(envelope, event, IF_FREQUENCY, SRATE),
+                number=number,
+                repeat=repeat,
+            )
+        )
+        fused = min(
+            timeit.repeat(
+                lambda: compiler.modulate_pulse_amplitude(envelope, event, IF_FREQUENCY, SRATE),
+                number=number,
+                repeat=repeat,
+            )
+        )
+        print(
+            f"{float(pulse_length) * 1e6:>12.0f} {len(amplitude):>8} {legacy / number * 1e6:>13.1f} "
+            f"{fused / number * 1e6:>11.1f} {legacy / fused:>8.2f} {phase_error:>12.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compares the peak memory and the time of the readback of a large acquisition.
+
+The former readback loaded the whole file, selected the RX window by fancy indexing and divided by the averages
+into new arrays. The AcquisitionReader reads the window into a single buffer, from memory maps of the rows or in
+chunks. The peak is the memory traced by tracemalloc, pages of memory mapped files are not counted because they
+belong to the page cache. Run with ``python benchmarks/bench_readback_memory.py``.
+"""
+
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import h5py
+import numpy as np
+
+from nqrduck_spectrometer_limenqr.readback import AcquisitionReader
+
+SRATE = 30.72e6
+N_SAMPLES = 4080 * 3 * 25
+N_TRACES = 16
+AVERAGES = 1000
+# RX window in µs
+RX_BEGIN = 10.0
+RX_STOP = 9000.0
+
+
+def write_acquisition(path: Path) -> None:
+    """Writes random data in the layout of the LimeDriver."""
+    rng = np.random.default_rng(0)
+    with h5py.File(path, "w") as file:
+        data = rng.integers(-(2**24), 2**24, (N_TRACES, 2 * N_SAMPLES), dtype=np.int32)
+        dataset = file.create_dataset("Acqbuf_00", data=data, chunks=(1, 2 * N_SAMPLES))
+        dataset.attrs["-sra SampleRate [Hz]"] = np.float32(SRATE)
+
+
+def read_whole_file(path: Path) -> np.ndarray:
+    """The readback that was used before the AcquisitionReader, like limedriver.hdf_reader.HDF."""
+    with h5py.File(path, "r") as file:
+        dataset = file["Acqbuf_00"]
+        raw = dataset[()]
+        srate_mhz = dataset.attrs["-sra SampleRate [Hz]"] * 1e-6
+    tdy = np.empty((N_SAMPLES, N_TRACES), dtype=complex)
+    tdy.real = raw[:, ::2].T
+    tdy.imag = raw[:, 1::2].T
+    tdx = 1 / srate_mhz * np.arange(N_SAMPLES)
+    indices = np.where((tdx > RX_BEGIN) & (tdx < RX_STOP))[0]
+    return (tdy[indices] / AVERAGES).flatten()
+
+
+def read_with_reader(path: Path, memory_map: bool) -> np.ndarray:
+    """The readback of the controller."""
+    with AcquisitionReader(path, memory_map=memory_map) as reader:
+        return reader.read(reader.find_window(RX_BEGIN, RX_STOP), scale=AVERAGES)
+
+
+def profile(function, *args) -> tuple:
+    """Returns the result, the peak of the traced memory and the time of a call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main() -> None:
+    """Runs the check and the benchmark."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "acquisition.h5"
+        write_acquisition(path)
+        # Warm up the page cache
+        read_whole_file(path)
+
+        reference, reference_peak, reference_time = profile(read_whole_file, path)
+        result_size = reference.nbytes / 2**20
+        print(f"{N_TRACES} traces of {N_SAMPLES} samples, {result_size:.1f} MiB of windowed data")
+        print(f"{'readback':>18} {'peak [MiB]':>11} {'peak/data':>10} {'time [ms]':>10}")
+        print(f"{'whole file':>18} {reference_peak / 2**20:>11.1f} {reference_peak / reference.nbytes:>10.2f} "
+              f"{reference_time * 1e3:>10.1f}")
+        for label, memory_map in (("chunked reader", False), ("memory mapped", True)):
+            result, peak, elapsed = profile(read_with_reader, path, memory_map)
+            np.testing.assert_array_equal(result, reference)
+            print(f"{label:>18} {peak / 2**20:>11.1f} {peak / result.nbytes:>10.2f} {elapsed * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compares the throughput and accuracy of the dwell time resampling engines on synthetic FIDs.
+
+The accuracy is the RMS error against the noise free FID evaluated at the output sample times, relative to the
+RMS of the FID. Run with ``python benchmarks/bench_resampling.py``.
+"""
+
+import timeit
+import numpy as np
+
+from nqrduck_spectrometer_limenqr.resampling import (
+    AUTO,
+    BOXCAR,
+    DECIMATE,
+    ENGINES,
+    FFT,
+    POLYPHASE,
+    decimation_factor,
+    polyphase_factors,
+    resample_fid,
+    select_engine,
+)
+
+SRATE = 30.72e6
+# Record length in samples and dwell time in s: integer, rational, awkward and upsampling ratios
+CASES = (
+    (61_440, 32 / SRATE),
+    (61_447, 8 / SRATE),
+    (61_440, 1e-6),
+    (100_003, 1.7e-6),
+    (100_003, 1.234567e-6),
+    (30_720, 22e-9),
+)
+
+
+def synthetic_fid(n_samples: int, t: np.ndarray = None) -> np.ndarray:
+    """A decaying complex FID with two lines well inside the output bandwidth."""
+    if t is None:
+        t = np.arange(n_samples) / SRATE
+    return np.exp(-t / 300e-6) * (np.exp(2j * np.pi * 50e3 * t) + 0.5 * np.exp(-2j * np.pi * 120e3 * t))
+
+
+def output_times(engine: str, n_in: int, n_out: int, ratio: float) -> np.ndarray:
+    """The times of the resampled points.
+
+    The FFT engine stretches the record onto the output points, the other engines keep the dwell time.
+    """
+    if engine == FFT:
+        return np.arange(n_out) * (n_in / n_out) / SRATE
+    return np.arange(n_out) * ratio / SRATE
+
+
+def supports(engine: str, ratio: float, n_out: int) -> bool:
+    """Whether the engine can handle the ratio without falling back to another engine."""
+    if engine in (DECIMATE, BOXCAR):
+        return bool(decimation_factor(ratio, n_out))
+    if engine == POLYPHASE:
+        return polyphase_factors(ratio, n_out) is not None
+    return True
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    rng = np.random.default_rng(0)
+    print(f"{'samples':>8} {'points':>7} {'engine':>16} {'time [ms]':>10} {'MS/s':>8} {'rel. error':>11}")
+    for n_in, dwell_time in CASES:
+        t = np.arange(n_in) / SRATE
+        noise = 1e-3 * (rng.standard_normal(n_in) + 1j * rng.standard_normal(n_in))
+        tdy = synthetic_fid(n_in, t) + noise
+        n_out = int(t[-1] * 1e6 / (dwell_time * 1e6))
+        ratio = dwell_time * SRATE
+        # Ignore the edges, every engine has its own edge effects
+        inner = slice(n_out // 20, n_out - n_out // 20)
+
+        for engine in ENGINES:
+            if not supports(engine, ratio, n_out):
+                continue
+            repeat = 3
+            elapsed = min(timeit.repeat(lambda: resample_fid(tdy, n_out, engine, ratio), number=1, repeat=repeat))
+            result = resample_fid(tdy, n_out, engine, ratio)
+            selected = select_engine(ratio, n_out) if engine == AUTO else engine
+            reference = synthetic_fid(n_out, output_times(selected, n_in, n_out, ratio))
+            error = np.sqrt(np.mean(np.abs(result[inner] - reference[inner]) ** 2))
+            error /= np.sqrt(np.mean(np.abs(reference[inner]) ** 2))
+            label = f"{engine} ({selected})" if engine == AUTO else engine
+            print(
+                f"{n_in:>8} {n_out:>7} {label:>16} {elapsed * 1e3:>10.2f} {n_in / elapsed / 1e6:>8.1f} {error:>11.2e}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Checks the closed form RX window selection against the boolean mask selection and compares their speed.
+
+Run with ``python benchmarks/bench_rx_window.py``.
+"""
+
+import timeit
+import numpy as np
+
+from nqrduck_spectrometer_limenqr.readback import TimeAxis
+
+# The driver stores the sampling rate as float32, the conversion to MHz is done like in limedriver.hdf_reader
+SAMPLING_RATES = (np.float32(30.72e6) * 1e-6, np.float32(15.36e6) * 1e-6, 30.72e6 * 1e-6, 7.0)
+
+
+def select_with_mask(tdx: np.ndarray, rx_begin: float, rx_stop: float) -> np.ndarray:
+    """The selection that was used before the closed form window."""
+    return np.where((tdx > rx_begin) & (tdx < rx_stop))[0]
+
+
+def select_with_window(axis: TimeAxis, rx_begin: float, rx_stop: float) -> slice:
+    """The closed form selection of the window."""
+    start = axis.index_after(rx_begin)
+    return slice(start, max(axis.index_from(rx_stop), start))
+
+
+def edge_windows(tdx: np.ndarray, rng: np.random.Generator) -> list:
+    """Windows that start and stop on, next to and outside of the sample times."""
+    windows = [
+        (-1.0, tdx[-1] + 1),
+        (0.0, tdx[-1]),
+        (tdx[0], tdx[1]),
+        (tdx[-2], tdx[-1]),
+        (tdx[5], tdx[5]),
+        (tdx[10], tdx[3]),
+        (tdx[-1], tdx[-1] + 10),
+        (-10.0, -1.0),
+    ]
+    for index in rng.integers(1, len(tdx) - 1, 50):
+        time = tdx[index]
+        for begin in (time, np.nextafter(time, -np.inf), np.nextafter(time, np.inf)):
+            stop_index = min(index + rng.integers(0, 1000), len(tdx) - 1)
+            stop = tdx[stop_index]
+            for end in (stop, np.nextafter(stop, -np.inf), np.nextafter(stop, np.inf)):
+                windows.append((float(begin), float(end)))
+    for _ in range(200):
+        begin, end = np.sort(rng.uniform(-1, tdx[-1] + 1, 2))
+        windows.append((float(begin), float(end)))
+    return windows
+
+
+def check_equivalence(rng: np.random.Generator) -> int:
+    """Asserts that both selections return the same samples, returns the number of checked windows."""
+    checked = 0
+    for srate_mhz in SAMPLING_RATES:
+        for n_samples in (16, 4097, 100_003):
+            axis = TimeAxis(srate_mhz, n_samples)
+            tdx = axis.values(0, n_samples)
+            np.testing.assert_array_equal(tdx, 1 / srate_mhz * np.arange(n_samples))
+            for rx_begin, rx_stop in edge_windows(tdx, rng):
+                indices = select_with_mask(tdx, rx_begin, rx_stop)
+                window = select_with_window(axis, rx_begin, rx_stop)
+                np.testing.assert_array_equal(
+                    np.arange(n_samples)[window], indices, err_msg=f"{srate_mhz} MHz, {rx_begin} to {rx_stop} µs"
+                )
+                checked += 1
+    return checked
+
+
+def main() -> None:
+    """Runs the check and the benchmark."""
+    checked = check_equivalence(np.random.default_rng(0))
+    print(f"{checked} windows match the boolean mask selection")
+
+    srate_mhz = np.float32(30.72e6) * 1e-6
+    print(f"{'samples':>10} {'mask [µs]':>12} {'window [µs]':>12} {'speedup':>8}")
+    for n_samples in (10_000, 100_000, 1_000_000, 10_000_000):
+        axis = TimeAxis(srate_mhz, n_samples)
+        tdx = axis.values(0, n_samples)
+        rx_begin, rx_stop = tdx[n_samples // 4] + 1e-3, tdx[3 * n_samples // 4] - 1e-3
+        repeat, number = 5, 10
+        mask = min(timeit.repeat(lambda: select_with_mask(tdx, rx_begin, rx_stop), number=number, repeat=repeat))
+        window = min(timeit.repeat(lambda: select_with_window(axis, rx_begin, rx_stop), number=number, repeat=repeat))
+        print(
+            f"{n_samples:>10} {mask / number * 1e6:>12.1f} {window / number * 1e6:>12.1f} {mask / window:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compares the vectorized pulse sequence compiler with the former per-sample list translation.
+
+Run with ``python benchmarks/bench_sequence_compiler.py``.
+"""
+
+import timeit
+import numpy as np
+
+from nqrduck_spectrometer_limenqr.sequence import PulseSequenceCompiler
+from fakes import cpmg_sequence
+
+SRATE = 30.72e6
+IF_FREQUENCY = 5e6
+OFFSET_FIRST_PULSE = 300
+
+
+def blank_duration_before_event(compiler: PulseSequenceCompiler, events: list, index: int) -> float:
+    """The backwards scan over the previous events that was used before the forward sweep."""
+    previous_events = events[: events.index(events[index])]
+    blank_durations = []
+    for event in reversed(previous_events):
+        if any(compiler.is_translatable_tx_parameter(param) for param in event.parameters.values()):
+            break
+        blank_durations.append(float(event.duration))
+    return sum(reversed(blank_durations))
+
+
+def translate_with_lists(compiler: PulseSequenceCompiler, events: list) -> tuple:
+    """The list based translation that was used before the compiler."""
+    first_pulse = True
+    for index, event in enumerate(events):
+        for parameter in event.parameters.values():
+            if not compiler.is_translatable_tx_parameter(parameter):
+                continue
+            pulse_shape, pulse_amplitude = compiler.prepare_pulse_amplitude(event, parameter)
+            pulse_amplitude, modulated_phase = compiler.modulate_pulse_amplitude(
+                pulse_amplitude, event, IF_FREQUENCY, SRATE
+            )
+            n = len(pulse_amplitude)
+            pfr_ext = [float(IF_FREQUENCY)] * n
+            pdr_ext = [float(pulse_shape.resolution)] * n
+            pam_ext = list(pulse_amplitude)
+            pph_ext = list(modulated_phase)
+            if first_pulse:
+                pof_ext = [OFFSET_FIRST_PULSE] + [int(float(pulse_shape.resolution) * SRATE)] * (n - 1)
+                pfr, pdr, pam, pof, pph = pfr_ext, pdr_ext, pam_ext, pof_ext, pph_ext
+                first_pulse = False
+            else:
+                blank = blank_duration_before_event(compiler, events, index)
+                pof_ext = [int(np.ceil(blank * SRATE))]
+                pof_ext.extend([int(float(pulse_shape.resolution) * SRATE)] * (n - 1))
+                pfr.extend(pfr_ext)
+                pdr.extend(pdr_ext)
+                pam.extend(pam_ext)
+                pof.extend(pof_ext)
+                pph.extend(pph_ext)
+    return pfr, pdr, pam, pof, pph
+
+
+def compile_to_lists(compiler: PulseSequenceCompiler, events: list) -> tuple:
+    """Compiles the sequence and converts the arrays to the lists the binding accepts."""
+    compiled = compiler.compile(events, IF_FREQUENCY, SRATE)
+    return (
+        compiled.frequency.tolist(),
+        compiled.duration.tolist(),
+        compiled.amplitude.tolist(),
+        compiled.offset.tolist(),
+        compiled.phase.tolist(),
+    )
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    compiler = PulseSequenceCompiler("TX", "RX", OFFSET_FIRST_PULSE)
+    print(f"{'echoes':>8} {'samples':>10} {'lists [ms]':>12} {'compiler [ms]':>14} {'speedup':>8}")
+    for n_echoes in (10, 100, 500):
+        events = cpmg_sequence(n_echoes, pulse_length="20e-6")
+        compiled = compiler.compile(events, IF_FREQUENCY, SRATE)
+        reference = translate_with_lists(compiler, events)
+        for array, values in zip(
+            (compiled.frequency, compiled.duration, compiled.amplitude, compiled.offset, compiled.phase),
+            reference,
+        ):
+            np.testing.assert_array_equal(array, values)
+
+        repeat = 3
+        lists = min(timeit.repeat(lambda: translate_with_lists(compiler, events), number=1, repeat=repeat))
+        vectorized = min(timeit.repeat(lambda: compile_to_lists(compiler, events), number=1, repeat=repeat))
+        print(
+            f"{n_echoes:>8} {compiled.n_pulses:>10} {lists * 1e3:>12.1f} {vectorized * 1e3:>14.1f} {lists / vectorized:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
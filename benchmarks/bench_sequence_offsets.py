@@ -0,0 +1,46 @@
+"""Scaling of the blank duration computation with the number of events.
+
+Run with ``python benchmarks/bench_sequence_offsets.py``.
+"""
+
+import timeit
+import numpy as np
+
+from nqrduck_spectrometer_limenqr.sequence import PulseSequenceCompiler
+from bench_sequence_compiler import blank_duration_before_event
+from fakes import cpmg_sequence
+
+
+def offsets_with_scans(compiler: PulseSequenceCompiler, events: list) -> list:
+    """Blank durations before every transmit event using one backwards scan per event."""
+    return [
+        blank_duration_before_event(compiler, events, index)
+        for index, event in enumerate(events)
+        if any(compiler.is_translatable_tx_parameter(param) for param in event.parameters.values())
+    ]
+
+
+def offsets_with_sweep(compiler: PulseSequenceCompiler, events: list) -> list:
+    """Blank durations before every transmit event using the forward sweep of the compiler."""
+    tx_events, blank_durations = compiler.get_blank_durations(events)
+    return blank_durations[tx_events].tolist()
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    compiler = PulseSequenceCompiler("TX", "RX", 300)
+    print(f"{'events':>8} {'scans [ms]':>12} {'sweep [ms]':>12} {'speedup':>8}")
+    for n_events in (10, 100, 1000, 10000):
+        # Every echo adds a pulse and a blank event
+        events = cpmg_sequence(max((n_events - 4) // 2, 1))
+        np.testing.assert_array_equal(
+            offsets_with_scans(compiler, events), offsets_with_sweep(compiler, events)
+        )
+        number = max(1, 1000 // n_events)
+        scans = min(timeit.repeat(lambda: offsets_with_scans(compiler, events), number=number, repeat=3)) / number
+        sweep = min(timeit.repeat(lambda: offsets_with_sweep(compiler, events), number=number, repeat=3)) / number
+        print(f"{len(events):>8} {scans * 1e3:>12.2f} {sweep * 1e3:>12.2f} {scans / sweep:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
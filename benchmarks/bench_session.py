@@ -0,0 +1,59 @@
+"""Compares a fresh, initialized driver per measurement with the persistent LimeSession of the measurement worker.
+
+The driver is simulated by MockLimeConfig, which sleeps for the initialization and the acquisition.
+Run with ``python benchmarks/bench_session.py``.
+"""
+
+import multiprocessing
+import time
+
+from nqrduck_spectrometer_limenqr.worker import MeasurementWorker, snapshot_lime_config
+from fakes import MockLimeConfig
+
+N_PULSES = 64
+N_MEASUREMENTS = 20
+
+
+def run_fresh_driver(snapshot: dict) -> None:
+    """The former driver process, a new configuration per measurement that always initializes the device."""
+    lime = MockLimeConfig(N_PULSES)
+    for name, value in snapshot.items():
+        setattr(lime, name, value)
+    lime.run()
+
+
+def configuration(index: int) -> MockLimeConfig:
+    """The configuration of a measurement in a loop that changes the RX gain once."""
+    lime = MockLimeConfig(N_PULSES)
+    lime.file_pattern = f"run_{index}"
+    lime.RX_gain = 50 if index < N_MEASUREMENTS // 2 else 55
+    return lime
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    for index in range(N_MEASUREMENTS):
+        lime = configuration(index)
+        lime.override_init = -1
+        process = context.Process(target=run_fresh_driver, args=(snapshot_lime_config(lime),))
+        process.start()
+        process.join()
+    fresh = time.perf_counter() - start
+
+    worker = MeasurementWorker(None)
+    start = time.perf_counter()
+    for index in range(N_MEASUREMENTS):
+        lime = configuration(index)
+        assert worker.run_driver(lime)
+    persistent = time.perf_counter() - start
+    worker.shutdown()
+
+    print(f"{N_MEASUREMENTS} measurements, init {MockLimeConfig.init_time} s, acquisition {MockLimeConfig.run_time} s")
+    print(f"fresh driver per measurement: {fresh:6.2f} s, {N_MEASUREMENTS} initializations")
+    print(f"persistent session:           {persistent:6.2f} s, {worker.session.init_count} initializations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compares the acquisition storage locations for back-to-back measurements with the simulated driver.
+
+Every measurement allocates its storage, writes the acquisition file, reads the RX window and releases the storage.
+Run with ``python benchmarks/bench_storage.py``.
+"""
+
+import time
+
+from nqrduck_spectrometer_limenqr.readback import AcquisitionReader
+from nqrduck_spectrometer_limenqr.simulator import SimulatedLimeConfig, SpinSystem
+from nqrduck_spectrometer_limenqr.storage import LOCATIONS, AcquisitionStorage
+
+N_MEASUREMENTS = 200
+ACQUISITION_TIME = 1e-3
+
+
+def measure(storage: AcquisitionStorage, location: str) -> None:
+    """Runs one measurement in the storage location."""
+    lime = SimulatedLimeConfig(0)
+    lime.rectime_secs = ACQUISITION_TIME
+    lime.repetitions = 1
+    lime.save_path, lime.file_pattern = storage.allocate(location)
+    try:
+        lime.run()
+        with AcquisitionReader(lime.get_path()) as reader:
+            reader.read(reader.find_window(0, ACQUISITION_TIME * 1e6), scale=lime.averages)
+    finally:
+        storage.release(lime.save_path, lime.file_pattern)
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    SimulatedLimeConfig.spin_system = SpinSystem(seed=0)
+    print(f"{N_MEASUREMENTS} measurements of {ACQUISITION_TIME * 1e3:g} ms")
+    for location in LOCATIONS:
+        storage = AcquisitionStorage()
+        measure(storage, location)
+        start = time.perf_counter()
+        for _ in range(N_MEASUREMENTS):
+            measure(storage, location)
+        elapsed = time.perf_counter() - start
+        storage.close()
+        print(f"{location:>20}: {elapsed / N_MEASUREMENTS * 1e3:6.2f} ms per measurement")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Checks the streamed acquisition of the averages with the simulated driver in real time.
+
+Runs the block loop of LimeNQRController.perform_streaming_measurement and prints the block sizes, the time between
+the updates and the estimated SNR. The estimated noise is compared to the noise of the simulated spin system, then
+the acquisition is repeated with a target SNR to show the early stop.
+Run with ``python benchmarks/bench_streaming.py``.
+"""
+
+import time
+import numpy as np
+
+from nqrduck_spectrometer_limenqr.readback import AcquisitionReader
+from nqrduck_spectrometer_limenqr.simulator import SimulatedLimeConfig, SpinSystem
+from nqrduck_spectrometer_limenqr.storage import AcquisitionStorage
+from nqrduck_spectrometer_limenqr.streaming import AverageStream
+
+AVERAGES = 4000
+REPETITION_TIME = 1e-3
+ACQUISITION_TIME = 200e-6
+UPDATE_INTERVAL = 0.25
+TARGET_SNR = 1000
+
+
+def stream(averages: int, update_interval: float, target_snr: float = 0) -> AverageStream:
+    """Acquires the averages in blocks and prints every update."""
+    storage = AcquisitionStorage()
+    # A single excitation pulse for a free induction decay
+    lime = SimulatedLimeConfig(1)
+    lime.p_offs = [300]
+    lime.p_dur = [3e-6]
+    lime.p_amp = [1.0]
+    lime.p_frq = [1.2e6]
+    lime.rectime_secs = ACQUISITION_TIME
+    lime.reptime_secs = REPETITION_TIME
+    lime.repetitions = 1
+    average_stream = AverageStream(averages, update_interval, target_snr)
+
+    print(f"{'block':>6} {'averages':>9} {'update [s]':>11} {'SNR':>8}")
+    last_update = time.perf_counter()
+    while not average_stream.done:
+        block = average_stream.next_block()
+        lime.averages = block
+        lime.save_path, lime.file_pattern = storage.allocate()
+        try:
+            started = time.perf_counter()
+            lime.run()
+            with AcquisitionReader(lime.get_path()) as reader:
+                block_sum = reader.read(reader.find_window(0, ACQUISITION_TIME * 1e6))
+            average_stream.add(block_sum, block, time.perf_counter() - started)
+        finally:
+            storage.release(lime.save_path, lime.file_pattern)
+
+        now = time.perf_counter()
+        snr = average_stream.snr()
+        print(f"{block:>6} {average_stream.completed:>9} {now - last_update:>11.3f} "
+              f"{'-' if snr is None else f'{snr:.1f}':>8}")
+        last_update = now
+    storage.close()
+    return average_stream
+
+
+def main() -> None:
+    """Runs the check."""
+    spin_system = SpinSystem(noise=50.0, seed=None)
+    SimulatedLimeConfig.spin_system = spin_system
+    SimulatedLimeConfig.realtime = True
+
+    print(f"{AVERAGES} averages of {REPETITION_TIME * 1e3:g} ms, updates every {UPDATE_INTERVAL} s")
+    average_stream = stream(AVERAGES, UPDATE_INTERVAL)
+    assert average_stream.completed == AVERAGES
+    # Complex noise of the simulation, one quadrature has the RMS spin_system.noise
+    expected = spin_system.noise * np.sqrt(2 / AVERAGES)
+    estimated = average_stream.noise()
+    print(f"Noise of the running average: estimated {estimated:.3f}, simulated {expected:.3f}")
+    assert abs(estimated / expected - 1) < 0.1
+
+    print(f"\nStopping at a SNR of {TARGET_SNR}")
+    average_stream = stream(AVERAGES, UPDATE_INTERVAL, TARGET_SNR)
+    assert average_stream.stopped and average_stream.snr() >= TARGET_SNR
+    print(f"Stopped after {average_stream.completed} of {AVERAGES} averages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Hardware and GUI free stand-ins for the pulse sequence and driver objects used by the benchmarks and the tests."""
+
+import time
+from decimal import Decimal
+import numpy as np
+
+from nqrduck_spectrometer_limenqr.sequence import RELATIVE_AMPLITUDE, RX_READOUT, TX_PULSE_SHAPE
+
+
+class SincShape:
+    """Pulse shape with the interface of the nqrduck pulse shape functions."""
+
+    name = "Sinc"
+
+    def __init__(self, resolution: float = 1 / 30.72e6) -> None:
+        """Initializes the SincShape."""
+        self.resolution = resolution
+
+    def get_pulse_amplitude(self, pulse_length) -> np.ndarray:
+        """Evaluates the shape with one point per resolution step."""
+        n = int(float(pulse_length) / self.resolution)
+        return np.sinc(np.linspace(-2, 2, n))
+
+    def to_json(self) -> dict:
+        """Returns a json representation of the shape."""
+        return {"name": self.name, "resolution": self.resolution}
+
+
+class Option:
+    """Pulse parameter option with the interface of the nqrduck options."""
+
+    def __init__(self, name: str, value) -> None:
+        """Initializes the Option."""
+        self.name = name
+        self.value = value
+
+    def to_json(self) -> dict:
+        """Returns a json representation of the option."""
+        value = self.value.to_json() if hasattr(self.value, "to_json") else self.value
+        return {"name": self.name, "value": value}
+
+
+class Parameter:
+    """Pulse parameter with the interface of the nqrduck pulse parameters."""
+
+    def __init__(self, name: str, options: dict) -> None:
+        """Initializes the Parameter."""
+        self.name = name
+        self.options = [Option(key, value) for key, value in options.items()]
+
+    def get_option_by_name(self, name: str):
+        """Returns the option with the given name."""
+        for option in self.options:
+            if option.name == name:
+                return option
+        raise ValueError(f"Option with name {name} not found")
+
+
+class Event:
+    """Pulse sequence event with the interface of the nqrduck events."""
+
+    def __init__(self, name: str, duration: str, parameters: list) -> None:
+        """Initializes the Event."""
+        self.name = name
+        self.duration = Decimal(duration)
+        self.parameters = {parameter.name: parameter for parameter in parameters}
+
+
+def tx_event(name: str, duration: str, amplitude: float = 100, resolution: float = 1 / 30.72e6) -> Event:
+    """Returns an event with a shaped transmit pulse."""
+    parameter = Parameter(
+        "TX",
+        {
+            RELATIVE_AMPLITUDE: amplitude,
+            TX_PULSE_SHAPE: SincShape(resolution),
+        },
+    )
+    return Event(name, duration, [parameter])
+
+
+def blank_event(name: str, duration: str) -> Event:
+    """Returns an event without transmit pulse."""
+    return Event(name, duration, [])
+
+
+def rx_event(name: str, duration: str) -> Event:
+    """Returns an event with an RX readout."""
+    return Event(name, duration, [Parameter("RX", {RX_READOUT: True})])
+
+
+def cpmg_sequence(
+    n_echoes: int, pulse_length: str = "3e-6", resolution: float = 1 / 30.72e6, rx_duration: str = "100e-6"
+) -> list:
+    """Returns the events of a CPMG like echo train."""
+    events = [tx_event("pi/2", pulse_length, resolution=resolution), blank_event("tau", "20e-6")]
+    for echo in range(n_echoes):
+        events.append(tx_event(f"pi {echo}", pulse_length, resolution=resolution))
+        events.append(blank_event(f"echo {echo}", "40e-6"))
+    events.append(rx_event("rx", rx_duration))
+    events.append(blank_event("tr", "1e-3"))
+    return events
+
+
+# Attributes that run_experiment of limedriver.cpp (LimeDriver 0.4.0) writes to the device only in its initialization
+# branch: the LO frequency, sampling rate, antennas of the channel, gains, low pass filters and IQ corrections
+INIT_ATTRIBUTES = (
+    "srate",
+    "channel",
+    "TX_matching",
+    "RX_matching",
+    "frq",
+    "RX_LPF",
+    "TX_LPF",
+    "RX_gain",
+    "TX_gain",
+    "TX_IcorrDC",
+    "TX_QcorrDC",
+    "TX_IcorrGain",
+    "TX_QcorrGain",
+    "TX_IQcorrPhase",
+    "RX_IcorrGain",
+    "RX_QcorrGain",
+    "RX_IQcorrPhase",
+)
+
+# Attributes that the driver reads back from the device to detect a deviation for override_init == 0
+READBACK_ATTRIBUTES = ("frq", "srate", "RX_gain", "TX_gain")
+
+
+class MockLimeConfig:
+    """Driver configuration with the attributes of PyLimeConfig that simulates the run time of the LimeSDR.
+
+    The device decides about the initialization like the LimeDriver: it is initialized if override_init is negative or
+    if override_init is zero and a read back attribute deviates. Only the initialization writes the INIT_ATTRIBUTES to
+    the device, which is shared by all instances. The initialization takes init_time seconds and the acquisition
+    run_time seconds. Runs raise a RuntimeError while fail is set, like a driver error.
+
+    Attributes:
+        runs (list): The override_init of every run of the instance
+        acquisitions (list): The device state of every run of the instance, None for an uninitialized device
+    """
+
+    init_time = 0.5
+    run_time = 0.02
+    fail = False
+    # The INIT_ATTRIBUTES that were last written to the device
+    device = None
+
+    def __init__(self, Npulses: int) -> None:
+        """Initializes the MockLimeConfig with the defaults of the LimeDriver."""
+        self.Npulses = Npulses
+        self.srate = 30.72e6
+        self.channel = 0
+        self.TX_matching = 0
+        self.RX_matching = 0
+        self.frq = 50e6
+        self.RX_LPF = 5e6
+        self.TX_LPF = 130e6
+        self.RX_gain = 50
+        self.TX_gain = 40
+        self.TX_IcorrDC = -45
+        self.TX_QcorrDC = 0
+        self.TX_IcorrGain = 2047
+        self.TX_QcorrGain = 2039
+        self.TX_IQcorrPhase = 3
+        self.RX_IcorrGain = 2047
+        self.RX_QcorrGain = 2047
+        self.RX_IQcorrPhase = 0
+        self.p_frq = [0.0] * Npulses
+        self.p_dur = [0.0] * Npulses
+        self.p_amp = [0.0] * Npulses
+        self.p_offs = [0] * Npulses
+        self.p_pha = [0.0] * Npulses
+        self.c3_tim = [0, 70, 56, -5]
+        self.averages = 1
+        self.repetitions = 1
+        self.reptime_secs = 4e-3
+        self.rectime_secs = 2e-4
+        self.override_init = 0
+        self.override_save = 0
+        self.file_pattern = "test"
+        self.file_stamp = ""
+        self.save_path = "./"
+        self.runs = []
+        self.acquisitions = []
+
+    def run(self) -> int:
+        """Simulates the initialization of the device if needed and the acquisition."""
+        if self.fail:
+            raise RuntimeError("Simulated driver error")
+        device = MockLimeConfig.device
+        deviates = device is None or any(device[name] != getattr(self, name) for name in READBACK_ATTRIBUTES)
+        initialize = self.override_init < 0 or (self.override_init == 0 and deviates)
+        if initialize:
+            MockLimeConfig.device = {name: getattr(self, name) for name in INIT_ATTRIBUTES}
+        self.runs.append(self.override_init)
+        self.acquisitions.append(MockLimeConfig.device)
+        time.sleep((self.init_time if initialize else 0) + self.run_time)
+        return 0
@@ -0,0 +1,998 @@
+"""The measurement pipeline of the Lime NQR spectrometer.
+
+LimeNQRAcquisition prepares, acquires and processes measurements with the settings of self.module.model and reports
+through self.module.nqrduck_signal. It does not depend on Qt or the nqrduck spectrometer package, so it is shared by
+LimeNQRController of the GUI and by the headless API. The measurements are MeasurementResult objects, the GUI converts
+them into nqrduck Measurements in to_measurement before they are emitted.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+import numpy as np
+
+from nqrduck.helpers.unitconverter import UnitConverter
+
+from .archive import AcquisitionArchive, OFF as ARCHIVE_OFF, read_archive_metadata
+from .configuration import DriverSettings
+from .profiling import DISABLED, create_profile
+from .postprocessing import (
+    POOL,
+    MeasurementResult,
+    ProcessingJob,
+    ProcessingPool,
+    find_window,
+    process_acquisition,
+)
+from .readback import AcquisitionReader
+from .sequence import CompiledSequence, CompiledSequenceCache, PulseSequenceCompiler
+from .simulator import SimulatedLimeConfig
+from .storage import AcquisitionStorage
+from .streaming import AverageStream
+from .worker import MeasurementWorker, snapshot_lime_config
+
+if TYPE_CHECKING:
+    # The driver is imported with the first measurement, so loading the plugin does not import it
+    from limedriver.binding import PyLimeConfig
+
+
+logger = logging.getLogger(__name__)
+
+
+class LimeNQRAcquisition:
+    """The measurement pipeline of the Lime NQR spectrometer.
+
+    The class that uses it has a module attribute with the model and the nqrduck_signal and calls init_acquisition
+    when it is initialized.
+    """
+
+    def init_acquisition(self, isolate_driver: bool = True) -> None:
+        """Creates the measurement worker, the sequence compiler and the storage of the acquisitions.
+
+        Args:
+            isolate_driver (bool): Whether the driver is run in a child process
+        """
+        self.worker = MeasurementWorker(self, isolate_driver)
+        self.sequence_compiler = PulseSequenceCompiler(
+            self.module.model.TX,
+            self.module.model.RX,
+            self.module.model.OFFSET_FIRST_PULSE,
+        )
+        self.sequence_cache = CompiledSequenceCache(self.sequence_compiler)
+        self.storage = AcquisitionStorage()
+        self.driver_settings = DriverSettings()
+        self.archive = None
+        self._archiving = {}
+        self._streams = {}
+        self._stop_streaming = threading.Event()
+        self.processing_pool = ProcessingPool()
+
+    def start_measurement(self):
+        """Starts the measurement procedure.
+
+        The measurement is queued on the measurement worker and this method returns immediately.
+        Progress, cancellation and the measurement data are reported through the nqrduck signal.
+
+        Returns:
+            Future: Resolves to the MeasurementResult or None if the measurement failed
+        """
+        self.log_start_message()
+        return self.worker.submit()
+
+    def start_sweep(self, points: list, restore: bool = True) -> list:
+        """Starts a series of measurements that each change one setting, e.g. a frequency sweep or a nutation curve.
+
+        A point is a tuple of the name of a setting, or TARGET_FREQUENCY or AVERAGES of the model, and its value.
+        The points are measured in order in the session of the measurement worker, so the device is only initialized
+        if a point changes a device setting and the pulse sequence is only compiled again if a point changes the IF
+        frequency or the sampling rate. Every measurement is emitted as soon as it is processed, as measurement_data
+        and together with its point as sweep_measurement.
+
+        Args:
+            points (list): Tuples of setting name and value
+            restore (bool): Whether the swept settings are restored after the sweep
+
+        Returns:
+            list: One Future per point that resolves to the MeasurementResult or None if the measurement failed or was
+                cancelled
+        """
+        # Unknown settings raise before anything is queued
+        originals = {name: self.get_sweep_value(name) for name, _ in points}
+        logger.debug("Starting sweep over %s points", len(points))
+        self.log_start_message()
+
+        futures = []
+        for index, (name, value) in enumerate(points):
+            future = self.worker.submit_serial(partial(self.set_sweep_value, name, value))
+            future.add_done_callback(
+                partial(self.emit_sweep_measurement, index, name, value)
+            )
+            futures.append(future)
+        if restore:
+            self.worker.submit_task(partial(self.restore_sweep_values, originals))
+        return futures
+
+    def get_sweep_value(self, name: str):
+        """Returns the current value of a sweep parameter.
+
+        Args:
+            name (str): The name of a setting, TARGET_FREQUENCY or AVERAGES
+
+        Returns:
+            object: The value of the parameter
+
+        Raises:
+            ValueError: If there is no setting with the name
+        """
+        if name == self.module.model.TARGET_FREQUENCY:
+            return self.module.model.target_frequency
+        if name == self.module.model.AVERAGES:
+            return self.module.model.averages
+        return self.module.model.get_setting_by_name(name).value
+
+    def set_sweep_value(self, name: str, value) -> None:
+        """Sets the value of a sweep parameter.
+
+        Args:
+            name (str): The name of a setting, TARGET_FREQUENCY or AVERAGES
+            value (object): The new value of the parameter
+        """
+        logger.debug("Setting sweep parameter %s to %s", name, value)
+        if name == self.module.model.TARGET_FREQUENCY:
+            self.module.model.target_frequency = float(value)
+        elif name == self.module.model.AVERAGES:
+            self.module.model.averages = int(value)
+        else:
+            self.module.model.get_setting_by_name(name).value = value
+
+    def restore_sweep_values(self, values: dict) -> None:
+        """Restores the sweep parameters after a sweep.
+
+        Args:
+            values (dict): The values of the parameters before the sweep
+        """
+        for name, value in values.items():
+            self.set_sweep_value(name, value)
+
+    def cancel_measurement(self) -> None:
+        """Cancels the running and all queued measurements."""
+        logger.debug("Cancelling measurement")
+        self.worker.cancel()
+
+    def stop_streaming(self) -> None:
+        """Stops the running streamed acquisition after the current block and processes the acquired averages."""
+        logger.debug("Stopping streamed acquisition")
+        self._stop_streaming.set()
+
+    def create_measurement_profile(self):
+        """Returns the profile that records the stages of a measurement according to the profiling setting.
+
+        Returns:
+            MeasurementProfile: A new profile or DISABLED if profiling is off
+        """
+        mode = self.module.model.get_setting_by_name(
+            self.module.model.PROFILING
+        ).value
+        return create_profile(mode)
+
+    def prepare_measurement(self, profile=DISABLED) -> tuple:
+        """Creates the limr object and sets it up for the measurement.
+
+        The settings the measurement is acquired and processed with are copied as well, because the next measurement
+        is prepared and can change the settings while this one is acquired.
+
+        Args:
+            profile (MeasurementProfile): The profile that records the stages of the measurement
+
+        Returns:
+            tuple: The PyLimeConfig object that is used to communicate with the pulseN driver and the measurement
+            context, see capture_measurement_context, or None and None if the setup failed
+        """
+        with profile.stage("initialize_lime"):
+            lime = self.initialize_lime()
+        if lime is None:
+            # Emit error message
+            self.emit_measurement_error(
+                "Error with Lime driver. Is the Lime driver installed?"
+            )
+            return None, None
+        elif lime.Npulses == 0:
+            # Emit error message
+            self.emit_measurement_error(
+                "Error with pulse sequence. Is the pulse sequence empty?"
+            )
+            return None, None
+
+        with profile.stage("setup_lime_parameters"):
+            self.setup_lime_parameters(lime)
+        with profile.stage("setup_temporary_storage"):
+            self.setup_temporary_storage(lime)
+        return lime, self.capture_measurement_context(lime, profile)
+
+    def capture_measurement_context(self, lime: PyLimeConfig, profile=DISABLED) -> dict:
+        """Copies the settings that the acquisition and the processing of a prepared measurement read.
+
+        Args:
+            lime (PyLimeConfig): The prepared PyLimeConfig object
+            profile (MeasurementProfile): The profile that records the stages of the measurement
+
+        Returns:
+            dict: The RX bounds in µs, the processing settings as arguments of ProcessingJob, the profiling mode of the
+            processing stages or None, the name of the measurement and the values that are needed to name a streamed measurement, the streaming, post-processing
+            and storage settings and the parameters that are archived with the acquisition
+        """
+        model = self.module.model
+        rx_begin, rx_stop = self.find_rx_bounds(lime)
+        settings = self.get_processing_settings()
+        rx_window = self.compile_pulse_sequence().rx_window
+        sequence_name = self.get_pulse_sequence().name
+        return {
+            "rx_begin": rx_begin,
+            "rx_stop": rx_stop,
+            "settings": settings,
+            "profiling": model.get_setting_by_name(model.PROFILING).value
+            if profile.enabled
+            else None,
+            "name": self.measurement_name(
+                model.averages, settings["target_frequency"], sequence_name
+            ),
+            "sequence_name": sequence_name,
+            "streaming_interval": float(
+                model.get_setting_by_name(model.STREAMING_INTERVAL).value
+            ),
+            "target_snr": float(model.get_setting_by_name(model.TARGET_SNR).value),
+            "storage": model.get_setting_by_name(model.ACQUISITION_STORAGE).value,
+            "post_processing": model.get_setting_by_name(model.POST_PROCESSING).value,
+            "archive": {
+                "rx_window": None if rx_window is None else [float(value) for value in rx_window],
+                "offset_first_pulse": model.OFFSET_FIRST_PULSE,
+                "rx_offset": float(model.get_setting_by_name(model.RX_OFFSET).value),
+                "dwell_time": UnitConverter.to_float(
+                    model.get_setting_by_name(model.RX_DWELL_TIME).value
+                ),
+                "resampling_engine": settings["engine"],
+                "target_frequency": float(settings["target_frequency"]),
+                "if_frequency": float(settings["if_frequency"]),
+                "frequency_shift": float(settings["frequency_shift"]),
+            },
+        }
+
+    def start_processing(
+        self, lime: PyLimeConfig, context: dict, profile=DISABLED
+    ) -> Future:
+        """Starts processing the acquired data according to the post-processing setting.
+
+        The data is processed with the settings of the measurement context, so the measurements that are prepared
+        meanwhile can change the settings.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+            context (dict): The measurement context returned by prepare_measurement
+            profile (MeasurementProfile): The profile that records the stages of the measurement
+
+        Returns:
+            Future: Resolves to the MeasurementResult and the recorded processing stages
+        """
+        job = self.create_processing_job(lime, context)
+        archive_path = self.archive_acquisition(lime, job.name, context)
+        if archive_path is not None:
+            job.archive_path = str(archive_path)
+
+        if context["post_processing"] == POOL:
+            return self.processing_pool.submit(job)
+
+        processing = Future()
+        try:
+            processing.set_result(process_acquisition(job))
+        except Exception as e:
+            processing.set_exception(e)
+        return processing
+
+    def finish_measurement(
+        self, lime: PyLimeConfig, processing: Future, profile=DISABLED
+    ) -> MeasurementResult:
+        """Waits for the processed data and emits the measurement.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+            processing (Future): The future returned by start_processing
+            profile (MeasurementProfile): The profile that records the stages of the measurement
+
+        Returns:
+            MeasurementResult: The measurement data or None if the data could not be retrieved
+        """
+        try:
+            measurement_data, stages = processing.result()
+        except Exception as e:
+            logger.error("Error processing measurement result: %s", e)
+            measurement_data = None
+
+        if not measurement_data:
+            self.emit_measurement_error("Measurement failed. Unable to retrieve data.")
+            return None
+
+        if profile.enabled:
+            profile.add_stages(stages)
+            self.attach_measurement_profile(measurement_data, profile)
+        self.emit_measurement_data(measurement_data)
+        self.emit_status_message("Finished Measurement")
+        return measurement_data
+
+    def create_processing_job(
+        self, lime: PyLimeConfig, context: dict
+    ) -> ProcessingJob:
+        """Returns the job that processes the acquired data with the settings of the measurement context.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+            context (dict): The measurement context returned by prepare_measurement
+
+        Returns:
+            ProcessingJob: The acquisition file or the running average of a streamed acquisition and its settings
+        """
+        settings = dict(context["settings"])
+        if context["profiling"] is not None:
+            settings["profiling"] = context["profiling"]
+        streamed = self._streams.get((lime.save_path, lime.file_pattern))
+        if streamed is not None:
+            stream, tdx = streamed
+            return ProcessingJob(
+                self.streamed_measurement_name(context, stream),
+                buffers=(tdx, stream.mean),
+                **settings,
+            )
+
+        name = context["name"]
+        logger.debug(f"Measurement name: {name}")
+        return ProcessingJob(
+            name,
+            path=lime.get_path(),
+            rx_begin=context["rx_begin"],
+            rx_stop=context["rx_stop"],
+            scale=lime.averages,
+            **settings,
+        )
+
+    def get_processing_settings(self) -> dict:
+        """Returns the settings the acquired data is processed with.
+
+        Returns:
+            dict: The frequencies, the dwell time in µs, the resampling engine and the sampling rate as arguments of ProcessingJob
+        """
+        model = self.module.model
+        dwell_time = UnitConverter.to_float(
+            model.get_setting_by_name(model.RX_DWELL_TIME).value
+        ) * 1e6
+        logger.debug("Dwell time: %s", dwell_time)
+        return {
+            "target_frequency": model.target_frequency,
+            "frequency_shift": self.get_fft_shift(),
+            "if_frequency": model.if_frequency,
+            "dwell_time": dwell_time,
+            "engine": model.get_setting_by_name(model.RESAMPLING_ENGINE).value,
+            "srate": model.get_setting_by_name(model.SAMPLING_FREQUENCY).get_setting(),
+        }
+
+    def attach_measurement_profile(self, measurement_data: MeasurementResult, profile) -> None:
+        """Attaches the recorded stages to the measurement data and emits them.
+
+        Args:
+            measurement_data (MeasurementResult): The measurement data
+            profile (MeasurementProfile): The profile that records the stages of the measurement
+        """
+        stages = profile.to_dict()
+        measurement_data.profile = stages
+        self.module.nqrduck_signal.emit("measurement_profile", stages)
+
+    def log_start_message(self) -> None:
+        """Logs a message when the measurement is started."""
+        logger.debug(
+            "Starting measurement with spectrometer: %s", self.module.model.name
+        )
+
+    def initialize_lime(self) -> PyLimeConfig:
+        """Initializes the limr object that is used to communicate with the pulseN driver.
+
+        Returns:
+            PyLimeConfig: The PyLimeConfig object that is used to communicate with the pulseN driver
+        """
+        try:
+            n_pulses = self.get_number_of_pulses()
+            lime = self.get_driver_class()(n_pulses)
+            return lime
+        except ImportError as e:
+            logger.error("Error while importing limr: %s", e)
+        except Exception as e:
+            logger.error("Error while initializing Lime driver: %s", e)
+            import traceback
+
+            traceback.print_exc()
+
+        return None
+
+    def get_driver_class(self) -> type:
+        """Returns the driver class of the selected driver backend.
+
+        Returns:
+            type: PyLimeConfig or SimulatedLimeConfig
+        """
+        backend = self.module.model.get_setting_by_name(
+            self.module.model.DRIVER_BACKEND
+        ).value
+        if backend == self.module.model.SIMULATOR:
+            return SimulatedLimeConfig
+        from limedriver.binding import PyLimeConfig
+
+        return PyLimeConfig
+
+    def setup_lime_parameters(self, lime: PyLimeConfig) -> None:
+        """Sets the parameters of the lime config according to the settings set in the spectrometer module.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+        """
+        # lime.noi (override_init) is set by the session of the measurement worker right before the run
+        # lime.nrp = 1
+        lime.repetitions = 1
+        lime = self.update_settings(lime)
+        lime = self.translate_pulse_sequence(lime)
+        lime.averages = self.module.model.averages
+        self.log_lime_parameters(lime)
+
+    def setup_temporary_storage(self, lime: PyLimeConfig) -> None:
+        """Sets up the temporary storage for the measurement data.
+
+        The storage is kept until release_temporary_storage is called for the limr object.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+        """
+        location = self.module.model.get_setting_by_name(
+            self.module.model.ACQUISITION_STORAGE
+        ).value
+        lime.save_path, lime.file_pattern = self.storage.allocate(location)
+        logger.debug("Storing the measurement at: %s", lime.save_path)
+
+    def get_archive(self) -> AcquisitionArchive:
+        """Returns the raw acquisition archive according to the archive settings.
+
+        Returns:
+            AcquisitionArchive: The archive or None if archiving is off
+        """
+        compression = self.module.model.get_setting_by_name(
+            self.module.model.RAW_ARCHIVE
+        ).value
+        if compression == ARCHIVE_OFF:
+            return None
+        directory = Path(
+            self.module.model.get_setting_by_name(
+                self.module.model.ARCHIVE_DIRECTORY
+            ).value
+        ).expanduser()
+        archive = self.archive
+        if (
+            archive is None
+            or archive.directory != directory
+            or archive.compression != compression
+        ):
+            if archive is not None:
+                # The queued acquisitions of the previous archive are still written
+                archive.shutdown(wait=False)
+            archive = self.archive = AcquisitionArchive(directory, compression)
+        return archive
+
+    def archive_acquisition(
+        self, lime: PyLimeConfig, name: str, context: dict
+    ) -> Path:
+        """Queues the raw acquisition of a measurement for the archive if archiving is on.
+
+        The configuration of the driver and the parameters that are needed to process the acquisition again are
+        stored with it. The acquisition file is kept until it is archived.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+            name (str): The name of the measurement
+            context (dict): The measurement context returned by prepare_measurement
+
+        Returns:
+            Path: The path of the archive file or None if archiving is off
+        """
+        archive = self.get_archive()
+        if archive is None:
+            return None
+        if (lime.save_path, lime.file_pattern) in self._streams:
+            logger.info("Streamed acquisitions are not archived")
+            return None
+
+        metadata = snapshot_lime_config(lime)
+        metadata.update(context["archive"], name=name)
+        path, archiving = archive.submit(lime.get_path(), metadata)
+        self._archiving[(lime.save_path, lime.file_pattern)] = archiving
+        archiving.add_done_callback(self.emit_acquisition_archived)
+        return path
+
+    def reprocess_archive(
+        self, path, rx_offset: float = None, dwell_time: float = None
+    ) -> MeasurementResult:
+        """Processes an archived acquisition again and emits the measurement.
+
+        Only the RX window is read from the archive file. Parameters that are not given are taken from the archive.
+
+        Args:
+            path (str): The path of the archive file
+            rx_offset (float): The RX offset in s
+            dwell_time (float): The dwell time in s, 0 for no resampling
+
+        Returns:
+            MeasurementResult: The measurement data
+        """
+        metadata = read_archive_metadata(path)
+        if rx_offset is None:
+            rx_offset = metadata["rx_offset"]
+        if dwell_time is None:
+            dwell_time = metadata["dwell_time"]
+
+        if "rx_window" in metadata:
+            offset = metadata["offset_first_pulse"] * (1 / metadata["srate"])
+            rx_begin, rx_stop = self.rx_event_bounds(
+                metadata["rx_window"], offset, rx_offset
+            )
+        else:
+            rx_begin, rx_stop = 0, metadata["rectime_secs"] * 1e6
+
+        job = ProcessingJob(
+            metadata["name"],
+            metadata["target_frequency"],
+            path=str(path),
+            rx_begin=rx_begin,
+            rx_stop=rx_stop,
+            scale=metadata["averages"],
+            frequency_shift=metadata["frequency_shift"],
+            if_frequency=metadata["if_frequency"],
+            dwell_time=dwell_time * 1e6,
+            engine=metadata["resampling_engine"],
+            srate=metadata["srate"],
+            archive_path=str(path),
+        )
+        measurement_data, _ = process_acquisition(job)
+        self.emit_measurement_data(measurement_data)
+        return measurement_data
+
+    def release_temporary_storage(self, lime: PyLimeConfig) -> None:
+        """Removes the measurement data of a processed or failed measurement.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+        """
+        key = (lime.save_path, lime.file_pattern)
+        self._streams.pop(key, None)
+        archiving = self._archiving.pop(key, None)
+        if archiving is None:
+            self.storage.release(*key)
+        else:
+            # The acquisition file is removed once it has been archived
+            archiving.add_done_callback(lambda _: self.storage.release(*key))
+
+    def perform_measurement(
+        self, lime: PyLimeConfig, context: dict, cancelled=None
+    ) -> bool:
+        """Executes the measurement procedure.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+            context (dict): The measurement context returned by prepare_measurement
+            cancelled (callable): Returns True if the measurement has been cancelled, checked between streamed blocks
+
+        Returns:
+            bool: True if the measurement was successful, False otherwise
+        """
+        logger.debug("Running the measurement procedure")
+        self.emit_status_message("Started Measurement")
+        try:
+            update_interval = context["streaming_interval"]
+            if update_interval and lime.averages > 1:
+                return self.perform_streaming_measurement(
+                    lime, context, cancelled
+                )
+            return self.worker.run_driver(lime)
+        except Exception as e:
+            logger.error("Failed to execute the measurement: %s", e)
+            return False
+
+    def perform_streaming_measurement(
+        self, lime: PyLimeConfig, context: dict, cancelled=None
+    ) -> bool:
+        """Acquires the averages in blocks and emits the running average after every block.
+
+        Every block is written to its own acquisition file, which is removed once the RX window has been read. The
+        running average is kept until release_temporary_storage is called for the limr object and is processed
+        instead of an acquisition file. Afterwards the averages of the limr object are the acquired averages.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+            context (dict): The measurement context with the update interval in s and the target SNR
+            cancelled (callable): Returns True if the measurement has been cancelled
+
+        Returns:
+            bool: True if the blocks were acquired, False if a block failed or the measurement was cancelled
+        """
+        location = context["storage"]
+        stream = AverageStream(
+            lime.averages, context["streaming_interval"], context["target_snr"]
+        )
+        key = (lime.save_path, lime.file_pattern)
+        rx_begin, rx_stop = context["rx_begin"], context["rx_stop"]
+        self._stop_streaming.clear()
+        logger.debug("Streaming %s averages", stream.averages)
+
+        tdx = None
+        try:
+            while not stream.done:
+                if cancelled is not None and cancelled():
+                    return False
+                block = stream.next_block()
+                lime.averages = block
+                lime.save_path, lime.file_pattern = self.storage.allocate(location)
+                try:
+                    started = time.perf_counter()
+                    if not self.worker.run_driver(lime):
+                        return False
+                    with AcquisitionReader(lime.get_path()) as reader:
+                        window = find_window(reader, rx_begin, rx_stop)
+                        if tdx is None:
+                            tdx = reader.time_axis.values(window.start, window.stop)
+                            tdx = tdx - tdx[0]
+                        block_sum = reader.read(window)
+                    stream.add(block_sum, block, time.perf_counter() - started)
+                finally:
+                    self.storage.release(lime.save_path, lime.file_pattern)
+
+                if self._stop_streaming.is_set():
+                    stream.stop()
+                self._streams[key] = (stream, tdx)
+                self.emit_streaming_measurement(stream, tdx, context)
+        finally:
+            lime.save_path, lime.file_pattern = key
+            lime.averages = stream.completed or stream.averages
+        return True
+
+    def find_rx_bounds(self, lime: PyLimeConfig) -> tuple:
+        """Returns the part of the acquisition that is evaluated.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+
+        Returns:
+            tuple: The start and stop time of the RX event in µs, the whole acquisition if there is no RX event
+        """
+        rx_begin, rx_stop = self.translate_rx_event(lime)
+        if rx_begin is None or rx_stop is None:
+            # Instead print the whole acquisition range
+            rx_begin = 0
+            rx_stop = lime.rectime_secs * 1e6
+
+        logger.debug("RX event begins at: %sµs and ends at: %sµs", rx_begin, rx_stop)
+        return rx_begin, rx_stop
+
+    def measurement_name(
+        self, averages: int, target_frequency: float = None, sequence_name: str = None
+    ) -> str:
+        """Returns the name of a measurement: date + module + target frequency + averages + sequence name.
+
+        Args:
+            averages (int): The number of averages of the measurement
+            target_frequency (float): The target frequency in Hz, None for the one of the model
+            sequence_name (str): The name of the pulse sequence, None for the current pulse sequence
+
+        Returns:
+            str: The name of the measurement
+        """
+        if target_frequency is None:
+            target_frequency = self.module.model.target_frequency
+        if sequence_name is None:
+            sequence_name = self.get_pulse_sequence().name
+        return f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - LimeNQR - {target_frequency / 1e6} MHz - {averages} averages - {sequence_name}.quack"
+
+    def streamed_measurement_name(self, context: dict, stream: AverageStream) -> str:
+        """Returns the name of the running average of a streamed measurement.
+
+        Args:
+            context (dict): The measurement context returned by prepare_measurement
+            stream (AverageStream): The running average of the acquired blocks
+
+        Returns:
+            str: The name of the measurement with the acquired averages
+        """
+        return self.measurement_name(
+            stream.completed,
+            context["settings"]["target_frequency"],
+            context["sequence_name"],
+        )
+
+    def get_fft_shift(self) -> int:
+        """Rreturns the FFT shift value from the settings.
+
+        Returns:
+            int: The FFT shift value
+        """
+        fft_shift_enabled = self.module.model.get_setting_by_name(
+            self.module.model.FFT_SHIFT
+        ).value
+        return self.module.model.if_frequency if fft_shift_enabled else 0
+
+    def to_measurement(self, measurement_data: MeasurementResult):
+        """Returns the object that is emitted for the measurement data.
+
+        The results are emitted as they are, LimeNQRController converts them into nqrduck Measurements.
+
+        Args:
+            measurement_data (MeasurementResult): The measurement data
+
+        Returns:
+            MeasurementResult: The measurement data
+        """
+        return measurement_data
+
+    def emit_measurement_data(self, measurement_data: MeasurementResult) -> None:
+        """Emits the measurement data to the GUI.
+
+        Args:
+            measurement_data (MeasurementResult): The measurement data
+        """
+        logger.debug("Emitting measurement data")
+        self.module.nqrduck_signal.emit(
+            "measurement_data", self.to_measurement(measurement_data)
+        )
+
+    def emit_sweep_measurement(self, index: int, name: str, value, future) -> None:
+        """Emits the measurement of a sweep point when it has been processed.
+
+        Args:
+            index (int): The index of the point in the sweep
+            name (str): The name of the swept parameter
+            value (object): The value of the parameter at the point
+            future (Future): The future of the measurement of the point
+        """
+        if future.cancelled() or future.exception() is not None:
+            return
+        measurement_data = future.result()
+        if measurement_data is not None:
+            self.module.nqrduck_signal.emit(
+                "sweep_measurement",
+                (index, name, value, self.to_measurement(measurement_data)),
+            )
+
+    def emit_streaming_measurement(
+        self, stream: AverageStream, tdx: np.ndarray, context: dict
+    ) -> None:
+        """Emits the running average of a streamed acquisition and the progress of the acquisition.
+
+        Args:
+            stream (AverageStream): The running average of the acquired blocks
+            tdx (np.ndarray): The time vector of the RX window in µs
+            context (dict): The measurement context returned by prepare_measurement
+        """
+        job = ProcessingJob(
+            self.streamed_measurement_name(context, stream),
+            buffers=(tdx, stream.mean),
+            **context["settings"],
+        )
+        measurement_data, _ = process_acquisition(job)
+        snr = stream.snr()
+        measurement_data.snr = snr
+        logger.debug(
+            "Streamed %s of %s averages, SNR: %s",
+            stream.completed,
+            stream.averages,
+            snr,
+        )
+        self.module.nqrduck_signal.emit(
+            "streaming_measurement", self.to_measurement(measurement_data)
+        )
+        self.emit_measurement_progress(
+            1 / 3 + min(stream.completed / stream.averages, 1.0) / 3
+        )
+
+    def emit_acquisition_archived(self, future) -> None:
+        """Emits the path of an archived acquisition or logs why it could not be archived.
+
+        Args:
+            future (Future): The future of the archive file
+        """
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error("Error archiving acquisition: %s", future.exception())
+            return
+        self.module.nqrduck_signal.emit("acquisition_archived", str(future.result()))
+
+    def emit_status_message(self, message: str) -> None:
+        """Emits a status message to the GUI.
+
+        Args:
+            message (str): The status message
+        """
+        self.module.nqrduck_signal.emit("statusbar_message", message)
+
+    def emit_measurement_error(self, error_message: str) -> None:
+        """Emits a measurement error to the GUI.
+
+        Args:
+            error_message (str): The error message
+        """
+        logger.error(error_message)
+        self.module.nqrduck_signal.emit("measurement_error", error_message)
+
+    def emit_measurement_progress(self, progress: float) -> None:
+        """Emits the progress of the running measurement to the GUI.
+
+        Args:
+            progress (float): The fraction of the measurement procedure that is done, between 0 and 1
+        """
+        self.module.nqrduck_signal.emit("measurement_progress", progress)
+
+    def emit_measurement_cancelled(self) -> None:
+        """Emits that the measurement was cancelled to the GUI."""
+        self.emit_status_message("Measurement cancelled")
+        self.module.nqrduck_signal.emit("measurement_cancelled", None)
+
+    def log_lime_parameters(self, lime: PyLimeConfig) -> None:
+        """Logs the parameters of the limr object.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+        """
+        # for key, value in lime.__dict__.items():
+        # logger.debug("Lime parameter %s has value %s", key, value)
+        logger.debug("Lime parameter %s has value %s", "srate", lime.srate)
+
+    def update_settings(self, lime: PyLimeConfig) -> PyLimeConfig:
+        """Sets the parameters of the limr object according to the settings set in the spectrometer module.
+
+        Only the settings that changed since the previous measurement are converted, see DriverSettings.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+
+        Returns:
+            lime: The updated limr object
+        """
+        logger.debug(
+            "Updating settings for spectrometer: %s for measurement",
+            self.module.model.name,
+        )
+        changed = self.driver_settings.update(self.module.model)
+        if self.module.model.IF_FREQUENCY in changed:
+            self.module.model.if_frequency = self.module.model.get_setting_by_name(
+                self.module.model.IF_FREQUENCY
+            ).get_setting()
+        self.driver_settings.apply(lime)
+        return lime
+
+    def translate_pulse_sequence(self, lime: PyLimeConfig) -> PyLimeConfig:
+        """Ttranslates the pulse sequence to the limr object.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+        """
+        compiled_sequence = self.compile_pulse_sequence()
+        # Set repetition time event as last event's duration and update number of pulses
+        compiled_sequence.apply(lime)
+        return lime
+
+    def compile_pulse_sequence(self) -> CompiledSequence:
+        """Returns the compiled pulse sequence, repeated calls for an unchanged sequence are served from the cache.
+
+        The IF frequency and the sampling rate are taken from the settings, so the sequence can be compiled before the limr object exists.
+
+        Returns:
+            CompiledSequence: The pulse arrays and the RX window of the pulse sequence
+        """
+        events = self.fetch_pulse_sequence_events()
+        if_frequency = self.module.model.get_setting_by_name(
+            self.module.model.IF_FREQUENCY
+        ).get_setting()
+        srate = self.module.model.get_setting_by_name(
+            self.module.model.SAMPLING_FREQUENCY
+        ).get_setting()
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for event in events:
+                self.log_event_details(event)
+                for parameter in event.parameters.values():
+                    self.log_parameter_details(parameter)
+
+        return self.sequence_cache.get(events, if_frequency, srate)
+
+    def get_number_of_pulses(self) -> int:
+        """Calculates the number of pulses in the pulse sequence before the LimeDriverBinding is initialized.
+
+        This makes sure it"s initialized with the correct size of the pulse lists. The sequence is compiled in the
+        same pass, so translate_pulse_sequence does not evaluate the pulse shapes again.
+
+        Returns:
+            int: The number of pulses in the pulse sequence
+        """
+        num_pulses = self.compile_pulse_sequence().n_pulses
+        logger.debug("Number of pulses: %s", num_pulses)
+        return num_pulses
+
+    # Helper functions below:
+
+    def get_pulse_sequence(self):
+        """Returns the pulse sequence that is measured, the one of the pulse programmer module.
+
+        Returns:
+            PulseSequence: The pulse sequence with its name and events
+        """
+        return self.module.model.pulse_programmer.model.pulse_sequence
+
+    def fetch_pulse_sequence_events(self) -> list:
+        """Fetches the pulse sequence events from the pulse programmer module.
+
+        Returns:
+            list: The pulse sequence events
+        """
+        return self.get_pulse_sequence().events
+
+    def log_event_details(self, event) -> None:
+        """Logs the details of an event."""
+        logger.debug("Event %s has parameters: %s", event.name, event.parameters)
+
+    def log_parameter_details(self, parameter) -> None:
+        """Logs the details of a parameter."""
+        logger.debug("Parameter %s has options: %s", parameter.name, parameter.options)
+
+    def translate_rx_event(self, lime: PyLimeConfig) -> tuple:
+        """This method translates the RX event of the pulse sequence to the limr object.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+
+        Returns:
+            tuple: A tuple containing the start and stop time of the RX event in µs
+        """
+        CORRECTION_FACTOR = self.module.model.get_setting_by_name(
+            self.module.model.RX_OFFSET
+        ).value
+        rx_window = self.compile_pulse_sequence().rx_window
+        if rx_window is None:
+            return None, None
+
+        offset = self.calculate_offset(lime)
+        return self.rx_event_bounds(rx_window, offset, CORRECTION_FACTOR)
+
+    @staticmethod
+    def rx_event_bounds(rx_window: tuple, offset: float, correction: float) -> tuple:
+        """Returns the start and stop time of the RX event in the acquisition.
+
+        Args:
+            rx_window (tuple): The start and the duration of the RX event in the pulse sequence in s
+            offset (float): The offset of the first pulse in s
+            correction (float): The RX offset setting in s
+
+        Returns:
+            tuple: A tuple containing the start and stop time of the RX event in µs
+        """
+        previous_events_duration, rx_duration = rx_window
+        rx_begin = float(previous_events_duration) + float(offset) + float(correction)
+        rx_stop = rx_begin + rx_duration
+        return rx_begin * 1e6, rx_stop * 1e6
+
+    def calculate_offset(self, lime: PyLimeConfig) -> float:
+        """This method calculates the offset for the RX event.
+
+        Args:
+            lime (limr): The limr object that is used to communicate with the pulseN driver
+
+        Returns:
+            float: The offset for the RX event
+        """
+        return self.module.model.OFFSET_FIRST_PULSE * (1 / lime.srate)
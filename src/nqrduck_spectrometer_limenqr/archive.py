@@ -0,0 +1,160 @@
+"""Archive of the raw acquisitions for later reprocessing.
+
+The acquisition file of the driver is removed after the measurement has been processed. The archive keeps a
+compressed copy of every acquisition together with the driver configuration and the processing parameters, so a
+measurement can be processed again, e.g. with another RX offset or dwell time, without acquiring it again.
+
+Every acquisition is written to its own HDF file. The datasets keep the layout and the attributes of the driver,
+so the files can be read with AcquisitionReader, the configuration and processing parameters are stored as
+attributes of the file. The files are written on a separate thread.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import count
+from pathlib import Path
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Compression filters
+OFF = "Off"
+LZF = "lzf"
+GZIP = "gzip"
+BLOSC = "blosc"
+
+COMPRESSIONS = [OFF, LZF, GZIP, BLOSC]
+
+
+def compression_options(compression: str) -> dict:
+    """Returns the arguments of h5py.Group.create_dataset for a compression filter.
+
+    Blosc needs the optional hdf5plugin package, without it the data is compressed with lzf.
+
+    Args:
+        compression (str): One of COMPRESSIONS
+
+    Returns:
+        dict: The compression arguments
+    """
+    if compression == BLOSC:
+        try:
+            import hdf5plugin
+        except ImportError:
+            logger.warning("Blosc compression needs hdf5plugin, compressing with lzf instead")
+            return {"compression": LZF}
+        return dict(hdf5plugin.Blosc(cname="lz4", clevel=5, shuffle=hdf5plugin.Blosc.SHUFFLE))
+    if compression == GZIP:
+        return {"compression": GZIP, "compression_opts": 4}
+    if compression == LZF:
+        return {"compression": LZF}
+    return {}
+
+
+def read_archive_metadata(path) -> dict:
+    """Returns the configuration and processing parameters of an archived acquisition.
+
+    Args:
+        path (str): The path of the archive file
+
+    Returns:
+        dict: The attributes of the archive file
+    """
+    import h5py
+
+    with h5py.File(path, "r") as file:
+        return {
+            name: value.tolist() if isinstance(value, np.ndarray) else value
+            for name, value in file.attrs.items()
+        }
+
+
+class AcquisitionArchive:
+    """Writes compressed copies of acquisition files on a background thread.
+
+    Args:
+        directory (str): The directory of the archive files
+        compression (str): One of COMPRESSIONS
+        chunk_samples (int): The number of samples per chunk of the archived datasets
+
+    Attributes:
+        directory (Path): The directory of the archive files
+        compression (str): One of COMPRESSIONS
+        chunk_samples (int): The number of samples per chunk of the archived datasets
+    """
+
+    def __init__(self, directory, compression: str = LZF, chunk_samples: int = 1 << 14) -> None:
+        """Initializes the AcquisitionArchive."""
+        self.directory = Path(directory)
+        self.compression = compression
+        self.chunk_samples = chunk_samples
+        self._counter = count()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="limenqr-archive")
+
+    def submit(self, source, metadata: dict) -> tuple:
+        """Queues the archiving of an acquisition file.
+
+        The source file must not be removed before the returned future is done.
+
+        Args:
+            source (str): The path of the acquisition file of the driver
+            metadata (dict): The configuration and processing parameters stored with the acquisition
+
+        Returns:
+            tuple: The path of the archive file and a Future that resolves to it once it is written
+        """
+        with self._lock:
+            index = next(self._counter)
+        path = self.directory / f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{index:04d}.h5"
+        return path, self._executor.submit(self.write, source, path, dict(metadata))
+
+    def write(self, source, path: Path, metadata: dict) -> Path:
+        """Writes the archive file of an acquisition.
+
+        Args:
+            source (str): The path of the acquisition file of the driver
+            path (Path): The path of the archive file
+            metadata (dict): The configuration and processing parameters stored with the acquisition
+
+        Returns:
+            Path: The path of the archive file
+        """
+        import h5py
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        options = compression_options(self.compression)
+        # The pulse arrays of long sequences exceed the 64 kB limit of compact attributes
+        with h5py.File(source, "r") as acquisition, h5py.File(path, "w", libver="latest") as archive:
+            for name, dataset in acquisition.items():
+                n_rows, row_length = dataset.shape
+                chunk_length = min(row_length, 2 * self.chunk_samples)
+                copy = archive.create_dataset(
+                    name,
+                    shape=dataset.shape,
+                    dtype=dataset.dtype,
+                    chunks=(1, chunk_length) if row_length else None,
+                    **options,
+                )
+                for attribute, value in dataset.attrs.items():
+                    copy.attrs[attribute] = value
+                # One row at a time, the rows of long acquisitions are large
+                for row in range(n_rows):
+                    copy[row] = dataset[row]
+
+            for name, value in metadata.items():
+                if value is None:
+                    continue
+                archive.attrs[name] = np.asarray(value) if isinstance(value, (list, tuple)) else value
+        logger.debug("Archived %s as %s", source, path)
+        return path
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the archive thread.
+
+        Args:
+            wait (bool): Whether the queued acquisitions are written before returning
+        """
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,395 @@
+"""Unattended batch acquisitions from the command line.
+
+A batch file is a JSON file with the settings of the campaign, named pulse sequences and the measurements::
+
+    {
+        "settings": {"RX Gain": 40},
+        "sequences": {
+            "fid": [
+                {"name": "pi/2", "duration": "3e-6", "tx": {"amplitude": 100, "shape": "rectangular"}},
+                {"name": "dead time", "duration": "20e-6"},
+                {"name": "rx", "duration": "100e-6", "rx": true},
+                {"name": "repetition", "duration": "1e-3"}
+            ],
+            "echo": "echo.json"
+        },
+        "measurements": [
+            {"sequence": "fid", "target_frequency": [83.50e6, 83.55e6, 83.60e6], "averages": 100},
+            {"sequence": "echo", "target_frequency": 83.56e6, "averages": 1000, "settings": {"TX Gain": 20}}
+        ]
+    }
+
+A sequence is a list of events or the path of a JSON file with the list, relative to the batch file. The shape of a
+transmit pulse is one of SHAPES. A list of target frequencies expands into one measurement per frequency. The
+settings of a measurement override the settings of the campaign for this measurement only: every measurement is
+run with all settings, the defaults overridden by the campaign and then by the measurement, so it does not depend
+on the measurements before it or on where a resumed batch starts.
+
+The measurements are run back to back by HeadlessLimeNQR, so the device is only initialized when a device setting
+changes. Every measurement is written to the output directory as soon as it is processed and recorded in the
+journal, a rerun of the batch skips the recorded measurements. At the end the throughput is reported.
+Run ``limenqr-batch campaign.json --simulate`` to test a batch with the simulated driver.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+from .headless import HeadlessLimeNQR, HeadlessModel, PulseSequence, PulseShape, blank_event, rx_event, tx_event
+from .settings import LimeNQRSettings
+
+logger = logging.getLogger(__name__)
+
+JOURNAL = "journal.jsonl"
+SUMMARY = "summary.json"
+
+# Envelopes of the transmit pulses over the time normalized to the pulse length
+SHAPES = {
+    "rectangular": None,
+    "sinc": lambda t: np.sinc(8 * (t - 0.5)),
+    "gaussian": lambda t: np.exp(-0.5 * ((t - 0.5) / 0.15) ** 2),
+}
+
+
+class BatchPoint:
+    """A single measurement of a batch.
+
+    Args:
+        index (int): The position of the measurement in the batch
+        sequence_name (str): The name of the pulse sequence
+        events (list): The events of the pulse sequence as in the batch file
+        target_frequency (float): The target frequency in Hz
+        averages (int): The number of averages
+        settings (dict): All settings of the measurement
+
+    Attributes:
+        index (int): The position of the measurement in the batch
+        sequence_name (str): The name of the pulse sequence
+        events (list): The events of the pulse sequence as in the batch file
+        target_frequency (float): The target frequency in Hz
+        averages (int): The number of averages
+        settings (dict): All settings of the measurement
+        key (str): The hash of the parameters, a recorded measurement is only skipped if its parameters are unchanged
+    """
+
+    def __init__(
+        self,
+        index: int,
+        sequence_name: str,
+        events: list,
+        target_frequency: float,
+        averages: int,
+        settings: dict,
+    ) -> None:
+        """Initializes the BatchPoint."""
+        self.index = index
+        self.sequence_name = sequence_name
+        self.events = events
+        self.target_frequency = float(target_frequency)
+        self.averages = int(averages)
+        self.settings = settings
+        content = [sequence_name, events, self.target_frequency, self.averages, settings]
+        self.key = hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def file_name(self) -> str:
+        """The name of the result file of the measurement."""
+        return f"{self.index:05d}.npz"
+
+    def pulse_sequence(self) -> PulseSequence:
+        """Returns the pulse sequence of the measurement.
+
+        Raises:
+            ValueError: If an event has an unknown pulse shape
+        """
+        return PulseSequence(self.sequence_name, [build_event(event) for event in self.events])
+
+
+def build_event(event: dict):
+    """Returns the event of the headless API for an event of a batch file.
+
+    Args:
+        event (dict): The name, the duration in s and optionally tx with amplitude and shape or rx
+
+    Returns:
+        Event: The event
+
+    Raises:
+        ValueError: If the pulse shape is unknown
+    """
+    if "tx" in event:
+        tx = event["tx"]
+        shape_name = tx.get("shape", "rectangular")
+        if shape_name not in SHAPES:
+            raise ValueError(f"Unknown pulse shape {shape_name}, the shapes are {list(SHAPES)}")
+        shape = PulseShape(SHAPES[shape_name], shape_name)
+        return tx_event(event["name"], event["duration"], tx.get("amplitude", 100), shape)
+    if event.get("rx"):
+        return rx_event(event["name"], event["duration"])
+    return blank_event(event["name"], event["duration"])
+
+
+def load_batch(path) -> list:
+    """Reads a batch file and returns its measurements.
+
+    Args:
+        path (str): The path of the batch file
+
+    Returns:
+        list: The BatchPoint of every measurement
+
+    Raises:
+        ValueError: If a measurement refers to an unknown sequence, a setting does not exist or has an invalid value
+    """
+    path = Path(path)
+    batch = json.loads(path.read_text())
+    sequences = {}
+    for name, events in batch.get("sequences", {}).items():
+        if isinstance(events, str):
+            events = json.loads((path.parent / events).read_text())
+        sequences[name] = events
+
+    campaign_settings = batch.get("settings", {})
+    points = []
+    for entry in batch["measurements"]:
+        sequence_name = entry["sequence"]
+        if sequence_name not in sequences:
+            raise ValueError(f"Measurement refers to unknown sequence {sequence_name}")
+        # Every point sets all settings, so the overrides of a measurement do not carry over to the next ones
+        settings = dict(LimeNQRSettings.DEFAULTS)
+        settings.update(campaign_settings)
+        settings.update(entry.get("settings", {}))
+        # Invalid settings raise before the first measurement is run
+        HeadlessModel(settings)
+        frequencies = entry["target_frequency"]
+        if not isinstance(frequencies, list):
+            frequencies = [frequencies]
+        for frequency in frequencies:
+            points.append(
+                BatchPoint(
+                    len(points),
+                    sequence_name,
+                    sequences[sequence_name],
+                    frequency,
+                    entry.get("averages", 1),
+                    settings,
+                )
+            )
+    return points
+
+
+def read_journal(output: Path) -> dict:
+    """Returns the recorded measurements of the output directory by index.
+
+    Args:
+        output (Path): The output directory
+
+    Returns:
+        dict: The journal entry of every measurement that was written
+    """
+    journal = output / JOURNAL
+    if not journal.exists():
+        return {}
+    done = {}
+    with open(journal) as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line of an interrupted run can be incomplete
+                continue
+            if entry.get("file") is not None:
+                done[entry["index"]] = entry
+    return done
+
+
+def write_measurement(output: Path, point: BatchPoint, measurement_data) -> None:
+    """Writes a measurement next to its point, the file only appears once it is complete.
+
+    Args:
+        output (Path): The output directory
+        point (BatchPoint): The measurement of the batch
+        measurement_data (Measurement): The measurement data
+    """
+    path = output / point.file_name
+    partial_path = path.with_name(path.name + ".partial")
+    with open(partial_path, "wb") as file:
+        np.savez(
+            file,
+            tdx=measurement_data.tdx,
+            tdy=measurement_data.tdy,
+            name=measurement_data.name,
+            target_frequency=measurement_data.target_frequency,
+            if_frequency=getattr(measurement_data, "IF_frequency", 0.0),
+            frequency_shift=getattr(measurement_data, "frequency_shift", 0.0),
+            averages=point.averages,
+            sequence=point.sequence_name,
+            settings=json.dumps(point.settings),
+        )
+    os.replace(partial_path, path)
+
+
+def append_journal(output: Path, entry: dict) -> None:
+    """Appends an entry to the journal and flushes it to disk.
+
+    Args:
+        output (Path): The output directory
+        entry (dict): The entry
+    """
+    with open(output / JOURNAL, "a") as file:
+        file.write(json.dumps(entry) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def run_batch(
+    points: list,
+    output: Path,
+    settings: dict = None,
+    resume: bool = True,
+    stop_on_error: bool = False,
+) -> dict:
+    """Runs the measurements of a batch that are not recorded in the journal of the output directory.
+
+    All measurements are queued at once, so each one is acquired while the previous one is processed and written.
+
+    Args:
+        points (list): The BatchPoint of every measurement
+        output (Path): The output directory
+        settings (dict): Settings for all measurements, e.g. the driver backend, they override the batch file
+        resume (bool): Whether recorded measurements are skipped
+        stop_on_error (bool): Whether the batch is cancelled after the first failed measurement
+
+    Returns:
+        dict: The summary of the run with the throughput in measurements per hour
+    """
+    output.mkdir(parents=True, exist_ok=True)
+    done = read_journal(output) if resume else {}
+    journal = output / JOURNAL
+    if journal.exists() and journal.stat().st_size:
+        with open(journal, "rb+") as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b"\n":
+                # Terminates the incomplete last line of an interrupted run
+                file.write(b"\n")
+    pending = [
+        point
+        for point in points
+        if point.index not in done or done[point.index]["key"] != point.key
+    ]
+    logger.info("%s of %s measurements are recorded, %s to run", len(points) - len(pending), len(points), len(pending))
+
+    completed = failed = 0
+    errors = []
+    spectrometer = HeadlessLimeNQR()
+    spectrometer.nqrduck_signal.connect(
+        lambda key, value: errors.append(value) if key == "measurement_error" else None
+    )
+    started = time.perf_counter()
+    interrupted = False
+    try:
+        futures = [
+            spectrometer.submit(
+                point.pulse_sequence(),
+                point.target_frequency,
+                point.averages,
+                dict(point.settings, **(settings or {})),
+            )
+            for point in pending
+        ]
+        for point, future in zip(pending, futures):
+            measurement_data = future.result()
+            entry = {"index": point.index, "key": point.key, "time": time.time()}
+            if measurement_data is None:
+                failed += 1
+                # The measurements are serial, so the errors arrive in the order of the failed measurements
+                entry.update(file=None, error=errors.pop(0) if errors else "Measurement failed")
+                logger.error("Measurement %s failed: %s", point.index, entry["error"])
+                append_journal(output, entry)
+                if stop_on_error:
+                    spectrometer.cancel_measurement()
+                    break
+                continue
+            write_measurement(output, point, measurement_data)
+            entry.update(file=point.file_name, name=measurement_data.name)
+            append_journal(output, entry)
+            completed += 1
+            logger.info("Measurement %s of %s written", point.index + 1, len(points))
+    except KeyboardInterrupt:
+        interrupted = True
+        logger.warning("Interrupted, the batch resumes with the next unrecorded measurement")
+        spectrometer.cancel_measurement()
+    finally:
+        elapsed = time.perf_counter() - started
+        session = spectrometer.worker.session
+        spectrometer.close()
+
+    summary = {
+        "measurements": len(points),
+        "skipped": len(points) - len(pending),
+        "completed": completed,
+        "failed": failed,
+        "remaining": len(pending) - completed,
+        "interrupted": interrupted,
+        "elapsed_s": elapsed,
+        "measurements_per_hour": completed / elapsed * 3600 if elapsed > 0 else 0.0,
+        "device_initializations": session.init_count,
+        "driver_runs": session.run_count,
+    }
+    with open(output / SUMMARY, "w") as file:
+        json.dump(summary, file, indent=2)
+    return summary
+
+
+def main(argv: list = None) -> int:
+    """Runs a batch file from the command line.
+
+    Args:
+        argv (list): The command line arguments, None for sys.argv
+
+    Returns:
+        int: The exit code, 0 if all measurements are recorded
+    """
+    parser = argparse.ArgumentParser(description="Runs the measurements of a LimeNQR batch file.")
+    parser.add_argument("batch", help="The JSON batch file")
+    parser.add_argument("--output", help="The output directory, by default next to the batch file")
+    parser.add_argument("--simulate", action="store_true", help="Runs the batch with the simulated driver")
+    parser.add_argument("--realtime", action="store_true", help="Simulated runs take as long as on the hardware")
+    parser.add_argument("--restart", action="store_true", help="Runs all measurements, ignoring the journal")
+    parser.add_argument("--stop-on-error", action="store_true", help="Cancels the batch after a failed measurement")
+    parser.add_argument("--log-level", default="INFO", help="The logging level")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(message)s")
+    batch = Path(args.batch)
+    output = Path(args.output) if args.output else batch.with_name(batch.stem + "_results")
+    settings = {}
+    if args.simulate:
+        from .simulator import SimulatedLimeConfig
+
+        SimulatedLimeConfig.realtime = args.realtime
+        settings[LimeNQRSettings.DRIVER_BACKEND] = LimeNQRSettings.SIMULATOR
+
+    points = load_batch(batch)
+    summary = run_batch(points, output, settings, not args.restart, args.stop_on_error)
+    print(
+        f"{summary['completed']} measurements in {summary['elapsed_s']:.1f} s, "
+        f"{summary['measurements_per_hour']:.0f} measurements per hour"
+    )
+    print(
+        f"{summary['skipped']} recorded before, {summary['failed']} failed, {summary['remaining']} remaining, "
+        f"{summary['device_initializations']} device initializations in {summary['driver_runs']} runs"
+    )
+    if summary["interrupted"]:
+        return 130
+    return 0 if summary["remaining"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Mapping of the spectrometer settings to the attributes of the driver configuration.
+
+SETTING_MAPPINGS declares for every setting of LimeNQRSettings that is passed to the driver the PyLimeConfig attribute
+it sets and how the value is converted. The mapping is validated when the module is imported. DriverSettings keeps
+the converted values between measurements and only converts the settings that the model reports as changed.
+"""
+
+import logging
+import threading
+
+from .settings import LimeNQRSettings
+from .worker import LIME_CONFIG_ATTRIBUTES
+
+logger = logging.getLogger(__name__)
+
+
+def setting_value(setting, model: LimeNQRSettings):
+    """Returns the value of a setting as the driver expects it."""
+    return setting.get_setting()
+
+
+def gate_value(setting, model: LimeNQRSettings) -> int:
+    """Returns the value of a gate setting as an element of c3_tim."""
+    return int(setting.get_setting())
+
+
+def gate_enable_value(setting, model: LimeNQRSettings) -> int:
+    """Returns the gate enable setting as the first element of c3_tim."""
+    return int(setting.value)
+
+
+def lo_frequency(setting, model: LimeNQRSettings) -> float:
+    """Returns the local oscillator frequency for the IF frequency setting."""
+    return model.target_frequency - setting.get_setting()
+
+
+class SettingMapping:
+    """How a setting is applied to the driver configuration.
+
+    Args:
+        setting (str): The name of the setting
+        attribute (str): The attribute of the PyLimeConfig object
+        convert (callable): Returns the value of the attribute for the setting and the model
+        index (int): The element of a list attribute that is set, None if the setting sets the whole attribute
+        depends_on (tuple): Other names reported by LimeNQRSettings.take_changed_settings that change the value
+
+    Attributes:
+        setting (str): The name of the setting
+        attribute (str): The attribute of the PyLimeConfig object
+        convert (callable): Returns the value of the attribute for the setting and the model
+        index (int): The element of a list attribute that is set, None if the setting sets the whole attribute
+        depends_on (tuple): Other names reported by LimeNQRSettings.take_changed_settings that change the value
+    """
+
+    def __init__(
+        self,
+        setting: str,
+        attribute: str,
+        convert=setting_value,
+        index: int = None,
+        depends_on: tuple = (),
+    ) -> None:
+        """Initializes the SettingMapping."""
+        self.setting = setting
+        self.attribute = attribute
+        self.convert = convert
+        self.index = index
+        self.depends_on = depends_on
+
+
+# Length and initial value of the list attributes that are assembled from several settings
+LIST_ATTRIBUTES = {
+    "c3_tim": [0, 0, 0, 0],
+}
+
+SETTING_MAPPINGS = (
+    # Acquisition settings
+    SettingMapping(LimeNQRSettings.SAMPLING_FREQUENCY, "srate"),
+    SettingMapping(LimeNQRSettings.CHANNEL, "channel"),
+    SettingMapping(LimeNQRSettings.TX_MATCHING, "TX_matching"),
+    SettingMapping(LimeNQRSettings.RX_MATCHING, "RX_matching"),
+    # Careful this doesn't only set the IF frequency but the local oscillator frequency
+    SettingMapping(
+        LimeNQRSettings.IF_FREQUENCY,
+        "frq",
+        lo_frequency,
+        depends_on=(LimeNQRSettings.TARGET_FREQUENCY,),
+    ),
+    SettingMapping(LimeNQRSettings.ACQUISITION_TIME, "rectime_secs"),
+    # Gate settings
+    SettingMapping(LimeNQRSettings.GATE_ENABLE, "c3_tim", gate_enable_value, index=0),
+    SettingMapping(LimeNQRSettings.GATE_PADDING_LEFT, "c3_tim", gate_value, index=1),
+    SettingMapping(LimeNQRSettings.GATE_SHIFT, "c3_tim", gate_value, index=2),
+    SettingMapping(LimeNQRSettings.GATE_PADDING_RIGHT, "c3_tim", gate_value, index=3),
+    # RX/TX settings
+    SettingMapping(LimeNQRSettings.TX_GAIN, "TX_gain"),
+    SettingMapping(LimeNQRSettings.RX_GAIN, "RX_gain"),
+    SettingMapping(LimeNQRSettings.RX_LPF_BW, "RX_LPF"),
+    SettingMapping(LimeNQRSettings.TX_LPF_BW, "TX_LPF"),
+    # Calibration settings
+    SettingMapping(LimeNQRSettings.TX_I_DC_CORRECTION, "TX_IcorrDC"),
+    SettingMapping(LimeNQRSettings.TX_Q_DC_CORRECTION, "TX_QcorrDC"),
+    # This stuff doesn't seem to be implemented in the LimeDriver
+    SettingMapping(LimeNQRSettings.TX_I_GAIN_CORRECTION, "TX_IcorrGain"),
+    SettingMapping(LimeNQRSettings.TX_Q_GAIN_CORRECTION, "TX_QcorrGain"),
+    SettingMapping(LimeNQRSettings.TX_PHASE_ADJUSTMENT, "TX_IQcorrPhase"),
+    SettingMapping(LimeNQRSettings.RX_I_GAIN_CORRECTION, "RX_IcorrGain"),
+    SettingMapping(LimeNQRSettings.RX_Q_GAIN_CORRECTION, "RX_QcorrGain"),
+    SettingMapping(LimeNQRSettings.RX_PHASE_ADJUSTMENT, "RX_IQcorrPhase"),
+)
+
+# Settings that are used by the controller but not passed to the driver
+UNMAPPED_SETTINGS = (
+    LimeNQRSettings.RX_DWELL_TIME,
+    LimeNQRSettings.DRIVER_BACKEND,
+    LimeNQRSettings.ACQUISITION_STORAGE,
+    LimeNQRSettings.RAW_ARCHIVE,
+    LimeNQRSettings.ARCHIVE_DIRECTORY,
+    LimeNQRSettings.STREAMING_INTERVAL,
+    LimeNQRSettings.TARGET_SNR,
+    # The LimeDriver has no RX DC correction
+    LimeNQRSettings.RX_I_DC_CORRECTION,
+    LimeNQRSettings.RX_Q_DC_CORRECTION,
+    LimeNQRSettings.RX_OFFSET,
+    LimeNQRSettings.FFT_SHIFT,
+    LimeNQRSettings.RESAMPLING_ENGINE,
+    LimeNQRSettings.PROFILING,
+    LimeNQRSettings.POST_PROCESSING,
+)
+
+
+def validate_mappings(mappings: tuple, unmapped: tuple) -> None:
+    """Checks that every setting and every driver attribute is mapped at most once.
+
+    Args:
+        mappings (tuple): The SettingMapping of every mapped setting
+        unmapped (tuple): The names of the settings that are not passed to the driver
+
+    Raises:
+        ValueError: If the mappings are inconsistent
+    """
+    settings = set()
+    targets = set()
+    for mapping in mappings:
+        if mapping.setting in settings or mapping.setting in unmapped:
+            raise ValueError(f"Setting {mapping.setting} is mapped more than once")
+        settings.add(mapping.setting)
+
+        if mapping.attribute not in LIME_CONFIG_ATTRIBUTES:
+            raise ValueError(f"{mapping.attribute} of {mapping.setting} is not a driver attribute")
+        if mapping.index is None:
+            if mapping.attribute in LIST_ATTRIBUTES:
+                raise ValueError(f"Setting {mapping.setting} needs an index of {mapping.attribute}")
+        elif not 0 <= mapping.index < len(LIST_ATTRIBUTES.get(mapping.attribute, ())):
+            raise ValueError(f"Index {mapping.index} of {mapping.setting} is not an element of {mapping.attribute}")
+
+        target = (mapping.attribute, mapping.index)
+        if target in targets:
+            raise ValueError(f"{mapping.attribute} is set by more than one setting")
+        targets.add(target)
+
+
+validate_mappings(SETTING_MAPPINGS, UNMAPPED_SETTINGS)
+
+
+class DriverSettings:
+    """The driver attributes for the settings of a model, converted incrementally.
+
+    Only the settings that changed since the previous update are converted. Every attribute that is set by a mapping
+    is applied to the driver configuration, because a new configuration is created for every measurement.
+
+    Args:
+        mappings (tuple): The SettingMapping of every mapped setting
+        unmapped (tuple): The names of the settings that are not passed to the driver
+
+    Attributes:
+        mappings (tuple): The SettingMapping of every mapped setting
+        unmapped (tuple): The names of the settings that are not passed to the driver
+    """
+
+    def __init__(self, mappings: tuple = SETTING_MAPPINGS, unmapped: tuple = UNMAPPED_SETTINGS) -> None:
+        """Initializes the DriverSettings."""
+        self.mappings = mappings
+        self.unmapped = unmapped
+        self._lock = threading.Lock()
+        self._values = {
+            attribute: list(value) for attribute, value in LIST_ATTRIBUTES.items()
+        }
+        self._triggers = {}
+        for mapping in mappings:
+            for name in (mapping.setting,) + tuple(mapping.depends_on):
+                self._triggers.setdefault(name, []).append(mapping)
+
+    def update(self, model: LimeNQRSettings) -> set:
+        """Converts the settings that changed since the previous update.
+
+        Args:
+            model (LimeNQRSettings): The model of the spectrometer
+
+        Returns:
+            set: The names of the changed settings
+        """
+        with self._lock, model.settings_lock:
+            changed = model.take_changed_settings()
+            try:
+                for name in changed:
+                    mappings = self._triggers.get(name)
+                    if mappings is None:
+                        if name not in self.unmapped and name != model.TARGET_FREQUENCY:
+                            logger.warning("Setting %s is not mapped to the driver", name)
+                        continue
+                    for mapping in mappings:
+                        self._convert(mapping, model)
+            except Exception:
+                # The settings are converted again with the next update, e.g. once the target frequency is set
+                for name in changed:
+                    model.mark_setting_changed(name)
+                raise
+        if changed:
+            logger.debug("Updated the driver settings for %s", sorted(changed))
+        return changed
+
+    def apply(self, lime) -> None:
+        """Sets the converted attributes of a driver configuration.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+        """
+        with self._lock:
+            for attribute, value in self._values.items():
+                setattr(lime, attribute, list(value) if isinstance(value, list) else value)
+
+    def _convert(self, mapping: SettingMapping, model: LimeNQRSettings) -> None:
+        """Converts the setting of a mapping and stores the value."""
+        setting = model.get_setting_by_name(mapping.setting)
+        value = mapping.convert(setting, model)
+        if mapping.index is None:
+            self._values[mapping.attribute] = value
+        else:
+            self._values[mapping.attribute][mapping.index] = value
@@ -0,0 +1,602 @@
+"""Scriptable acquisitions with the Lime NQR spectrometer without Qt and the nqrduck GUI.
+
+HeadlessLimeNQR runs the measurement pipeline of the GUI, LimeNQRAcquisition, with a settings dictionary instead of
+the nqrduck settings and a pulse sequence that is passed with the measurement instead of the one of the pulse
+programmer. The measurements are returned as MeasurementResult instead of emitted, streamed acquisitions yield the
+running averages. Neither PyQt6 nor the nqrduck spectrometer package, which builds its GUI when it is imported, are
+imported, only the unit converter of nqrduck.
+
+Example:
+    with HeadlessLimeNQR({LimeNQRSettings.RX_GAIN: 40}) as spectrometer:
+        sequence = PulseSequence("FID", [tx_event("pi/2", "3e-6"), blank_event("dead", "20e-6"), rx_event("rx", "100e-6")])
+        measurement = spectrometer.measure(sequence, target_frequency=83.56e6, averages=100)
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from decimal import Decimal
+from functools import partial
+import numpy as np
+
+from .acquisition import LimeNQRAcquisition
+from .postprocessing import MeasurementResult
+from .sequence import RELATIVE_AMPLITUDE, RX_READOUT, TX_PULSE_SHAPE
+from .settings import LimeNQRSettings
+
+logger = logging.getLogger(__name__)
+
+
+class HeadlessSetting:
+    """A setting with a plain value, it has the interface of the nqrduck settings that the pipeline uses.
+
+    Args:
+        name (str): The name of the setting
+        value (object): The value of the setting
+        options (list): The options of a selection setting, None for other settings
+        changed (callable): Called with the name when the value is set, unless the notifications are blocked
+
+    Attributes:
+        name (str): The name of the setting
+        options (list): The options of a selection setting, None for other settings
+    """
+
+    def __init__(self, name: str, value, options: list = None, changed=None) -> None:
+        """Initializes the HeadlessSetting."""
+        self.name = name
+        self.options = options
+        self._changed = changed
+        self._signals_blocked = False
+        self.value = value
+
+    @property
+    def value(self):
+        """The value of the setting."""
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        if self.options is not None and value not in self.options:
+            raise ValueError(f"{value} is not an option of {self.name}: {self.options}")
+        self._value = value
+        if self._changed is not None and not self._signals_blocked:
+            self._changed(self.name)
+
+    def blockSignals(self, block: bool) -> bool:
+        """Blocks or unblocks the change notifications, like the signals of the nqrduck settings.
+
+        Args:
+            block (bool): Whether setting the value calls changed
+
+        Returns:
+            bool: Whether the notifications were blocked before
+        """
+        blocked = self._signals_blocked
+        self._signals_blocked = block
+        return blocked
+
+    def get_setting(self) -> float:
+        """Returns the value as a float, like the nqrduck settings."""
+        return float(self.value)
+
+
+class HeadlessModel(LimeNQRSettings):
+    """The settings of a headless spectrometer.
+
+    Args:
+        settings (dict): Setting names and values that differ from LimeNQRSettings.DEFAULTS
+
+    Attributes:
+        name (str): The name of the spectrometer
+        settings (dict): The HeadlessSetting of every setting by name
+    """
+
+    name = "LimeNQR"
+
+    def __init__(self, settings: dict = None) -> None:
+        """Initializes the HeadlessModel."""
+        super().__init__()
+        self.settings = {
+            name: HeadlessSetting(name, value, self.OPTIONS.get(name), self.mark_setting_changed)
+            for name, value in self.DEFAULTS.items()
+        }
+        self.update(settings or {})
+
+    def get_setting_by_name(self, name: str) -> HeadlessSetting:
+        """Returns the setting with the given name.
+
+        Args:
+            name (str): The name of the setting
+
+        Returns:
+            HeadlessSetting: The setting
+
+        Raises:
+            ValueError: If there is no setting with the name
+        """
+        setting = self.settings.get(name)
+        if setting is None:
+            raise ValueError(f"Setting with name {name} not found")
+        return setting
+
+    def update(self, settings: dict) -> None:
+        """Sets the values of settings, settings that already have the value are not marked as changed.
+
+        Args:
+            settings (dict): Setting names and values
+
+        Raises:
+            ValueError: If there is no setting with a name or a value is not an option of a selection setting
+        """
+        # Unknown settings raise before any value is set
+        for name in settings:
+            self.get_setting_by_name(name)
+        for name, value in settings.items():
+            if self.settings[name].value != value:
+                self.settings[name].value = value
+        if self.IF_FREQUENCY in settings:
+            self.if_frequency = self.settings[self.IF_FREQUENCY].get_setting()
+
+    def to_dict(self) -> dict:
+        """Returns the values of the settings by name."""
+        return {name: setting.value for name, setting in self.settings.items()}
+
+
+class HeadlessSignal:
+    """Replaces the nqrduck signal, emitted keys and values are passed to the connected callbacks."""
+
+    def __init__(self) -> None:
+        """Initializes the HeadlessSignal."""
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def connect(self, callback) -> None:
+        """Calls a function with the key and the value of every emit.
+
+        Args:
+            callback (callable): The function
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def disconnect(self, callback) -> None:
+        """Stops calling a connected function.
+
+        Args:
+            callback (callable): The function
+        """
+        with self._lock:
+            self._callbacks.remove(callback)
+
+    def emit(self, key: str, value: object) -> None:
+        """Passes a key and a value to the connected functions.
+
+        Args:
+            key (str): Name of the signal
+            value (object): Value of the signal
+        """
+        with self._lock:
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback(key, value)
+
+
+class PulseShape:
+    """A transmit pulse envelope with the interface of the nqrduck pulse shape functions.
+
+    Args:
+        envelope (callable): Returns the amplitude for the times normalized to the pulse length in [0, 1), None for a
+            rectangular pulse
+        name (str): The name of the shape, it identifies the shape in the cache of the compiled sequences
+        resolution (float): The time between two points of the envelope in s
+
+    Attributes:
+        envelope (callable): Returns the amplitude for the times normalized to the pulse length in [0, 1)
+        name (str): The name of the shape
+        resolution (float): The time between two points of the envelope in s
+    """
+
+    def __init__(self, envelope=None, name: str = "Rectangular", resolution: float = 1 / 30.72e6) -> None:
+        """Initializes the PulseShape."""
+        self.envelope = envelope
+        self.name = name
+        self.resolution = resolution
+
+    def get_pulse_amplitude(self, pulse_length) -> np.ndarray:
+        """Evaluates the envelope with one point per resolution step.
+
+        Args:
+            pulse_length (float): The length of the pulse in s
+
+        Returns:
+            np.ndarray: The amplitude of the points
+        """
+        n_points = int(float(pulse_length) / self.resolution)
+        if self.envelope is None:
+            return np.ones(n_points)
+        return np.asarray(self.envelope(np.linspace(0, 1, n_points, endpoint=False)), dtype=float)
+
+    def to_json(self) -> dict:
+        """Returns a json representation of the shape."""
+        return {"name": self.name, "resolution": self.resolution}
+
+
+class Option:
+    """An option of a pulse parameter.
+
+    Args:
+        name (str): The name of the option
+        value (object): The value of the option
+
+    Attributes:
+        name (str): The name of the option
+        value (object): The value of the option
+    """
+
+    def __init__(self, name: str, value) -> None:
+        """Initializes the Option."""
+        self.name = name
+        self.value = value
+
+    def to_json(self) -> dict:
+        """Returns a json representation of the option."""
+        value = self.value.to_json() if hasattr(self.value, "to_json") else self.value
+        return {"name": self.name, "value": value}
+
+
+class Parameter:
+    """A pulse parameter of an event, e.g. TX or RX.
+
+    Args:
+        name (str): The name of the parameter
+        options (dict): The values of the options by name
+
+    Attributes:
+        name (str): The name of the parameter
+        options (list): The Option of every option
+    """
+
+    def __init__(self, name: str, options: dict) -> None:
+        """Initializes the Parameter."""
+        self.name = name
+        self.options = [Option(key, value) for key, value in options.items()]
+
+    def get_option_by_name(self, name: str) -> Option:
+        """Returns the option with the given name.
+
+        Raises:
+            ValueError: If there is no option with the name
+        """
+        for option in self.options:
+            if option.name == name:
+                return option
+        raise ValueError(f"Option with name {name} not found")
+
+
+class Event:
+    """An event of a pulse sequence.
+
+    Args:
+        name (str): The name of the event
+        duration (str): The duration of the event in s, a string keeps the exact decimal value
+        parameters (list): The Parameter of the event
+
+    Attributes:
+        name (str): The name of the event
+        duration (Decimal): The duration of the event in s
+        parameters (dict): The Parameter of the event by name
+    """
+
+    def __init__(self, name: str, duration, parameters: list = ()) -> None:
+        """Initializes the Event."""
+        self.name = name
+        self.duration = Decimal(str(duration))
+        self.parameters = {parameter.name: parameter for parameter in parameters}
+
+
+class PulseSequence:
+    """A named list of events.
+
+    Args:
+        name (str): The name of the pulse sequence, it is part of the names of the measurements
+        events (list): The Event of the sequence, the duration of the last event is the repetition time
+
+    Attributes:
+        name (str): The name of the pulse sequence
+        events (list): The Event of the sequence
+    """
+
+    def __init__(self, name: str, events: list) -> None:
+        """Initializes the PulseSequence."""
+        self.name = name
+        self.events = list(events)
+
+
+def tx_event(name: str, duration, amplitude: float = 100, shape: PulseShape = None) -> Event:
+    """Returns an event with a transmit pulse.
+
+    Args:
+        name (str): The name of the event
+        duration (str): The duration of the pulse in s
+        amplitude (float): The relative amplitude of the pulse in percent
+        shape (PulseShape): The envelope of the pulse, None for a rectangular pulse
+
+    Returns:
+        Event: The event
+    """
+    parameter = Parameter(
+        LimeNQRSettings.TX,
+        {RELATIVE_AMPLITUDE: amplitude, TX_PULSE_SHAPE: shape or PulseShape()},
+    )
+    return Event(name, duration, [parameter])
+
+
+def blank_event(name: str, duration) -> Event:
+    """Returns an event without transmit pulse and readout.
+
+    Args:
+        name (str): The name of the event
+        duration (str): The duration of the event in s
+
+    Returns:
+        Event: The event
+    """
+    return Event(name, duration)
+
+
+def rx_event(name: str, duration) -> Event:
+    """Returns an event with the RX readout.
+
+    Args:
+        name (str): The name of the event
+        duration (str): The duration of the readout in s
+
+    Returns:
+        Event: The event
+    """
+    return Event(name, duration, [Parameter(LimeNQRSettings.RX, {RX_READOUT: True})])
+
+
+class HeadlessLimeNQR(LimeNQRAcquisition):
+    """The Lime NQR spectrometer without GUI.
+
+    The measurement pipeline accesses the model and the signal through its module, which is the spectrometer itself.
+    Measurements are run one after another, settings that are passed to a measurement stay set. The parameters of
+    measure, stream and submit are set on the acquisition thread right before their measurement is prepared, so they
+    never change the measurements that are queued before.
+
+    Args:
+        settings (dict): Setting names and values that differ from LimeNQRSettings.DEFAULTS
+        isolate_driver (bool): Whether the driver is run in a child process, so a running acquisition can be cancelled
+
+    Attributes:
+        model (HeadlessModel): The settings of the spectrometer
+        nqrduck_signal (HeadlessSignal): Passes the progress, status and error messages of the pipeline to callbacks
+        pulse_sequence (PulseSequence): The pulse sequence of the last measurement
+    """
+
+    def __init__(self, settings: dict = None, isolate_driver: bool = True) -> None:
+        """Initializes the HeadlessLimeNQR."""
+        self.model = HeadlessModel(settings)
+        self.nqrduck_signal = HeadlessSignal()
+        self.module = self
+        self.pulse_sequence = None
+        self._queueing = threading.Lock()
+        self.init_acquisition(isolate_driver)
+
+    def get_pulse_sequence(self) -> PulseSequence:
+        """Returns the pulse sequence of the measurement.
+
+        Raises:
+            ValueError: If no pulse sequence was given
+        """
+        if self.pulse_sequence is None:
+            raise ValueError("No pulse sequence, pass one to measure or stream")
+        return self.pulse_sequence
+
+    def configure(
+        self,
+        pulse_sequence: PulseSequence = None,
+        target_frequency: float = None,
+        averages: int = None,
+        settings: dict = None,
+    ) -> None:
+        """Sets the parameters of the next measurements, parameters that are None are kept.
+
+        The parameters are set immediately, measure, stream and submit set them in order with the queued measurements.
+
+        Args:
+            pulse_sequence (PulseSequence): The pulse sequence, any object with a name and nqrduck events works
+            target_frequency (float): The target frequency in Hz
+            averages (int): The number of averages
+            settings (dict): Setting names and values
+
+        Raises:
+            ValueError: If a setting does not exist or a value is not an option of a selection setting
+        """
+        if settings:
+            self.model.update(settings)
+        if pulse_sequence is not None:
+            self.pulse_sequence = pulse_sequence
+        if target_frequency is not None:
+            self.model.target_frequency = float(target_frequency)
+        if averages is not None:
+            self.model.averages = int(averages)
+
+    def measure(
+        self,
+        pulse_sequence: PulseSequence = None,
+        target_frequency: float = None,
+        averages: int = None,
+        settings: dict = None,
+    ) -> MeasurementResult:
+        """Runs a measurement and returns it when it is processed.
+
+        Args:
+            pulse_sequence (PulseSequence): The pulse sequence, None for the one of the previous measurement
+            target_frequency (float): The target frequency in Hz, None for the previous one
+            averages (int): The number of averages, None for the previous number
+            settings (dict): Setting names and values that are changed before the measurement
+
+        Returns:
+            MeasurementResult: The measurement data
+
+        Raises:
+            RuntimeError: If the measurement failed or was cancelled
+        """
+        with self._collect_errors() as errors:
+            measurement_data = self.submit(
+                pulse_sequence, target_frequency, averages, settings
+            ).result()
+        if measurement_data is None:
+            raise RuntimeError(errors[-1] if errors else "Measurement failed")
+        return measurement_data
+
+    def submit(
+        self,
+        pulse_sequence: PulseSequence = None,
+        target_frequency: float = None,
+        averages: int = None,
+        settings: dict = None,
+    ) -> Future:
+        """Queues a measurement and returns immediately.
+
+        The parameters are set on the acquisition thread when the measurements before have been acquired, so
+        measurements with different parameters can be queued back to back. The next measurement is acquired while
+        the previous one is processed.
+
+        Args:
+            pulse_sequence (PulseSequence): The pulse sequence, None for the one of the previous measurement
+            target_frequency (float): The target frequency in Hz, None for the previous one
+            averages (int): The number of averages, None for the previous number
+            settings (dict): Setting names and values that are changed before the measurement
+
+        Returns:
+            Future: Resolves to the MeasurementResult or None if the measurement failed or was cancelled
+        """
+        return self._submit(
+            partial(self.configure, pulse_sequence, target_frequency, averages, settings),
+            settings,
+        )
+
+    def _submit(self, setup, settings: dict = None, cleanup=None) -> Future:
+        """Queues a measurement that calls setup on the acquisition thread and optionally a cleanup task after it.
+
+        Args:
+            setup (callable): Sets the parameters of the measurement
+            settings (dict): The settings that setup changes, checked before anything is queued
+            cleanup (callable): Called on the acquisition thread after the measurement has been acquired or cancelled
+
+        Returns:
+            Future: Resolves to the MeasurementResult or None if the measurement failed or was cancelled
+
+        Raises:
+            ValueError: If a setting does not exist
+        """
+        if settings:
+            # Unknown settings raise before anything is queued
+            for name in settings:
+                self.model.get_setting_by_name(name)
+        with self._queueing:
+            self.log_start_message()
+            measurement = self.worker.submit_serial(setup)
+            if cleanup is not None:
+                self.worker.submit_task(cleanup)
+        return measurement
+
+    def stream(
+        self,
+        pulse_sequence: PulseSequence = None,
+        target_frequency: float = None,
+        averages: int = None,
+        settings: dict = None,
+        update_interval: float = 1.0,
+    ):
+        """Runs a streamed measurement and yields the running average after every block and then the measurement.
+
+        The measurement stops early at the target SNR setting. Closing the generator cancels the measurement.
+
+        Args:
+            pulse_sequence (PulseSequence): The pulse sequence, None for the one of the previous measurement
+            target_frequency (float): The target frequency in Hz, None for the previous one
+            averages (int): The number of averages, None for the previous number
+            settings (dict): Setting names and values that are changed before the measurement
+            update_interval (float): The target time between two running averages in s
+
+        Yields:
+            MeasurementResult: The running averages with their estimated SNR as snr, the last one is the measurement data
+
+        Raises:
+            RuntimeError: If the measurement failed or was cancelled
+        """
+        interval = self.model.get_setting_by_name(self.model.STREAMING_INTERVAL)
+        previous_interval = []
+        updates = queue.Queue()
+        finished = object()
+
+        def collect(key: str, value: object) -> None:
+            if key == "streaming_measurement":
+                updates.put(value)
+
+        def setup() -> None:
+            # The measurements queued before have been acquired, so all following running averages are this one's
+            self.configure(pulse_sequence, target_frequency, averages, settings)
+            previous_interval.append(interval.value)
+            interval.value = float(update_interval)
+            self.nqrduck_signal.connect(collect)
+
+        def cleanup() -> None:
+            # Runs after the acquisition, before the next queued measurement is set up
+            if previous_interval:
+                self.nqrduck_signal.disconnect(collect)
+                interval.value = previous_interval[0]
+
+        with self._collect_errors() as errors:
+            measurement = self._submit(setup, settings, cleanup)
+            measurement.add_done_callback(lambda _: updates.put(finished))
+            try:
+                while (update := updates.get()) is not finished:
+                    yield update
+            except GeneratorExit:
+                self.cancel_measurement()
+                raise
+            measurement_data = measurement.result()
+
+        if measurement_data is None:
+            raise RuntimeError(errors[-1] if errors else "Measurement failed")
+        yield measurement_data
+
+    def close(self) -> None:
+        """Cancels the running measurements, waits for the queued archive files and removes the acquisition files."""
+        self.worker.shutdown()
+        self.processing_pool.shutdown(wait=False)
+        if self.archive is not None:
+            self.archive.shutdown()
+        self.storage.close()
+
+    def __enter__(self) -> "HeadlessLimeNQR":
+        """Returns the spectrometer."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Closes the spectrometer."""
+        self.close()
+
+    @contextmanager
+    def _collect_errors(self):
+        """Collects the error and cancellation messages of the pipeline while the context is entered."""
+        errors = []
+
+        def collect(key: str, value: object) -> None:
+            if key == "measurement_error":
+                errors.append(value)
+            elif key == "measurement_cancelled":
+                errors.append("Measurement cancelled")
+
+        self.nqrduck_signal.connect(collect)
+        try:
+            yield errors
+        finally:
+            self.nqrduck_signal.disconnect(collect)
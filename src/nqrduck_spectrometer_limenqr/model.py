@@ -1,6 +1,8 @@
 """Model for the Lime NQR spectrometer."""
 
 import logging
+from functools import partial
+from PyQt6.QtCore import pyqtSignal
 from nqrduck_spectrometer.base_spectrometer_model import BaseSpectrometerModel
 from nqrduck_spectrometer.pulseparameters import TXPulse, RXReadout
 from nqrduck_spectrometer.settings import (
@@ -11,125 +13,142 @@ from nqrduck_spectrometer.settings import (
     StringSetting,
 )
 
+from .settings import LimeNQRSettings
+
 logger = logging.getLogger(__name__)
 
 
-class LimeNQRModel(BaseSpectrometerModel):
-    """Model for the Lime NQR spectrometer."""
-    # Setting constants for the names of the spectrometer settings
-    CHANNEL = "TX/RX Channel"
-    TX_MATCHING = "TX Matching"
-    RX_MATCHING = "RX Matching"
-    SAMPLING_FREQUENCY = "Sampling Frequency (Hz)"
-    RX_DWELL_TIME = "RX Dwell Time (s)"
-    IF_FREQUENCY = "IF Frequency (Hz)"
-    ACQUISITION_TIME = "Acquisition time (s)"
-    GATE_ENABLE = "Enable"
-    GATE_PADDING_LEFT = "Gate padding left"
-    GATE_PADDING_RIGHT = "Gate padding right"
-    GATE_SHIFT = "Gate shift"
-    RX_GAIN = "RX Gain"
-    TX_GAIN = "TX Gain"
-    RX_LPF_BW = "RX LPF BW (Hz)"
-    TX_LPF_BW = "TX LPF BW (Hz)"
-    TX_I_DC_CORRECTION = "TX I DC correction"
-    TX_Q_DC_CORRECTION = "TX Q DC correction"
-    TX_I_GAIN_CORRECTION = "TX I Gain correction"
-    TX_Q_GAIN_CORRECTION = "TX Q Gain correction"
-    TX_PHASE_ADJUSTMENT = "TX phase adjustment"
-    RX_I_DC_CORRECTION = "RX I DC correction"
-    RX_Q_DC_CORRECTION = "RX Q DC correction"
-    RX_I_GAIN_CORRECTION = "RX I Gain correction"
-    RX_Q_GAIN_CORRECTION = "RX Q Gain correction"
-    RX_PHASE_ADJUSTMENT = "RX phase adjustment"
-    RX_OFFSET = "RX offset"
-    FFT_SHIFT = "FFT shift"
-
-    # Constants for the Categories of the settings
-    ACQUISITION = "Acquisition"
-    GATE_SETTINGS = "Gate Settings"
-    RX_TX_SETTINGS = "RX/TX Settings"
-    CALIBRATION = "Calibration"
-    SIGNAL_PROCESSING = "Signal Processing"
-
-    # Pulse parameter constants
-    TX = "TX"
-    RX = "RX"
-
-    # Settings that are not changed by the user
-    OFFSET_FIRST_PULSE = 300
+class LimeNQRModel(LimeNQRSettings, BaseSpectrometerModel):
+    """Model for the Lime NQR spectrometer.
+
+    The names and defaults of the settings are defined by LimeNQRSettings, the model creates the nqrduck settings of
+    the GUI for them.
+
+    Signals:
+        profile_loaded (str, set) : Signal emitted once with the name of the profile and the names of the changed
+            settings when a settings profile has been loaded
+    """
+
+    profile_loaded = pyqtSignal(str, set)
 
     def __init__(self, module) -> None:
         """Initializes the Lime NQR model."""
-        super().__init__(module)
+        BaseSpectrometerModel.__init__(self, module)
+        LimeNQRSettings.__init__(self)
         # Acquisition settings
-        channel_options = ["0", "1"]
         channel_setting = SelectionSetting(
-            self.CHANNEL, channel_options, "0", "TX/RX Channel"
+            self.CHANNEL,
+            self.OPTIONS[self.CHANNEL],
+            self.DEFAULTS[self.CHANNEL],
+            "TX/RX Channel",
         )
         self.add_setting(channel_setting, self.ACQUISITION)
 
-        tx_matching_options = ["0", "1"]
         tx_matching_setting = SelectionSetting(
-            self.TX_MATCHING, tx_matching_options, "0", "TX Matching"
+            self.TX_MATCHING,
+            self.OPTIONS[self.TX_MATCHING],
+            self.DEFAULTS[self.TX_MATCHING],
+            "TX Matching",
         )
         self.add_setting(tx_matching_setting, self.ACQUISITION)
 
-        rx_matching_options = ["0", "1"]
         rx_matching_setting = SelectionSetting(
-            self.RX_MATCHING, rx_matching_options, "0", "RX Matching"
+            self.RX_MATCHING,
+            self.OPTIONS[self.RX_MATCHING],
+            self.DEFAULTS[self.RX_MATCHING],
+            "RX Matching",
         )
         self.add_setting(rx_matching_setting, self.ACQUISITION)
 
-
-        sampling_frequency_options = [
-            "30.72e6",
-            "15.36e6",
-            "7.68e6",
-        ]
         sampling_frequency_setting = SelectionSetting(
             self.SAMPLING_FREQUENCY,
-            sampling_frequency_options,
-            "30.72e6",
+            self.OPTIONS[self.SAMPLING_FREQUENCY],
+            self.DEFAULTS[self.SAMPLING_FREQUENCY],
             "The rate at which the spectrometer samples the input signal.",
         )
         self.add_setting(sampling_frequency_setting, self.ACQUISITION)
 
         rx_dwell_time_setting = StringSetting(
             self.RX_DWELL_TIME,
-            "22n",
+            self.DEFAULTS[self.RX_DWELL_TIME],
             "The time between samples in the receive path.",
         )
         self.add_setting(rx_dwell_time_setting, self.ACQUISITION)
 
         if_frequency_setting = FloatSetting(
             self.IF_FREQUENCY,
-            5e6,
+            self.DEFAULTS[self.IF_FREQUENCY],
             "The intermediate frequency to which the input signal is down converted during analog-to-digital conversion.",
             min_value=0,
         )
         self.add_setting(if_frequency_setting, self.ACQUISITION)
-        self.if_frequency = 5e6
 
         acquisition_time_setting = FloatSetting(
             self.ACQUISITION_TIME,
-            82e-6,
+            self.DEFAULTS[self.ACQUISITION_TIME],
             "Acquisition time - this is from the beginning of the pulse sequence",
             min_value=0,
         )
         self.add_setting(acquisition_time_setting, self.ACQUISITION)
 
+        driver_backend_setting = SelectionSetting(
+            self.DRIVER_BACKEND,
+            self.OPTIONS[self.DRIVER_BACKEND],
+            self.DEFAULTS[self.DRIVER_BACKEND],
+            "The driver that runs the measurement. The simulator synthesizes the signal of a spin system without a LimeSDR.",
+        )
+        self.add_setting(driver_backend_setting, self.ACQUISITION)
+
+        acquisition_storage_setting = SelectionSetting(
+            self.ACQUISITION_STORAGE,
+            self.OPTIONS[self.ACQUISITION_STORAGE],
+            self.DEFAULTS[self.ACQUISITION_STORAGE],
+            "Where the driver writes the acquisition files. Temporary directory creates a directory per measurement, the spools reuse one directory on disk or in RAM (/dev/shm). The files are removed after the measurement has been processed.",
+        )
+        self.add_setting(acquisition_storage_setting, self.ACQUISITION)
+
+        raw_archive_setting = SelectionSetting(
+            self.RAW_ARCHIVE,
+            self.OPTIONS[self.RAW_ARCHIVE],
+            self.DEFAULTS[self.RAW_ARCHIVE],
+            "Keeps a compressed copy of every raw acquisition in the archive directory, so it can be processed again with other RX offsets or dwell times. Blosc needs the hdf5plugin package.",
+        )
+        self.add_setting(raw_archive_setting, self.ACQUISITION)
+
+        archive_directory_setting = StringSetting(
+            self.ARCHIVE_DIRECTORY,
+            self.DEFAULTS[self.ARCHIVE_DIRECTORY],
+            "The directory of the raw acquisition archive.",
+        )
+        self.add_setting(archive_directory_setting, self.ACQUISITION)
+
+        streaming_interval_setting = FloatSetting(
+            self.STREAMING_INTERVAL,
+            self.DEFAULTS[self.STREAMING_INTERVAL],
+            "Acquires the averages in blocks and shows the running average about once per interval. 0 acquires all averages at once.",
+            min_value=0,
+        )
+        self.add_setting(streaming_interval_setting, self.ACQUISITION)
+
+        target_snr_setting = FloatSetting(
+            self.TARGET_SNR,
+            self.DEFAULTS[self.TARGET_SNR],
+            "Stops a streamed acquisition once the signal to noise ratio of the running average is reached. 0 acquires all averages.",
+            min_value=0,
+        )
+        self.add_setting(target_snr_setting, self.ACQUISITION)
+
         # Gate Settings
         gate_enable_setting = BooleanSetting(
             self.GATE_ENABLE,
-            True,
+            self.DEFAULTS[self.GATE_ENABLE],
             "Setting that controls whether gate is on during transmitting.",
         )
         self.add_setting(gate_enable_setting, self.GATE_SETTINGS)
 
         gate_padding_left_setting = IntSetting(
             self.GATE_PADDING_LEFT,
-            10,
+            self.DEFAULTS[self.GATE_PADDING_LEFT],
             "The number of samples by which to extend the gate window to the left.",
             min_value=0,
         )
@@ -137,7 +156,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         gate_padding_right_setting = IntSetting(
             self.GATE_PADDING_RIGHT,
-            10,
+            self.DEFAULTS[self.GATE_PADDING_RIGHT],
             "The number of samples by which to extend the gate window to the right.",
             min_value=0,
         )
@@ -145,7 +164,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         gate_shift_setting = IntSetting(
             self.GATE_SHIFT,
-            53,
+            self.DEFAULTS[self.GATE_SHIFT],
             "The delay, in number of samples, by which the gate window is shifted.",
             min_value=0,
         )
@@ -154,7 +173,7 @@ class LimeNQRModel(BaseSpectrometerModel):
         # RX/TX settings
         rx_gain_setting = IntSetting(
             self.RX_GAIN,
-            55,
+            self.DEFAULTS[self.RX_GAIN],
             "The gain level of the receiver’s amplifier.",
             min_value=0,
             max_value=55,
@@ -164,7 +183,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         tx_gain_setting = IntSetting(
             self.TX_GAIN,
-            30,
+            self.DEFAULTS[self.TX_GAIN],
             "The gain level of the transmitter’s amplifier.",
             min_value=0,
             max_value=55,
@@ -174,14 +193,14 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         rx_lpf_bw_setting = FloatSetting(
             self.RX_LPF_BW,
-            30.72e6 / 2,
+            self.DEFAULTS[self.RX_LPF_BW],
             "The bandwidth of the receiver’s low-pass filter which attenuates frequencies below a certain threshold.",
         )
         self.add_setting(rx_lpf_bw_setting, self.RX_TX_SETTINGS)
 
         tx_lpf_bw_setting = FloatSetting(
             self.TX_LPF_BW,
-            130.0e6,
+            self.DEFAULTS[self.TX_LPF_BW],
             "The bandwidth of the transmitter’s low-pass filter which limits the frequency range of the transmitted signa",
         )
         self.add_setting(tx_lpf_bw_setting, self.RX_TX_SETTINGS)
@@ -189,7 +208,7 @@ class LimeNQRModel(BaseSpectrometerModel):
         # Calibration settings
         tx_i_dc_correction_setting = IntSetting(
             self.TX_I_DC_CORRECTION,
-            -45,
+            self.DEFAULTS[self.TX_I_DC_CORRECTION],
             "Adjusts the direct current offset errors in the in-phase (I) component of the transmit (TX) path.",
             min_value=-128,
             max_value=127,
@@ -199,7 +218,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         tx_q_dc_correction_setting = IntSetting(
             self.TX_Q_DC_CORRECTION,
-            0,
+            self.DEFAULTS[self.TX_Q_DC_CORRECTION],
             "Adjusts the direct current offset errors in the quadrature (Q) component of the transmit (TX) path.",
             min_value=-128,
             max_value=127,
@@ -209,7 +228,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         tx_i_gain_correction_setting = IntSetting(
             self.TX_I_GAIN_CORRECTION,
-            2047,
+            self.DEFAULTS[self.TX_I_GAIN_CORRECTION],
             "Modifies the gain settings for the I channel of the TX path, adjusting for imbalances.",
             min_value=0,
             max_value=2047,
@@ -219,7 +238,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         tx_q_gain_correction_setting = IntSetting(
             self.TX_Q_GAIN_CORRECTION,
-            2039,
+            self.DEFAULTS[self.TX_Q_GAIN_CORRECTION],
             "Modifies the gain settings for the Q channel of the TX path, adjusting for imbalances.",
             min_value=0,
             max_value=2047,
@@ -229,7 +248,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         tx_phase_adjustment_setting = IntSetting(
             self.TX_PHASE_ADJUSTMENT,
-            3,
+            self.DEFAULTS[self.TX_PHASE_ADJUSTMENT],
             "Corrects the Phase of I Q signals in the TX path.",
             min_value=-2048,
             max_value=2047,
@@ -239,7 +258,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         rx_i_dc_correction_setting = IntSetting(
             self.RX_I_DC_CORRECTION,
-            0,
+            self.DEFAULTS[self.RX_I_DC_CORRECTION],
             "Adjusts the direct current offset errors in the in-phase (I) component of the receive (RX) path.",
             min_value=-63,
             max_value=63,
@@ -249,7 +268,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         rx_q_dc_correction_setting = IntSetting(
             self.RX_Q_DC_CORRECTION,
-            0,
+            self.DEFAULTS[self.RX_Q_DC_CORRECTION],
             "Adjusts the direct current offset errors in the quadrature (Q) component of the receive (RX) path.",
             min_value=-63,
             max_value=63,
@@ -259,7 +278,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         rx_i_gain_correction_setting = IntSetting(
             self.RX_I_GAIN_CORRECTION,
-            2047,
+            self.DEFAULTS[self.RX_I_GAIN_CORRECTION],
             "Modifies the gain settings for the I channel of the RX path, adjusting for imbalances.",
             min_value=0,
             max_value=2047,
@@ -269,7 +288,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         rx_q_gain_correction_setting = IntSetting(
             self.RX_Q_GAIN_CORRECTION,
-            2047,
+            self.DEFAULTS[self.RX_Q_GAIN_CORRECTION],
             "Modifies the gain settings for the Q channel of the RX path, adjusting for imbalances.",
             min_value=0,
             max_value=2047,
@@ -279,7 +298,7 @@ class LimeNQRModel(BaseSpectrometerModel):
 
         rx_phase_adjustment_setting = IntSetting(
             self.RX_PHASE_ADJUSTMENT,
-            0,
+            self.DEFAULTS[self.RX_PHASE_ADJUSTMENT],
             "Corrects the Phase of I Q signals in the RX path.",
             min_value=-2048,
             max_value=2047,
@@ -290,20 +309,46 @@ class LimeNQRModel(BaseSpectrometerModel):
         # Signal Processing settings
         rx_offset_setting = FloatSetting(
             self.RX_OFFSET,
-            2.4e-6,
+            self.DEFAULTS[self.RX_OFFSET],
             "The offset of the RX event, this changes all the time",
         )
         self.add_setting(rx_offset_setting, self.SIGNAL_PROCESSING)
 
-        fft_shift_setting = BooleanSetting(self.FFT_SHIFT, False, "FFT shift")
+        fft_shift_setting = BooleanSetting(
+            self.FFT_SHIFT, self.DEFAULTS[self.FFT_SHIFT], "FFT shift"
+        )
         self.add_setting(fft_shift_setting, self.SIGNAL_PROCESSING)
 
+        resampling_engine_setting = SelectionSetting(
+            self.RESAMPLING_ENGINE,
+            self.OPTIONS[self.RESAMPLING_ENGINE],
+            self.DEFAULTS[self.RESAMPLING_ENGINE],
+            "The method used to resample the RX data to the dwell time. Auto selects decimation for integer rate ratios, polyphase filtering for simple rational ratios and FFT resampling otherwise.",
+        )
+        self.add_setting(resampling_engine_setting, self.SIGNAL_PROCESSING)
+
+        profiling_setting = SelectionSetting(
+            self.PROFILING,
+            self.OPTIONS[self.PROFILING],
+            self.DEFAULTS[self.PROFILING],
+            "Records the wall time, CPU time and, with memory, the peak allocation of every stage of a measurement. The results are attached to the measurement and emitted as measurement_profile.",
+        )
+        self.add_setting(profiling_setting, self.SIGNAL_PROCESSING)
+
+        post_processing_setting = SelectionSetting(
+            self.POST_PROCESSING,
+            self.OPTIONS[self.POST_PROCESSING],
+            self.DEFAULTS[self.POST_PROCESSING],
+            "Where the acquired data is windowed, resampled and transformed. The process pool processes it on other cores while the next acquisition of a sweep is running. The measurements are emitted in the order they were acquired.",
+        )
+        self.add_setting(post_processing_setting, self.SIGNAL_PROCESSING)
+
         # Pulse parameter options
         self.add_pulse_parameter_option(self.TX, TXPulse)
         # self.add_pulse_parameter_option(self.GATE, Gate)
         self.add_pulse_parameter_option(self.RX, RXReadout)
 
-        # Try to load the pulse programmer module
+        # Try to load the pulse programmer module, it needs the pulse parameter options before any events are created
         try:
             from nqrduck_pulseprogrammer.pulseprogrammer import pulse_programmer
 
@@ -313,31 +358,25 @@ class LimeNQRModel(BaseSpectrometerModel):
         except ImportError:
             logger.warning("No pulse programmer found.")
 
-        self.averages = 1
-
-    @property
-    def target_frequency(self):
-        """The target frequency of the spectrometer."""
-        return self._target_frequency
-
-    @target_frequency.setter
-    def target_frequency(self, value):
-        self._target_frequency = value
-
-    @property
-    def averages(self):
-        """The number of averages to be taken."""
-        return self._averages
-
-    @averages.setter
-    def averages(self, value):
-        self._averages = value
+    def add_setting(self, setting, category: str) -> None:
+        """Adds a setting to the spectrometer and tracks its changes.
+
+        Args:
+            setting (Setting): The setting to add
+            category (str): The category of the setting
+        """
+        super().add_setting(setting, category)
+        self.mark_setting_changed(setting.name)
+        setting.settings_changed.connect(
+            partial(self.mark_setting_changed, setting.name)
+        )
 
-    @property
-    def if_frequency(self):
-        """The intermediate frequency to which the input signal is down converted during analog-to-digital conversion."""
-        return self._if_frequency
+    def on_profile_loaded(self, name: str, changed: set) -> None:
+        """Emits profile_loaded, so the view updates the widgets of the changed settings at once.
 
-    @if_frequency.setter
-    def if_frequency(self, value):
-        self._if_frequency = value
+        Args:
+            name (str): The name of the profile
+            changed (set): The names of the settings that changed
+        """
+        logger.debug("Loaded settings profile %s, changed settings: %s", name, sorted(changed))
+        self.profile_loaded.emit(name, changed)
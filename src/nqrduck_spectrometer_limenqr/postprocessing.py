@@ -0,0 +1,300 @@
+"""Processing of finished acquisitions into measurements.
+
+A ProcessingJob holds everything that is needed to process an acquisition: the acquisition file or the buffers of a
+streamed acquisition, the RX window and the settings at the time of the acquisition. process_acquisition reads the
+RX window, scales it by the averages, resamples it to the dwell time and returns a MeasurementResult. It does not
+depend on the controller, so it can run in the process pool while the next acquisition is running. The module does
+not import nqrduck, whose spectrometer package creates Qt widgets when it is imported, so the spawned pool processes
+and the headless API run without Qt. The GUI converts the results into nqrduck Measurements.
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from .profiling import OFF, create_profile
+from .readback import AcquisitionReader
+from .resampling import AUTO, resample_fid
+
+logger = logging.getLogger(__name__)
+
+# Where the acquisitions are processed
+INLINE = "Acquisition thread"
+POOL = "Process pool"
+
+PROCESSING_MODES = [INLINE, POOL]
+
+
+class MeasurementResult:
+    """The processed data of a measurement, with the fields of the nqrduck Measurement but without its dependencies.
+
+    Args:
+        name (str): The name of the measurement
+        tdx (np.ndarray): The time vector in µs
+        tdy (np.ndarray): The complex samples
+        target_frequency (float): The target frequency in Hz
+        frequency_shift (float): The frequency shift of the spectrum in Hz
+        IF_frequency (float): The IF frequency in Hz
+
+    Attributes:
+        name (str): The name of the measurement
+        tdx (np.ndarray): The time vector in µs
+        tdy (np.ndarray): The complex samples
+        target_frequency (float): The target frequency in Hz
+        frequency_shift (float): The frequency shift of the spectrum in Hz
+        IF_frequency (float): The IF frequency in Hz
+        archive_path (str): The path of the archived acquisition, None if it was not archived
+        profile (dict): The recorded stages of the measurement, None if it was not profiled
+        snr (float): The estimated SNR of a running average, None for other measurements
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tdx: np.ndarray,
+        tdy: np.ndarray,
+        target_frequency: float,
+        frequency_shift: float = 0,
+        IF_frequency: float = 0,
+    ) -> None:
+        """Initializes the MeasurementResult."""
+        self.name = name
+        self.tdx = tdx
+        self.tdy = tdy
+        self.target_frequency = target_frequency
+        self.frequency_shift = frequency_shift
+        self.IF_frequency = IF_frequency
+        self.archive_path = None
+        self.profile = None
+        self.snr = None
+
+
+class ProcessingJob:
+    """An acquisition and the settings it is processed with.
+
+    Args:
+        name (str): The name of the measurement
+        target_frequency (float): The target frequency in Hz
+        path (str): The path of the acquisition file, None if buffers are given
+        buffers (tuple): The time vector in µs and the complex samples of the RX window, None if path is given
+        rx_begin (float): The start time of the RX event in µs
+        rx_stop (float): The stop time of the RX event in µs
+        scale (float): The factor the samples are divided by, the number of averages of the acquisition file
+        frequency_shift (float): The frequency shift of the measurement in Hz
+        if_frequency (float): The IF frequency in Hz
+        dwell_time (float): The dwell time in µs, 0 for no resampling
+        engine (str): The resampling engine
+        srate (float): The sampling rate in Hz
+        profiling (str): The profiling mode of the stages
+        archive_path (str): The path of the archived acquisition that is attached to the measurement
+
+    Attributes:
+        name (str): The name of the measurement
+        target_frequency (float): The target frequency in Hz
+        path (str): The path of the acquisition file, None if buffers are given
+        buffers (tuple): The time vector in µs and the complex samples of the RX window, None if path is given
+        rx_begin (float): The start time of the RX event in µs
+        rx_stop (float): The stop time of the RX event in µs
+        scale (float): The factor the samples are divided by, the number of averages of the acquisition file
+        frequency_shift (float): The frequency shift of the measurement in Hz
+        if_frequency (float): The IF frequency in Hz
+        dwell_time (float): The dwell time in µs, 0 for no resampling
+        engine (str): The resampling engine
+        srate (float): The sampling rate in Hz
+        profiling (str): The profiling mode of the stages
+        archive_path (str): The path of the archived acquisition that is attached to the measurement
+    """
+
+    def __init__(
+        self,
+        name: str,
+        target_frequency: float,
+        path: str = None,
+        buffers: tuple = None,
+        rx_begin: float = 0,
+        rx_stop: float = 0,
+        scale: float = 1,
+        frequency_shift: float = 0,
+        if_frequency: float = 0,
+        dwell_time: float = 0,
+        engine: str = AUTO,
+        srate: float = None,
+        profiling: str = OFF,
+        archive_path: str = None,
+    ) -> None:
+        """Initializes the ProcessingJob."""
+        if (path is None) == (buffers is None):
+            raise ValueError("A processing job needs either an acquisition file or buffers")
+        self.name = name
+        self.target_frequency = target_frequency
+        self.path = path
+        self.buffers = buffers
+        self.rx_begin = rx_begin
+        self.rx_stop = rx_stop
+        self.scale = scale
+        self.frequency_shift = frequency_shift
+        self.if_frequency = if_frequency
+        self.dwell_time = dwell_time
+        self.engine = engine
+        self.srate = srate
+        self.profiling = profiling
+        self.archive_path = archive_path
+
+
+def find_window(reader: AcquisitionReader, rx_begin: float, rx_stop: float) -> slice:
+    """Finds the indices of the evaluation range in the measurement data.
+
+    Args:
+        reader (AcquisitionReader): The reader that is used to read the measurement data
+        rx_begin (float): The start time of the RX event in µs
+        rx_stop (float): The stop time of the RX event in µs
+
+    Returns:
+        slice: The indices of the evaluation range in the measurement data
+
+    Raises:
+        ValueError: If there are no samples in the evaluation range
+    """
+    window = reader.find_window(rx_begin, rx_stop)
+    if window.stop <= window.start:
+        raise ValueError(
+            f"No samples between {rx_begin}µs and {rx_stop}µs in the acquisition"
+        )
+    return window
+
+
+def read_window(path, rx_begin: float, rx_stop: float, scale: float = 1) -> tuple:
+    """Reads the RX window of an acquisition file.
+
+    Only the samples inside the window are read from the file.
+
+    Args:
+        path (str): The path of the acquisition file
+        rx_begin (float): The start time of the RX event in µs
+        rx_stop (float): The stop time of the RX event in µs
+        scale (float): The factor the samples are divided by, e.g. the number of averages
+
+    Returns:
+        tuple: The time vector in µs starting at 0 and the complex samples
+    """
+    with AcquisitionReader(path) as reader:
+        window = find_window(reader, rx_begin, rx_stop)
+        tdx = reader.time_axis.values(window.start, window.stop)
+        tdx = tdx - tdx[0]
+        tdy = reader.read(window, scale=scale)
+    return tdx, tdy
+
+
+def resample_measurement(
+    measurement_data: MeasurementResult, dwell_time: float, engine: str, srate: float
+) -> MeasurementResult:
+    """Resamples the measurement data to the dwell time.
+
+    Args:
+        measurement_data (MeasurementResult): The measurement data at the sampling rate of the spectrometer
+        dwell_time (float): The dwell time in µs
+        engine (str): The resampling engine
+        srate (float): The sampling rate in Hz
+
+    Returns:
+        MeasurementResult: The resampled measurement data
+    """
+    n_data_points = int(measurement_data.tdx[-1] / dwell_time)
+    logger.debug("Resampling to %s data points", n_data_points)
+    tdx = np.linspace(0, measurement_data.tdx[-1], n_data_points, endpoint=False)
+    tdy = resample_fid(
+        measurement_data.tdy,
+        n_data_points,
+        engine,
+        ratio=dwell_time * 1e-6 * srate,
+    )
+    return MeasurementResult(
+        measurement_data.name,
+        tdx,
+        tdy,
+        measurement_data.target_frequency,
+        IF_frequency=measurement_data.IF_frequency,
+    )
+
+
+def process_acquisition(job: ProcessingJob) -> tuple:
+    """Processes an acquisition into a measurement.
+
+    Args:
+        job (ProcessingJob): The acquisition and its settings
+
+    Returns:
+        tuple: The MeasurementResult and the recorded stages of the profiling mode of the job
+    """
+    profile = create_profile(job.profiling)
+    try:
+        with profile.stage("process_measurement_results"):
+            if job.path is not None:
+                tdx, tdy = read_window(job.path, job.rx_begin, job.rx_stop, job.scale)
+            else:
+                tdx, tdy = job.buffers
+            measurement_data = MeasurementResult(
+                job.name,
+                tdx,
+                tdy,
+                job.target_frequency,
+                frequency_shift=job.frequency_shift,
+                IF_frequency=job.if_frequency,
+            )
+
+        if job.dwell_time:
+            with profile.stage("resampling"):
+                measurement_data = resample_measurement(
+                    measurement_data, job.dwell_time, job.engine, job.srate
+                )
+
+        if job.archive_path is not None:
+            measurement_data.archive_path = job.archive_path
+        return measurement_data, profile.to_dict()
+    finally:
+        profile.close()
+
+
+class ProcessingPool:
+    """Processes acquisitions in worker processes.
+
+    The processes are started with spawn, like the driver process, and on first use.
+
+    Args:
+        max_workers (int): The number of worker processes, None for the number of CPUs
+
+    Attributes:
+        max_workers (int): The number of worker processes, None for the number of CPUs
+    """
+
+    def __init__(self, max_workers: int = None) -> None:
+        """Initializes the ProcessingPool."""
+        self.max_workers = max_workers
+        self._executor = None
+
+    def submit(self, job: ProcessingJob):
+        """Queues the processing of an acquisition.
+
+        Args:
+            job (ProcessingJob): The acquisition and its settings
+
+        Returns:
+            Future: Resolves to the result of process_acquisition
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor.submit(process_acquisition, job)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the worker processes.
+
+        Args:
+            wait (bool): Whether the queued acquisitions are processed before returning
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
@@ -0,0 +1,247 @@
+"""Named settings profiles of the Lime NQR spectrometer.
+
+A profile holds the values of all settings, missing settings take their default. The values are converted to the
+types of the defaults, so a profile that was read from JSON equals the profile of the same settings in the GUI. The
+key is the hash of the acquisition and processing settings and can be used to key caches of everything that only
+depends on them. The settings of the local machine, like the driver backend and the archive directory whose default
+depends on the home directory, are not part of the key, so the key is the same on every machine. Loading a profile into a model sets the settings that differ in one step, see
+LimeNQRSettings.load_profile.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+from .settings import LimeNQRSettings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIRECTORY = Path.home() / "nqrduck" / "limenqr_profiles"
+
+# Settings of the local machine that do not change the acquired and processed data, they are not part of the key
+LOCAL_SETTINGS = (
+    LimeNQRSettings.DRIVER_BACKEND,
+    LimeNQRSettings.ACQUISITION_STORAGE,
+    LimeNQRSettings.RAW_ARCHIVE,
+    LimeNQRSettings.ARCHIVE_DIRECTORY,
+    LimeNQRSettings.PROFILING,
+    LimeNQRSettings.POST_PROCESSING,
+)
+
+
+def normalize_setting(name: str, value):
+    """Returns the value of a setting with the type of its default.
+
+    Args:
+        name (str): The name of the setting
+        value (object): The value of the setting
+
+    Returns:
+        object: The converted value
+
+    Raises:
+        ValueError: If there is no setting with the name, the value can not be converted or is not an option
+    """
+    if name not in LimeNQRSettings.DEFAULTS:
+        raise ValueError(f"Setting with name {name} not found")
+    default = LimeNQRSettings.DEFAULTS[name]
+    try:
+        if isinstance(default, bool):
+            if isinstance(value, str):
+                value = value.strip().lower() in ("true", "1")
+            value = bool(value)
+        elif isinstance(default, int):
+            value = int(float(value))
+        elif isinstance(default, float):
+            value = float(value)
+        else:
+            value = str(value)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Invalid value {value!r} of {name}") from error
+    options = LimeNQRSettings.OPTIONS.get(name)
+    if options is not None and value not in options:
+        raise ValueError(f"{value} is not an option of {name}: {options}")
+    return value
+
+
+class SettingsProfile:
+    """The values of all settings of the spectrometer under a name.
+
+    Args:
+        name (str): The name of the profile
+        settings (dict): Setting names and values, missing settings take their default
+
+    Attributes:
+        name (str): The name of the profile
+        values (dict): The value of every setting in the order of LimeNQRSettings.DEFAULTS
+        key (str): The hex digest of the values without LOCAL_SETTINGS, profiles with equal acquisition and
+            processing settings have equal keys regardless of the name and of the machine
+
+    Raises:
+        ValueError: If a setting does not exist or has an invalid value
+    """
+
+    def __init__(self, name: str, settings: dict = None) -> None:
+        """Initializes the SettingsProfile."""
+        settings = settings or {}
+        for setting_name in settings:
+            if setting_name not in LimeNQRSettings.DEFAULTS:
+                raise ValueError(f"Setting with name {setting_name} not found")
+        self.name = name
+        self.values = {
+            setting_name: normalize_setting(setting_name, settings.get(setting_name, default))
+            for setting_name, default in LimeNQRSettings.DEFAULTS.items()
+        }
+        key_values = {
+            setting_name: value
+            for setting_name, value in self.values.items()
+            if setting_name not in LOCAL_SETTINGS
+        }
+        self.key = hashlib.sha1(
+            json.dumps(key_values, sort_keys=True, separators=(",", ":")).encode()
+        ).hexdigest()
+
+    @classmethod
+    def from_settings(cls, name: str, model: LimeNQRSettings) -> "SettingsProfile":
+        """Returns the profile of the current settings of a model.
+
+        Args:
+            name (str): The name of the profile
+            model (LimeNQRSettings): The model of the GUI or of the headless API
+
+        Returns:
+            SettingsProfile: The profile
+        """
+        with model.settings_lock:
+            settings = {
+                setting_name: model.get_setting_by_name(setting_name).value
+                for setting_name in LimeNQRSettings.DEFAULTS
+            }
+        return cls(name, settings)
+
+    def differences(self, other: "SettingsProfile") -> dict:
+        """Returns the settings whose values differ from another profile.
+
+        Args:
+            other (SettingsProfile): The other profile
+
+        Returns:
+            dict: The names and the values of this profile
+        """
+        return {
+            setting_name: value
+            for setting_name, value in self.values.items()
+            if other.values[setting_name] != value
+        }
+
+    def to_json(self) -> str:
+        """Returns the profile as a single line of JSON."""
+        return json.dumps({"name": self.name, "settings": self.values}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: str) -> "SettingsProfile":
+        """Reads a profile from JSON.
+
+        Args:
+            text (str): The JSON of the profile, see to_json
+
+        Returns:
+            SettingsProfile: The profile
+
+        Raises:
+            ValueError: If the JSON is invalid or a setting does not exist or has an invalid value
+        """
+        content = json.loads(text)
+        return cls(content["name"], content.get("settings", {}))
+
+    def __eq__(self, other) -> bool:
+        """Profiles are equal if they have the same name and values."""
+        if not isinstance(other, SettingsProfile):
+            return NotImplemented
+        return self.name == other.name and self.values == other.values
+
+    def __hash__(self) -> int:
+        """Returns the hash of the name and the values."""
+        return hash((self.name, self.key))
+
+    def __repr__(self) -> str:
+        """Returns the name and the key of the profile."""
+        return f"SettingsProfile({self.name!r}, key={self.key[:12]})"
+
+
+class ProfileStore:
+    """A directory with a JSON file for every profile.
+
+    Args:
+        directory (str): The directory of the profiles, it is created with the first profile that is saved
+
+    Attributes:
+        directory (Path): The directory of the profiles
+    """
+
+    def __init__(self, directory=PROFILE_DIRECTORY) -> None:
+        """Initializes the ProfileStore."""
+        self.directory = Path(directory)
+
+    def path(self, name: str) -> Path:
+        """Returns the file of a profile.
+
+        Args:
+            name (str): The name of the profile
+
+        Raises:
+            ValueError: If the name is not a valid file name
+        """
+        if not name or name != Path(name).name or name.startswith("."):
+            raise ValueError(f"Invalid profile name {name!r}")
+        return self.directory / f"{name}.json"
+
+    def names(self) -> list:
+        """Returns the names of the saved profiles in alphabetical order."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(path.stem for path in self.directory.glob("*.json"))
+
+    def save(self, profile: SettingsProfile) -> Path:
+        """Saves a profile, a saved profile with the same name is replaced.
+
+        Args:
+            profile (SettingsProfile): The profile
+
+        Returns:
+            Path: The file of the profile
+        """
+        path = self.path(profile.name)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        partial_path = path.with_name(path.name + ".partial")
+        partial_path.write_text(profile.to_json())
+        os.replace(partial_path, path)
+        logger.debug("Saved settings profile %s to %s", profile.name, path)
+        return path
+
+    def load(self, name: str) -> SettingsProfile:
+        """Loads a saved profile.
+
+        Args:
+            name (str): The name of the profile
+
+        Returns:
+            SettingsProfile: The profile
+
+        Raises:
+            KeyError: If there is no profile with the name
+        """
+        path = self.path(name)
+        if not path.exists():
+            raise KeyError(f"No settings profile {name} in {self.directory}")
+        return SettingsProfile.from_json(path.read_text())
+
+    def delete(self, name: str) -> None:
+        """Deletes a saved profile if it exists.
+
+        Args:
+            name (str): The name of the profile
+        """
+        self.path(name).unlink(missing_ok=True)
@@ -0,0 +1,175 @@
+"""Per stage timing and memory instrumentation of measurements.
+
+A MeasurementProfile records the wall time, the CPU time of the executing thread and optionally the peak of the
+memory allocated by Python for every stage of a measurement. If profiling is off the stages are entered on DISABLED,
+which records nothing, so the instrumentation stays in place at the cost of an empty context manager per stage.
+"""
+
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Profiling modes
+OFF = "Off"
+TIME = "Time"
+MEMORY = "Time and memory"
+
+PROFILING_MODES = [OFF, TIME, MEMORY]
+
+# tracemalloc is started by the first profile that traces memory and stopped by the last one
+_tracing_lock = threading.Lock()
+_tracing_profiles = 0
+_started_tracing = False
+
+
+def _start_tracing() -> None:
+    """Registers a profile that traces memory and starts tracemalloc if it is not running."""
+    global _tracing_profiles, _started_tracing
+    with _tracing_lock:
+        if _tracing_profiles == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_profiles += 1
+
+
+def _stop_tracing() -> None:
+    """Unregisters a profile that traces memory and stops tracemalloc if it was started for the profiles."""
+    global _tracing_profiles, _started_tracing
+    with _tracing_lock:
+        _tracing_profiles -= 1
+        if _tracing_profiles == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class MeasurementProfile:
+    """The wall time, CPU time and peak allocation of the stages of one measurement.
+
+    The CPU time is the time of the thread that executes the stage. The peak allocation is the peak of the memory
+    traced by tracemalloc during the stage above the memory traced when the stage was entered. tracemalloc traces
+    the whole process, so allocations of stages that run at the same time on other threads, e.g. the preparation of
+    the next queued measurement, are included.
+
+    Args:
+        trace_memory (bool): Whether the peak allocation is recorded
+
+    Attributes:
+        enabled (bool): Whether the profile records the stages
+        trace_memory (bool): Whether the peak allocation is recorded
+        stages (dict): The recorded values of every stage in the order the stages finished
+    """
+
+    enabled = True
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        """Initializes the MeasurementProfile."""
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._closed = False
+        if trace_memory:
+            _start_tracing()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Records the stage that is executed in the context.
+
+        Args:
+            name (str): The name of the stage
+        """
+        if self.trace_memory:
+            traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            record = {
+                "wall_time": time.perf_counter() - wall_start,
+                "cpu_time": time.thread_time() - cpu_start,
+            }
+            if self.trace_memory:
+                record["peak_memory"] = max(tracemalloc.get_traced_memory()[1] - traced_before, 0)
+            self.stages[name] = record
+            logger.debug("Stage %s: %s", name, record)
+
+    def add_stages(self, stages: dict) -> None:
+        """Adds stages that were recorded by another profile, e.g. in a processing process.
+
+        Args:
+            stages (dict): The recorded stages as returned by to_dict
+        """
+        for name, record in stages.items():
+            self.stages[name] = dict(record)
+
+    def to_dict(self) -> dict:
+        """Returns the recorded stages.
+
+        Returns:
+            dict: The wall time and CPU time in s and the peak allocation in bytes of every stage
+        """
+        return {name: dict(record) for name, record in self.stages.items()}
+
+    def close(self) -> None:
+        """Releases tracemalloc, the profile does not record memory afterwards."""
+        if self.trace_memory and not self._closed:
+            _stop_tracing()
+        self._closed = True
+        self.trace_memory = False
+
+
+class DisabledProfile:
+    """A profile that records nothing, used if profiling is off.
+
+    Attributes:
+        enabled (bool): Whether the profile records the stages
+    """
+
+    enabled = False
+
+    _stage = nullcontext()
+
+    def stage(self, name: str):
+        """Returns a context that does nothing.
+
+        Args:
+            name (str): The name of the stage
+        """
+        return self._stage
+
+    def add_stages(self, stages: dict) -> None:
+        """Does nothing.
+
+        Args:
+            stages (dict): The recorded stages as returned by to_dict
+        """
+
+    def to_dict(self) -> dict:
+        """Returns an empty dictionary."""
+        return {}
+
+    def close(self) -> None:
+        """Does nothing."""
+
+
+DISABLED = DisabledProfile()
+
+
+def create_profile(mode: str):
+    """Returns the profile of a measurement for a profiling mode.
+
+    Args:
+        mode (str): One of PROFILING_MODES
+
+    Returns:
+        MeasurementProfile: A new profile or DISABLED if profiling is off
+    """
+    if mode == TIME:
+        return MeasurementProfile()
+    if mode == MEMORY:
+        return MeasurementProfile(trace_memory=True)
+    return DISABLED
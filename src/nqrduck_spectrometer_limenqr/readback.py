@@ -0,0 +1,250 @@
+"""Streaming readback of the acquisitions written by the LimeDriver.
+
+The driver stores every run as a dataset with one row per acquisition and the I and Q samples interleaved
+along the row. Instead of loading the whole file like limedriver.hdf_reader.HDF, only the samples inside the
+RX window are read into a single preallocated buffer. Uncompressed datasets are memory mapped and converted
+directly from the mapped file, other datasets are read in chunks.
+"""
+
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class TimeAxis:
+    """The time axis of an acquisition in µs, evaluated on demand.
+
+    The values are computed exactly like the tdx array of limedriver.hdf_reader.HDF, so window selections are identical.
+
+    Args:
+        srate_mhz (float): The sampling rate in MHz
+        n_samples (int): The number of samples of the acquisition
+    """
+
+    def __init__(self, srate_mhz: float, n_samples: int) -> None:
+        """Initializes the TimeAxis."""
+        self.srate_mhz = srate_mhz
+        self.n_samples = n_samples
+
+    def __len__(self) -> int:
+        """The number of samples of the acquisition."""
+        return self.n_samples
+
+    def __getitem__(self, index: int) -> float:
+        """The time of a single sample in µs."""
+        return (1 / self.srate_mhz * np.array([index]))[0]
+
+    def index_after(self, time: float) -> int:
+        """Returns the index of the first sample after the given time.
+
+        The index is estimated from the sampling rate and corrected against the exact sample times, so rounding
+        of samples that lie on the boundary is handled like a comparison with the full time axis.
+
+        Args:
+            time (float): The time in µs
+
+        Returns:
+            int: The index of the first sample that is later than time, n_samples if there is none
+        """
+        index = self._clip(np.floor(time * float(self.srate_mhz)) + 1)
+        while index > 0 and self[index - 1] > time:
+            index -= 1
+        while index < self.n_samples and self[index] <= time:
+            index += 1
+        return index
+
+    def index_from(self, time: float) -> int:
+        """Returns the index of the first sample at or after the given time.
+
+        Args:
+            time (float): The time in µs
+
+        Returns:
+            int: The index of the first sample that is not earlier than time, n_samples if there is none
+        """
+        index = self._clip(np.ceil(time * float(self.srate_mhz)))
+        while index > 0 and self[index - 1] >= time:
+            index -= 1
+        while index < self.n_samples and self[index] < time:
+            index += 1
+        return index
+
+    def _clip(self, estimate: float) -> int:
+        """Clips an estimated index to the valid range."""
+        return int(min(max(estimate, 0), self.n_samples))
+
+    def values(self, start: int, stop: int) -> np.ndarray:
+        """The times of the samples in [start, stop) in µs."""
+        return 1 / self.srate_mhz * np.arange(start, stop)
+
+
+class AcquisitionReader:
+    """Reads the RX data of a LimeDriver HDF file lazily.
+
+    Args:
+        path (str): The path of the HDF file
+        chunk_size (int): The number of samples that are read from the file at once
+        memory_map (bool): Whether uncompressed datasets are memory mapped instead of read in chunks
+
+    Attributes:
+        path (str): The path of the HDF file
+        chunk_size (int): The number of samples that are read from the file at once
+        memory_map (bool): Whether uncompressed datasets are memory mapped instead of read in chunks
+    """
+
+    DEFAULT_CHUNK_SIZE = 1 << 16
+    MAPPED_BLOCK_SIZE = 1 << 12
+
+    def __init__(
+        self, path, chunk_size: int = DEFAULT_CHUNK_SIZE, memory_map: bool = True
+    ) -> None:
+        """Initializes the AcquisitionReader and opens the file."""
+        # h5py is imported with the first acquisition, so loading the plugin does not import it
+        import h5py
+
+        self.path = path
+        self.chunk_size = chunk_size
+        self.memory_map = memory_map
+        self._file = h5py.File(path, "r")
+        self._datasets = [self._file[key] for key in self._file.keys()]
+        if not self._datasets:
+            self.close()
+            raise ValueError(f"No acquisitions found in {path}")
+        self._time_axis = None
+        self._mapped_rows = None
+
+    def __enter__(self) -> "AcquisitionReader":
+        """Returns the reader for use as a context manager."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Closes the file."""
+        self.close()
+
+    def close(self) -> None:
+        """Closes the file and releases the memory maps."""
+        self._mapped_rows = None
+        self._file.close()
+
+    @property
+    def n_samples(self) -> int:
+        """The number of samples of each acquisition."""
+        return self._datasets[0].shape[1] // 2
+
+    @property
+    def n_traces(self) -> int:
+        """The number of acquired traces over all datasets."""
+        return self._datasets[0].shape[0] * len(self._datasets)
+
+    @property
+    def srate_mhz(self) -> float:
+        """The sampling rate in MHz as stored by the driver."""
+        for name, value in self._datasets[0].attrs.items():
+            if name[1:4] == "sra":
+                return value * 1e-6
+        raise KeyError(f"No sampling rate found in {self.path}")
+
+    @property
+    def time_axis(self) -> TimeAxis:
+        """The time axis of the acquisitions in µs."""
+        if self._time_axis is None:
+            self._time_axis = TimeAxis(self.srate_mhz, self.n_samples)
+        return self._time_axis
+
+    def find_window(self, rx_begin: float, rx_stop: float) -> slice:
+        """Finds the samples strictly between rx_begin and rx_stop.
+
+        The time axis is sampled uniformly, so the bounds are computed directly instead of comparing every sample.
+
+        Args:
+            rx_begin (float): The start time of the RX event in µs
+            rx_stop (float): The stop time of the RX event in µs
+
+        Returns:
+            slice: The samples of the RX window
+        """
+        start = self.time_axis.index_after(rx_begin)
+        stop = max(self.time_axis.index_from(rx_stop), start)
+        return slice(start, stop)
+
+    def read(self, window: slice, scale: float = 1) -> np.ndarray:
+        """Reads the complex samples of the window from all traces.
+
+        The samples are ordered like the flattened tdy array of limedriver.hdf_reader.HDF. The samples are scaled
+        while they are converted, the returned array is the only buffer that is allocated.
+
+        Args:
+            window (slice): The samples to read
+            scale (float): The factor the samples are divided by, e.g. the number of averages
+
+        Returns:
+            np.ndarray: The complex samples
+        """
+        start, stop, _ = window.indices(self.n_samples)
+        data = np.empty((max(stop - start, 0), self.n_traces), dtype=complex)
+        # The real and imaginary parts of every sample, in the same order as the interleaved samples in the file
+        parts = data.view(float).reshape(len(data), self.n_traces, 2)
+        # Dividing a complex number by a real number multiplies it with the reciprocal, so converting and scaling
+        # in one step gives the same values as dividing the complex samples
+        factor = 1.0 / scale
+
+        rows = self.map_rows() if self.memory_map else None
+        if rows is not None:
+            # Blocks of samples of all traces keep the written part of the buffer in the cache
+            for block_start in range(start, stop, self.MAPPED_BLOCK_SIZE):
+                block_stop = min(block_start + self.MAPPED_BLOCK_SIZE, stop)
+                target = parts[block_start - start : block_stop - start]
+                for column, row in enumerate(rows):
+                    raw = row[2 * block_start : 2 * block_stop].reshape(-1, 2)
+                    np.multiply(raw, factor, out=target[:, column])
+            return data.reshape(-1)
+
+        rows_per_dataset = self._datasets[0].shape[0]
+        for chunk_start in range(start, stop, self.chunk_size):
+            chunk_stop = min(chunk_start + self.chunk_size, stop)
+            target = parts[chunk_start - start : chunk_stop - start]
+            for dataset_index, dataset in enumerate(self._datasets):
+                for row in range(rows_per_dataset):
+                    column = dataset_index * rows_per_dataset + row
+                    raw = dataset[row, 2 * chunk_start : 2 * chunk_stop].reshape(-1, 2)
+                    np.multiply(raw, factor, out=target[:, column])
+        return data.reshape(-1)
+
+    def map_rows(self) -> list:
+        """Returns memory maps of the rows of all datasets in the order of the traces.
+
+        The driver writes one chunk per row without filters, the chunks and contiguous datasets can be mapped
+        directly from the file.
+
+        Returns:
+            list: The interleaved I and Q samples of every trace or None if a dataset can not be mapped
+        """
+        if self._mapped_rows is None:
+            self._mapped_rows = self._map_rows()
+        return self._mapped_rows or None
+
+    def _map_rows(self) -> list:
+        """Maps the rows of all datasets, returns an empty list if a dataset is filtered or not written."""
+        mapping = None
+        rows = []
+        for dataset in self._datasets:
+            n_rows, row_length = dataset.shape
+            if dataset.id.get_create_plist().get_nfilters():
+                return []
+
+            offset = dataset.id.get_offset()
+            if offset is not None:
+                offsets = [offset + row * row_length * dataset.dtype.itemsize for row in range(n_rows)]
+            elif dataset.chunks == (1, row_length) and hasattr(dataset.id, "get_chunk_info_by_coord"):
+                offsets = [dataset.id.get_chunk_info_by_coord((row, 0)).byte_offset for row in range(n_rows)]
+            else:
+                return []
+            if None in offsets:
+                return []
+
+            if mapping is None:
+                mapping = np.memmap(self.path, dtype=np.uint8, mode="r")
+            size = row_length * dataset.dtype.itemsize
+            rows.extend(mapping[offset : offset + size].view(dataset.dtype) for offset in offsets)
+        return rows
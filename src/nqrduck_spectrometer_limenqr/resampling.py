@@ -0,0 +1,321 @@
+"""Resampling of the acquired RX data to the dwell time.
+
+The dwell time conversion can be done by different engines:
+
+- FFT: scipy.signal.resample over the whole record. Works for every ratio, but is slow for awkward lengths.
+- Polyphase: scipy.signal.resample_poly with a rational approximation of the rate ratio.
+- Decimate: FIR anti-alias filtering and integer decimation with scipy.signal.decimate.
+- Boxcar: Averaging of blocks of samples like a single stage CIC filter. The cheapest engine, but it has the
+  weakest alias suppression.
+
+Decimate and Boxcar need an integer ratio between the sampling rate and the output rate.
+
+The FFT engine and the pulse shape resampling use fft_resample. It computes the same result as
+scipy.signal.resample, but evaluates transforms of lengths without small prime factors with Bluestein's algorithm
+on an FFT of a fast length.
+"""
+
+import logging
+from fractions import Fraction
+from functools import lru_cache
+import numpy as np
+
+# scipy is imported by the functions that use it, so loading the plugin does not import it
+
+logger = logging.getLogger(__name__)
+
+AUTO = "Auto"
+FFT = "FFT"
+POLYPHASE = "Polyphase"
+DECIMATE = "Decimate"
+BOXCAR = "Boxcar"
+
+ENGINES = [AUTO, FFT, POLYPHASE, DECIMATE, BOXCAR]
+
+# Largest up or down factor that is used for polyphase resampling, larger factors make the filter too long
+MAX_POLYPHASE_FACTOR = 1024
+
+# Transforms shorter than this are always computed directly, the chirp transform only pays off for long records
+MIN_CHIRP_LENGTH = 1024
+
+# Largest drift of the output time axis over the record, in output samples, that a rational approximation may cause
+MAX_DRIFT = 0.1
+
+
+def is_close_ratio(approximation: float, ratio: float, n_out: int) -> bool:
+    """Checks if an approximated rate ratio keeps the output time axis in place.
+
+    Args:
+        approximation (float): The approximated ratio
+        ratio (float): The exact ratio of input samples per output sample
+        n_out (int): The number of output samples
+
+    Returns:
+        bool: True if the output drifts by less than MAX_DRIFT samples over the record
+    """
+    return abs(approximation - ratio) / ratio * n_out < MAX_DRIFT
+
+
+def decimation_factor(ratio: float, n_out: int) -> int:
+    """Returns the integer decimation factor for a rate ratio.
+
+    Args:
+        ratio (float): The number of input samples per output sample
+        n_out (int): The number of output samples
+
+    Returns:
+        int: The decimation factor or 0 if the ratio is not an integer
+    """
+    factor = round(ratio)
+    if factor < 2 or not is_close_ratio(factor, ratio, n_out):
+        return 0
+    return factor
+
+
+def polyphase_factors(ratio: float, n_out: int) -> tuple:
+    """Returns the up and down factors of the polyphase resampling for a rate ratio.
+
+    Args:
+        ratio (float): The number of input samples per output sample
+        n_out (int): The number of output samples
+
+    Returns:
+        tuple: The up and down factors or None if there is no rational approximation with small factors
+    """
+    if ratio <= 0:
+        return None
+    approximation = Fraction(ratio).limit_denominator(MAX_POLYPHASE_FACTOR)
+    down, up = approximation.numerator, approximation.denominator
+    if down == 0 or down > MAX_POLYPHASE_FACTOR:
+        return None
+    if not is_close_ratio(down / up, ratio, n_out):
+        return None
+    return up, down
+
+
+def select_engine(ratio: float, n_out: int) -> str:
+    """Selects the resampling engine for a rate ratio.
+
+    Integer ratios are decimated, ratios with a short rational approximation are resampled with a polyphase
+    filter and everything else falls back to the FFT.
+
+    Args:
+        ratio (float): The number of input samples per output sample
+        n_out (int): The number of output samples
+
+    Returns:
+        str: The name of the engine
+    """
+    if decimation_factor(ratio, n_out):
+        return DECIMATE
+    if polyphase_factors(ratio, n_out):
+        return POLYPHASE
+    return FFT
+
+
+def resample_fid(
+    tdy: np.ndarray, n_out: int, engine: str = AUTO, ratio: float = None
+) -> np.ndarray:
+    """Resamples the RX data to n_out samples.
+
+    Args:
+        tdy (np.ndarray): The RX data
+        n_out (int): The number of output samples
+        engine (str): One of ENGINES
+        ratio (float): The number of input samples per output sample, e.g. dwell time times sampling rate.
+            Defaults to the ratio of the lengths.
+
+    Returns:
+        np.ndarray: The resampled RX data
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown resampling engine {engine}")
+    if n_out <= 0:
+        return fft_resample(tdy, max(n_out, 0))
+    if ratio is None:
+        ratio = len(tdy) / n_out
+
+    if engine in (DECIMATE, BOXCAR) and not decimation_factor(ratio, n_out):
+        logger.warning(
+            "%s resampling needs an integer rate ratio, a ratio of %s is resampled automatically",
+            engine,
+            ratio,
+        )
+        engine = AUTO
+    if engine == POLYPHASE and not polyphase_factors(ratio, n_out):
+        logger.warning("No polyphase filter for a rate ratio of %s, using FFT resampling", ratio)
+        engine = FFT
+    if engine == AUTO:
+        engine = select_engine(ratio, n_out)
+
+    logger.debug("Resampling %s to %s samples with %s", len(tdy), n_out, engine)
+    from scipy.signal import decimate, resample_poly
+
+    if engine == DECIMATE:
+        return fit_length(decimate(tdy, decimation_factor(ratio, n_out), ftype="fir"), n_out)
+    if engine == BOXCAR:
+        factor = decimation_factor(ratio, n_out)
+        n_blocks = len(tdy) // factor
+        blocks = tdy[: factor * n_blocks].reshape(n_blocks, factor)
+        return fit_length(blocks.mean(axis=1), n_out)
+    if engine == POLYPHASE:
+        up, down = polyphase_factors(ratio, n_out)
+        return fit_length(resample_poly(tdy, up, down), n_out)
+    return fft_resample(tdy, n_out)
+
+
+def fft_resample(x: np.ndarray, num: int) -> np.ndarray:
+    """Resamples x to num samples with the Fourier method of scipy.signal.resample.
+
+    Only the frequency bins that survive the resampling are computed. If the length of a transform has large prime
+    factors, the transform is evaluated as a chirp convolution on an FFT of length scipy.fft.next_fast_len, whose
+    chirps and kernel spectra are cached for repeated lengths. The result agrees with scipy.signal.resample to within
+    1e-12 of the largest output sample.
+
+    Args:
+        x (np.ndarray): The one dimensional signal
+        num (int): The number of output samples
+
+    Returns:
+        np.ndarray: The resampled signal, real if x is real
+    """
+    x = np.asarray(x)
+    n = len(x)
+    if n == 0 or num <= 0 or (is_fast_length(n) and is_fast_length(num)):
+        from scipy.signal import resample
+
+        return resample(x, num)
+
+    # Frequency bins of the output, see scipy.signal.resample
+    m = min(num, n)
+    m2 = m // 2 + 1
+    n_negative = m - m2
+    # When downsampling to an even length, the negative Nyquist bin is folded into the positive one
+    folded = m % 2 == 0 and num < n
+    first = -n_negative - folded
+
+    spectrum = dft_bins(x.astype(complex, copy=False), first, m2 - first)
+    if folded:
+        spectrum = np.concatenate((spectrum[1:-1], [spectrum[-1] + spectrum[0]]))
+        first += 1
+    elif m % 2 == 0 and n < num:
+        # When upsampling from an even length, the Nyquist bin is split into a pair of bins
+        nyquist = spectrum[-1] / 2
+        spectrum = np.concatenate(([nyquist], spectrum[:-1], [nyquist]))
+        first -= 1
+
+    y = idft_from_bins(spectrum, first, num) * (num / n)
+    if not np.iscomplexobj(x):
+        return y.real
+    return y
+
+
+def is_fast_length(n: int) -> bool:
+    """Checks if an FFT of length n is fast or short enough to be computed directly."""
+    from scipy import fft as sp_fft
+
+    return n < MIN_CHIRP_LENGTH or sp_fft.next_fast_len(n) == n
+
+
+def dft_bins(x: np.ndarray, first: int, count: int) -> np.ndarray:
+    """Computes count consecutive bins of the DFT of x, starting at the (possibly negative) frequency first.
+
+    Args:
+        x (np.ndarray): The complex signal
+        first (int): The first frequency bin
+        count (int): The number of bins
+
+    Returns:
+        np.ndarray: The DFT bins
+    """
+    n = len(x)
+    # The chirp convolution has length n + count - 1, with most bins a direct transform is just as fast
+    if is_fast_length(n) or 2 * count > n:
+        from scipy import fft as sp_fft
+
+        return sp_fft.fft(x)[np.arange(first, first + count) % n]
+    return chirp_transform(x, n, -1, 0, first, count)
+
+
+def idft_from_bins(bins: np.ndarray, first: int, num: int) -> np.ndarray:
+    """Computes the inverse DFT of length num of a spectrum that is zero outside of the given consecutive bins.
+
+    Args:
+        bins (np.ndarray): The non zero bins
+        first (int): The (possibly negative) frequency of the first bin
+        num (int): The length of the inverse DFT
+
+    Returns:
+        np.ndarray: The signal
+    """
+    if is_fast_length(num) or 2 * len(bins) > num:
+        from scipy import fft as sp_fft
+
+        spectrum = np.zeros(num, dtype=complex)
+        spectrum[np.arange(first, first + len(bins)) % num] = bins
+        return sp_fft.ifft(spectrum)
+    return chirp_transform(bins, num, 1, first, 0, num) / num
+
+
+def chirp_transform(z: np.ndarray, period: int, sign: int, alpha: int, beta: int, count: int) -> np.ndarray:
+    """Evaluates sum_j z[j] exp(sign 2 pi i (j + alpha) (k + beta) / period) for k < count with Bluestein's algorithm.
+
+    Args:
+        z (np.ndarray): The complex input
+        period (int): The length of the DFT the input belongs to
+        sign (int): -1 for a forward and 1 for an inverse transform
+        alpha (int): The frequency or time offset of the input
+        beta (int): The frequency or time offset of the output
+        count (int): The number of output values
+
+    Returns:
+        np.ndarray: The transform
+    """
+    from scipy import fft as sp_fft
+
+    pre, kernel, post, length = chirp_plan(len(z), period, sign, alpha, beta, count)
+    convolution = sp_fft.ifft(sp_fft.fft(z * pre, length) * kernel)
+    return convolution[len(z) - 1 : len(z) - 1 + count] * post
+
+
+@lru_cache(maxsize=32)
+def chirp_plan(n: int, period: int, sign: int, alpha: int, beta: int, count: int) -> tuple:
+    """Precomputes the chirps and the kernel spectrum of a chirp transform.
+
+    The products j * k are split as (j^2 + k^2 - (k - j)^2) / 2. The exponents are reduced modulo 2 * period in
+    integers before they are converted to phases, so the chirps stay exact for long transforms.
+
+    Returns:
+        tuple: The input chirp, the kernel spectrum, the output chirp and the FFT length
+    """
+    from scipy import fft as sp_fft
+
+    length = sp_fft.next_fast_len(n + count - 1, real=False)
+    j = np.arange(n, dtype=np.int64)
+    k = np.arange(count, dtype=np.int64)
+    q = np.arange(-(n - 1), count, dtype=np.int64)
+
+    def phase(numerator: np.ndarray) -> np.ndarray:
+        return np.exp(sign * 1j * np.pi * (numerator % (2 * period)) / period)
+
+    pre = phase(j * j + 2 * j * beta)
+    post = phase(k * k + 2 * alpha * k + 2 * alpha * beta)
+    kernel = sp_fft.fft(np.conj(phase(q * q)), length)
+    for array in (pre, kernel, post):
+        array.flags.writeable = False
+    return pre, kernel, post, length
+
+
+def fit_length(data: np.ndarray, n: int) -> np.ndarray:
+    """Trims the data to n samples or pads it with its last sample.
+
+    Args:
+        data (np.ndarray): The data
+        n (int): The number of samples
+
+    Returns:
+        np.ndarray: The data with n samples
+    """
+    if len(data) >= n:
+        return data[:n]
+    return np.pad(data, (0, n - len(data)), mode="edge")
@@ -0,0 +1,531 @@
+"""Compiler that translates pulse sequences into the pulse arrays of the LimeDriver."""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+
+from .resampling import fft_resample
+
+logger = logging.getLogger(__name__)
+
+# The option names of TXPulse and RXReadout of nqrduck_spectrometer.pulseparameters, which imports Qt
+RELATIVE_AMPLITUDE = "Relative TX Amplitude"
+TX_PULSE_SHAPE = "TX Pulse Shape"
+RX_READOUT = "RX"
+
+
+class CompiledSequence:
+    """The pulse arrays of a pulse sequence as they are passed to the LimeDriver.
+
+    Every array has one entry per sample of the transmitted pulses.
+
+    Args:
+        frequency (np.ndarray): The IF frequency of each sample (p_frq)
+        duration (np.ndarray): The duration of each sample (p_dur)
+        amplitude (np.ndarray): The IF amplitude of each sample (p_amp)
+        offset (np.ndarray): The offset in samples before each sample (p_offs)
+        phase (np.ndarray): The IF phase of each sample (p_pha)
+        repetition_time (float): The repetition time of the sequence in s
+        rx_window (tuple): The start and the duration of the RX event in s or None if there is no RX event
+
+    Attributes:
+        frequency (np.ndarray): The IF frequency of each sample (p_frq)
+        duration (np.ndarray): The duration of each sample (p_dur)
+        amplitude (np.ndarray): The IF amplitude of each sample (p_amp)
+        offset (np.ndarray): The offset in samples before each sample (p_offs)
+        phase (np.ndarray): The IF phase of each sample (p_pha)
+        repetition_time (float): The repetition time of the sequence in s
+        rx_window (tuple): The start and the duration of the RX event in s or None if there is no RX event
+    """
+
+    def __init__(
+        self,
+        frequency: np.ndarray,
+        duration: np.ndarray,
+        amplitude: np.ndarray,
+        offset: np.ndarray,
+        phase: np.ndarray,
+        repetition_time: float,
+        rx_window: tuple = None,
+    ) -> None:
+        """Initializes the CompiledSequence."""
+        self.frequency = frequency
+        self.duration = duration
+        self.amplitude = amplitude
+        self.offset = offset
+        self.phase = phase
+        self.repetition_time = repetition_time
+        self.rx_window = rx_window
+        # Compiled sequences are shared by the cache
+        for array in (frequency, duration, amplitude, offset, phase):
+            array.setflags(write=False)
+
+    @property
+    def n_pulses(self) -> int:
+        """The number of pulse samples of the sequence."""
+        return len(self.frequency)
+
+    def apply(self, lime) -> None:
+        """Writes the pulse arrays to the limr object.
+
+        The binding only accepts lists, the conversion is done by numpy in a single call per array.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+        """
+        lime.p_frq = self.frequency.tolist()
+        lime.p_dur = self.duration.tolist()
+        lime.p_amp = self.amplitude.tolist()
+        lime.p_offs = self.offset.tolist()
+        lime.p_pha = self.phase.tolist()
+        lime.reptime_secs = float(self.repetition_time)
+        lime.Npulses = self.n_pulses
+
+
+class PulseSegment:
+    """The modulated samples of a single transmit pulse.
+
+    Args:
+        event_index (int): The index of the event that contains the pulse
+        amplitude (np.ndarray): The modulated amplitude of each sample
+        phase (np.ndarray): The modulated phase of each sample
+        resolution (float): The resolution of the pulse shape in s
+        offset (int): The offset in samples before the first sample of the pulse
+
+    Attributes:
+        event_index (int): The index of the event that contains the pulse
+        amplitude (np.ndarray): The modulated amplitude of each sample
+        phase (np.ndarray): The modulated phase of each sample
+        resolution (float): The resolution of the pulse shape in s
+        offset (int): The offset in samples before the first sample of the pulse
+    """
+
+    def __init__(
+        self,
+        event_index: int,
+        amplitude: np.ndarray,
+        phase: np.ndarray,
+        resolution: float,
+        offset: int,
+    ) -> None:
+        """Initializes the PulseSegment."""
+        self.event_index = event_index
+        self.amplitude = amplitude
+        self.phase = phase
+        self.resolution = resolution
+        self.offset = offset
+
+    def __len__(self) -> int:
+        """The number of samples of the pulse."""
+        return len(self.amplitude)
+
+
+class SequenceAnalysis:
+    """The result of a single pass over the events of a pulse sequence.
+
+    The number of pulse samples is known before the pulse arrays are assembled, so the limr object can be
+    created with the correct size without evaluating the pulse shapes a second time.
+
+    Args:
+        segments (list): The PulseSegment of every transmit pulse in sequence order
+        if_frequency (float): The IF frequency of the pulses in Hz
+        srate (float): The sampling rate of the spectrometer in Hz
+        repetition_time (float): The repetition time of the sequence in s
+        rx_window (tuple): The start and the duration of the RX event in s or None if there is no RX event
+
+    Attributes:
+        segments (list): The PulseSegment of every transmit pulse in sequence order
+        if_frequency (float): The IF frequency of the pulses in Hz
+        srate (float): The sampling rate of the spectrometer in Hz
+        repetition_time (float): The repetition time of the sequence in s
+        rx_window (tuple): The start and the duration of the RX event in s or None if there is no RX event
+    """
+
+    def __init__(
+        self,
+        segments: list,
+        if_frequency: float,
+        srate: float,
+        repetition_time: float,
+        rx_window: tuple,
+    ) -> None:
+        """Initializes the SequenceAnalysis."""
+        self.segments = segments
+        self.if_frequency = if_frequency
+        self.srate = srate
+        self.repetition_time = repetition_time
+        self.rx_window = rx_window
+
+    @property
+    def n_pulses(self) -> int:
+        """The number of pulse samples of the sequence."""
+        return sum(len(segment) for segment in self.segments)
+
+    def assemble(self) -> CompiledSequence:
+        """Assembles the segments into the pulse arrays of the sequence.
+
+        Returns:
+            CompiledSequence: The pulse arrays of the sequence
+        """
+        lengths = np.array([len(segment) for segment in self.segments], dtype=int)
+        n_pulses = int(lengths.sum())
+        if n_pulses == 0:
+            empty = np.empty(0)
+            return CompiledSequence(
+                empty,
+                empty,
+                empty,
+                np.empty(0, dtype=int),
+                empty,
+                self.repetition_time,
+                self.rx_window,
+            )
+
+        resolutions = np.array([segment.resolution for segment in self.segments])
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        frequency = np.full(n_pulses, float(self.if_frequency))
+        duration = np.repeat(resolutions, lengths)
+        amplitude = np.concatenate(
+            [segment.amplitude for segment in self.segments]
+        ).astype(float, copy=False)
+        phase = np.concatenate([segment.phase for segment in self.segments]).astype(
+            float, copy=False
+        )
+        # Every sample after the first one of a pulse is offset by the resolution of the pulse shape
+        offset = np.repeat((resolutions * self.srate).astype(int), lengths)
+        offset[starts] = [segment.offset for segment in self.segments]
+
+        return CompiledSequence(
+            frequency,
+            duration,
+            amplitude,
+            offset,
+            phase,
+            self.repetition_time,
+            self.rx_window,
+        )
+
+
+class PulseSequenceCompiler:
+    """Compiles the events of a pulse sequence into a CompiledSequence.
+
+    The events are analyzed in a single pass that evaluates and modulates every pulse shape once, the resulting
+    arrays are then assembled in one vectorized pass instead of extending Python lists sample by sample.
+
+    Args:
+        tx_parameter (str): The name of the TX pulse parameter of the spectrometer
+        rx_parameter (str): The name of the RX pulse parameter of the spectrometer
+        offset_first_pulse (int): The offset in samples of the first pulse of the sequence
+
+    Attributes:
+        tx_parameter (str): The name of the TX pulse parameter of the spectrometer
+        rx_parameter (str): The name of the RX pulse parameter of the spectrometer
+        offset_first_pulse (int): The offset in samples of the first pulse of the sequence
+    """
+
+    def __init__(
+        self, tx_parameter: str, rx_parameter: str, offset_first_pulse: int
+    ) -> None:
+        """Initializes the PulseSequenceCompiler."""
+        self.tx_parameter = tx_parameter
+        self.rx_parameter = rx_parameter
+        self.offset_first_pulse = offset_first_pulse
+
+    def compile(
+        self, events: list, if_frequency: float, srate: float
+    ) -> CompiledSequence:
+        """Compiles the events of a pulse sequence.
+
+        Args:
+            events (list): The pulse sequence events
+            if_frequency (float): The IF frequency of the pulses in Hz
+            srate (float): The sampling rate of the spectrometer in Hz
+
+        Returns:
+            CompiledSequence: The pulse arrays of the sequence
+        """
+        return self.analyze(events, if_frequency, srate).assemble()
+
+    def analyze(
+        self, events: list, if_frequency: float, srate: float
+    ) -> SequenceAnalysis:
+        """Evaluates and modulates every transmit pulse of a pulse sequence once.
+
+        Args:
+            events (list): The pulse sequence events
+            if_frequency (float): The IF frequency of the pulses in Hz
+            srate (float): The sampling rate of the spectrometer in Hz
+
+        Returns:
+            SequenceAnalysis: The modulated pulses, the repetition time and the RX window of the sequence
+        """
+        segments = []
+        tx_events, blank_durations = self.get_blank_durations(events)
+
+        for index, event in enumerate(events):
+            if not tx_events[index]:
+                continue
+            for parameter in event.parameters.values():
+                if not self.is_translatable_tx_parameter(parameter):
+                    continue
+
+                pulse_shape, pulse_amplitude = self.prepare_pulse_amplitude(
+                    event, parameter
+                )
+                pulse_amplitude, modulated_phase = self.modulate_pulse_amplitude(
+                    pulse_amplitude, event, if_frequency, srate
+                )
+                if len(pulse_amplitude) == 0:
+                    continue
+
+                if not segments:
+                    offset = self.offset_first_pulse
+                else:
+                    offset = int(np.ceil(blank_durations[index] * srate))
+
+                segments.append(
+                    PulseSegment(
+                        index,
+                        pulse_amplitude,
+                        modulated_phase,
+                        float(pulse_shape.resolution),
+                        offset,
+                    )
+                )
+
+        repetition_time = float(events[-1].duration) if events else 0.0
+        return SequenceAnalysis(
+            segments,
+            if_frequency,
+            srate,
+            repetition_time,
+            self.find_rx_window(events),
+        )
+
+    def is_translatable_tx_parameter(self, parameter) -> bool:
+        """Checks if a parameter a pulse with a transmit pulse shape (amplitude nonzero).
+
+        Args:
+            parameter (Parameter): The parameter to check
+        """
+        return (
+            parameter.name == self.tx_parameter
+            and parameter.get_option_by_name(RELATIVE_AMPLITUDE).value > 0
+        )
+
+    def prepare_pulse_amplitude(self, event, parameter) -> tuple:
+        """Prepares the pulse amplitude for the limr object.
+
+        Args:
+            event (Event): The event that contains the parameter
+            parameter (Parameter): The parameter that contains the pulse shape and amplitude
+
+        Returns:
+            tuple: A tuple containing the pulse shape and the pulse amplitude
+        """
+        pulse_shape = parameter.get_option_by_name(TX_PULSE_SHAPE).value
+        pulse_amplitude = abs(pulse_shape.get_pulse_amplitude(event.duration)) * (
+            parameter.get_option_by_name(RELATIVE_AMPLITUDE).value / 100
+        )
+        pulse_amplitude = np.clip(pulse_amplitude, -0.99, 0.99)
+
+        return pulse_shape, pulse_amplitude
+
+    def modulate_pulse_amplitude(
+        self, pulse_amplitude: np.ndarray, event, if_frequency: float, srate: float
+    ) -> tuple:
+        """Modulates the pulse amplitude. We need to do this to have the pulse at IF frequency instead of LO frequency.
+
+        Args:
+            pulse_amplitude (np.ndarray): The pulse amplitude
+            event (Event): The event that contains the parameter
+            if_frequency (float): The IF frequency of the pulses in Hz
+            srate (float): The sampling rate of the spectrometer in Hz
+
+        Returns:
+            tuple: A tuple containing the modulated pulse amplitude and the modulated phase
+        """
+        duration = float(event.duration)
+        num_samples = int(duration * srate)
+        carrier_phase = carrier_phase_table(float(if_frequency), duration, num_samples)
+
+        # The pulse amplitude needs to be resampled to the number of samples
+        logger.debug("Resampling pulse amplitude to %s samples", num_samples)
+        pulse_amplitude = fft_resample(pulse_amplitude, num_samples)
+
+        return self.fuse_amplitude_phase(pulse_amplitude, carrier_phase)
+
+    def fuse_amplitude_phase(
+        self, pulse_amplitude: np.ndarray, carrier_phase: np.ndarray
+    ) -> tuple:
+        """Computes amplitude and phase of a real pulse envelope multiplied with the IF carrier.
+
+        For a real envelope a the product a * exp(i phi) has the amplitude |a| and the phase phi, shifted by pi where
+        a is negative. This gives the same result as taking the absolute value and the unwrapped angle of the
+        complex product, without building it.
+
+        Args:
+            pulse_amplitude (np.ndarray): The real pulse envelope
+            carrier_phase (np.ndarray): The phase of the IF carrier in [0, 2 pi)
+
+        Returns:
+            tuple: A tuple containing the modulated pulse amplitude and the modulated phase in [0, 2 pi)
+        """
+        modulated_amplitude = np.abs(pulse_amplitude)
+        modulated_phase = carrier_phase + np.pi * (pulse_amplitude < 0)
+        modulated_phase[modulated_phase >= 2 * np.pi] -= 2 * np.pi
+        return modulated_amplitude, modulated_phase
+
+    # This method could be refactored in a potential pulse sequence module
+    def get_blank_durations(self, events: list) -> tuple:
+        """Determines the blank duration before every event in a single forward sweep.
+
+        The blank duration of an event is the summed duration of the events without a transmit pulse directly before it.
+
+        Args:
+            events (list): The pulse sequence events
+
+        Returns:
+            tuple: A boolean array that marks the events with a transmit pulse and an array with the blank duration in s before each event
+        """
+        tx_events = np.zeros(len(events), dtype=bool)
+        blank_durations = np.zeros(len(events))
+        blank_duration = 0.0
+        for index, event in enumerate(events):
+            blank_durations[index] = blank_duration
+            tx_events[index] = any(
+                self.is_translatable_tx_parameter(parameter)
+                for parameter in event.parameters.values()
+            )
+            if tx_events[index]:
+                blank_duration = 0.0
+            else:
+                blank_duration += float(event.duration)
+        return tx_events, blank_durations
+
+    def find_rx_window(self, events: list) -> tuple:
+        """Finds the first event with an enabled RX readout.
+
+        Args:
+            events (list): The pulse sequence events
+
+        Returns:
+            tuple: The duration of the events before the RX event and the duration of the RX event in s or None if there is no RX event
+        """
+        previous_events_duration = 0
+        for event in events:
+            parameter = event.parameters.get(self.rx_parameter)
+            if parameter and parameter.get_option_by_name(RX_READOUT).value:
+                return float(previous_events_duration), float(event.duration)
+            previous_events_duration += event.duration
+        return None
+
+
+@lru_cache(maxsize=64)
+def carrier_phase_table(if_frequency: float, duration: float, num_samples: int) -> np.ndarray:
+    """Returns the phase of the IF carrier for the samples of a pulse.
+
+    The samples are spread over the duration of the pulse like np.linspace(0, duration, num_samples, endpoint=False).
+    Tables are cached, because the same pulse lengths occur in every measurement.
+
+    Args:
+        if_frequency (float): The IF frequency in Hz
+        duration (float): The duration of the pulse in s
+        num_samples (int): The number of samples of the pulse
+
+    Returns:
+        np.ndarray: The read only phase of the carrier in [0, 2 pi)
+    """
+    tdx = np.linspace(0, duration, num_samples, endpoint=False)
+    phase = np.mod(2 * np.pi * if_frequency * tdx, 2 * np.pi)
+    phase.flags.writeable = False
+    return phase
+
+
+def sequence_fingerprint(events: list) -> str:
+    """Computes a content hash of the events of a pulse sequence.
+
+    Args:
+        events (list): The pulse sequence events
+
+    Returns:
+        str: The hex digest of the events' durations and parameter options
+    """
+    content = [
+        [
+            str(event.duration),
+            [
+                [name, [option.to_json() for option in parameter.options]]
+                for name, parameter in event.parameters.items()
+            ],
+        ]
+        for event in events
+    ]
+    return hashlib.sha1(
+        json.dumps(content, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class CompiledSequenceCache:
+    """Least recently used cache of compiled pulse sequences.
+
+    Sequences are keyed on the content hash of their events, the IF frequency and the sampling rate.
+
+    Args:
+        compiler (PulseSequenceCompiler): The compiler that is used on a cache miss
+        maxsize (int): The maximum number of cached sequences
+
+    Attributes:
+        compiler (PulseSequenceCompiler): The compiler that is used on a cache miss
+        maxsize (int): The maximum number of cached sequences
+        hits (int): The number of lookups that were served from the cache
+        misses (int): The number of lookups that compiled the sequence
+    """
+
+    def __init__(self, compiler: PulseSequenceCompiler, maxsize: int = 16) -> None:
+        """Initializes the CompiledSequenceCache."""
+        self.compiler = compiler
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._sequences = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, events: list, if_frequency: float, srate: float) -> CompiledSequence:
+        """Returns the compiled sequence, compiling it if it is not cached.
+
+        Args:
+            events (list): The pulse sequence events
+            if_frequency (float): The IF frequency of the pulses in Hz
+            srate (float): The sampling rate of the spectrometer in Hz
+
+        Returns:
+            CompiledSequence: The pulse arrays of the sequence
+        """
+        key = (sequence_fingerprint(events), float(if_frequency), float(srate))
+        with self._lock:
+            compiled_sequence = self._sequences.get(key)
+            if compiled_sequence is not None:
+                self._sequences.move_to_end(key)
+                self.hits += 1
+                return compiled_sequence
+
+        compiled_sequence = self.compiler.compile(events, if_frequency, srate)
+        with self._lock:
+            self.misses += 1
+            self._sequences[key] = compiled_sequence
+            self._sequences.move_to_end(key)
+            while len(self._sequences) > self.maxsize:
+                self._sequences.popitem(last=False)
+        logger.debug("Compiled sequence %s", key)
+        return compiled_sequence
+
+    def clear(self) -> None:
+        """Removes all cached sequences."""
+        with self._lock:
+            self._sequences.clear()
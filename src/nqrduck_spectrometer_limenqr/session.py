@@ -0,0 +1,140 @@
+"""Persistent LimeSDR session that is kept between measurements.
+
+The LimeDriver opens the device for every run, but the expensive part is the initialization of the transceiver. The
+driver only initializes if override_init is negative or, for override_init == 0, if the LO frequency, sampling rate or
+gains read back from the device deviate. The initialization is also the only place where the driver writes the device
+settings: the LO frequency, sampling rate, antennas, gains, low pass filters and IQ corrections are all set in the
+initialization branch of run_experiment in limedriver.cpp. A run that skips the initialization therefore acquires with
+the device settings of the last initialization, e.g. at the previous LO frequency. The session remembers the device
+settings of the last successful run and only enforces the initialization when one of them changes, pulse, timing and
+averaging settings are applied without it.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Attributes of the PyLimeConfig object that the driver only writes to the device during the initialization
+DEVICE_ATTRIBUTES = (
+    "srate",
+    "channel",
+    "TX_matching",
+    "RX_matching",
+    "frq",
+    "RX_LPF",
+    "TX_LPF",
+    "RX_gain",
+    "TX_gain",
+    "TX_IcorrDC",
+    "TX_QcorrDC",
+    "TX_IcorrGain",
+    "TX_QcorrGain",
+    "TX_IQcorrPhase",
+    "RX_IcorrGain",
+    "RX_QcorrGain",
+    "RX_IQcorrPhase",
+)
+
+# Values of override_init, see the -noi option of the LimeDriver
+ENFORCE_INIT = -1
+SKIP_INIT = 1
+
+
+class LimeSession:
+    """Tracks the state of the LimeSDR and of the driver configuration between measurements.
+
+    Attributes:
+        init_count (int): The number of runs that initialized the device
+        run_count (int): The number of successful runs
+    """
+
+    def __init__(self) -> None:
+        """Initializes the LimeSession."""
+        self._lock = threading.Lock()
+        self._device_settings = None
+        self._sent = None
+        self._sent_pulses = None
+        self.init_count = 0
+        self.run_count = 0
+
+    def prepare(self, lime) -> bool:
+        """Sets override_init of a configuration before it is run.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+
+        Returns:
+            bool: True if the device will be initialized
+        """
+        device_settings = self.device_settings(lime)
+        with self._lock:
+            previous = self._device_settings
+        initialize = device_settings != previous
+        if initialize and previous is not None:
+            changed = [
+                name for name in DEVICE_ATTRIBUTES if device_settings[name] != previous[name]
+            ]
+            logger.debug("Reinitializing the device, changed settings: %s", changed)
+        lime.override_init = ENFORCE_INIT if initialize else SKIP_INIT
+        return initialize
+
+    def changes(self, snapshot: dict, n_pulses: int) -> dict:
+        """Returns the attributes that differ from the configuration that was sent to the driver before.
+
+        All attributes are returned if the number of pulses changed, because the driver then needs a new configuration.
+
+        Args:
+            snapshot (dict): The attributes of the configuration, see snapshot_lime_config
+            n_pulses (int): The number of pulses of the configuration
+
+        Returns:
+            dict: The changed attributes and their values
+        """
+        with self._lock:
+            if self._sent is None or self._sent_pulses != n_pulses:
+                changes = snapshot
+            else:
+                changes = {
+                    name: value
+                    for name, value in snapshot.items()
+                    if self._sent[name] != value
+                }
+            self._sent = snapshot
+            self._sent_pulses = n_pulses
+        logger.debug("Sending %s of %s attributes", len(changes), len(snapshot))
+        return changes
+
+    def commit(self, lime) -> None:
+        """Records a successful run of a configuration.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that was run
+        """
+        with self._lock:
+            if lime.override_init != SKIP_INIT:
+                self.init_count += 1
+            self._device_settings = self.device_settings(lime)
+            self.run_count += 1
+
+    def reset(self) -> None:
+        """Forgets the device and driver state, e.g. after a failed or terminated run.
+
+        The next run initializes the device and sends the complete configuration.
+        """
+        with self._lock:
+            self._device_settings = None
+            self._sent = None
+            self._sent_pulses = None
+
+    @staticmethod
+    def device_settings(lime) -> dict:
+        """Returns the settings of a configuration that require an initialization of the device.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+
+        Returns:
+            dict: The values of the attributes listed in DEVICE_ATTRIBUTES
+        """
+        return {name: getattr(lime, name) for name in DEVICE_ATTRIBUTES}
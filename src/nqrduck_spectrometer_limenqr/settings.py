@@ -0,0 +1,238 @@
+"""Names, defaults and change tracking of the settings of the Lime NQR spectrometer.
+
+LimeNQRSettings does not depend on Qt or on the nqrduck settings classes. LimeNQRModel creates the nqrduck settings
+of the GUI from it and the headless API keeps plain values, the controller logic and the driver mapping work with both.
+"""
+
+import threading
+from pathlib import Path
+
+from .resampling import ENGINES, AUTO
+from .profiling import PROFILING_MODES, OFF
+from .storage import LOCATIONS, TEMPORARY
+from .archive import COMPRESSIONS, OFF as ARCHIVE_OFF
+from .postprocessing import PROCESSING_MODES, INLINE
+
+
+class LimeNQRSettings:
+    """The settings of the Lime NQR spectrometer and the settings that changed since the previous measurement.
+
+    Attributes:
+        OPTIONS (dict): The options of every selection setting
+        DEFAULTS (dict): The default value of every setting
+        settings_lock (RLock): Held while a profile is loaded and while the settings are converted for the driver
+    """
+
+    # Setting constants for the names of the spectrometer settings
+    CHANNEL = "TX/RX Channel"
+    TX_MATCHING = "TX Matching"
+    RX_MATCHING = "RX Matching"
+    SAMPLING_FREQUENCY = "Sampling Frequency (Hz)"
+    RX_DWELL_TIME = "RX Dwell Time (s)"
+    IF_FREQUENCY = "IF Frequency (Hz)"
+    ACQUISITION_TIME = "Acquisition time (s)"
+    GATE_ENABLE = "Enable"
+    GATE_PADDING_LEFT = "Gate padding left"
+    GATE_PADDING_RIGHT = "Gate padding right"
+    GATE_SHIFT = "Gate shift"
+    RX_GAIN = "RX Gain"
+    TX_GAIN = "TX Gain"
+    RX_LPF_BW = "RX LPF BW (Hz)"
+    TX_LPF_BW = "TX LPF BW (Hz)"
+    TX_I_DC_CORRECTION = "TX I DC correction"
+    TX_Q_DC_CORRECTION = "TX Q DC correction"
+    TX_I_GAIN_CORRECTION = "TX I Gain correction"
+    TX_Q_GAIN_CORRECTION = "TX Q Gain correction"
+    TX_PHASE_ADJUSTMENT = "TX phase adjustment"
+    RX_I_DC_CORRECTION = "RX I DC correction"
+    RX_Q_DC_CORRECTION = "RX Q DC correction"
+    RX_I_GAIN_CORRECTION = "RX I Gain correction"
+    RX_Q_GAIN_CORRECTION = "RX Q Gain correction"
+    RX_PHASE_ADJUSTMENT = "RX phase adjustment"
+    RX_OFFSET = "RX offset"
+    FFT_SHIFT = "FFT shift"
+    RESAMPLING_ENGINE = "Resampling engine"
+    DRIVER_BACKEND = "Driver backend"
+    PROFILING = "Profiling"
+    ACQUISITION_STORAGE = "Acquisition storage"
+    RAW_ARCHIVE = "Raw archive"
+    ARCHIVE_DIRECTORY = "Archive directory"
+    STREAMING_INTERVAL = "Streaming interval (s)"
+    TARGET_SNR = "Target SNR"
+    POST_PROCESSING = "Post-processing"
+
+    # Constants for the Categories of the settings
+    ACQUISITION = "Acquisition"
+    GATE_SETTINGS = "Gate Settings"
+    RX_TX_SETTINGS = "RX/TX Settings"
+    CALIBRATION = "Calibration"
+    SIGNAL_PROCESSING = "Signal Processing"
+
+    # Pulse parameter constants
+    TX = "TX"
+    RX = "RX"
+
+    # Sweep parameters that are not settings
+    TARGET_FREQUENCY = "Target frequency"
+    AVERAGES = "Averages"
+
+    # Driver backends
+    LIMESDR = "LimeSDR"
+    SIMULATOR = "Simulator"
+
+    # Settings that are not changed by the user
+    OFFSET_FIRST_PULSE = 300
+
+    OPTIONS = {
+        CHANNEL: ["0", "1"],
+        TX_MATCHING: ["0", "1"],
+        RX_MATCHING: ["0", "1"],
+        SAMPLING_FREQUENCY: ["30.72e6", "15.36e6", "7.68e6"],
+        DRIVER_BACKEND: [LIMESDR, SIMULATOR],
+        ACQUISITION_STORAGE: LOCATIONS,
+        RAW_ARCHIVE: COMPRESSIONS,
+        RESAMPLING_ENGINE: ENGINES,
+        PROFILING: PROFILING_MODES,
+        POST_PROCESSING: PROCESSING_MODES,
+    }
+
+    DEFAULTS = {
+        # Acquisition settings
+        CHANNEL: "0",
+        TX_MATCHING: "0",
+        RX_MATCHING: "0",
+        SAMPLING_FREQUENCY: "30.72e6",
+        RX_DWELL_TIME: "22n",
+        IF_FREQUENCY: 5e6,
+        ACQUISITION_TIME: 82e-6,
+        DRIVER_BACKEND: LIMESDR,
+        ACQUISITION_STORAGE: TEMPORARY,
+        RAW_ARCHIVE: ARCHIVE_OFF,
+        ARCHIVE_DIRECTORY: str(Path.home() / "nqrduck" / "limenqr_archive"),
+        STREAMING_INTERVAL: 0.0,
+        TARGET_SNR: 0.0,
+        # Gate settings
+        GATE_ENABLE: True,
+        GATE_PADDING_LEFT: 10,
+        GATE_PADDING_RIGHT: 10,
+        GATE_SHIFT: 53,
+        # RX/TX settings
+        RX_GAIN: 55,
+        TX_GAIN: 30,
+        RX_LPF_BW: 30.72e6 / 2,
+        TX_LPF_BW: 130.0e6,
+        # Calibration settings
+        TX_I_DC_CORRECTION: -45,
+        TX_Q_DC_CORRECTION: 0,
+        TX_I_GAIN_CORRECTION: 2047,
+        TX_Q_GAIN_CORRECTION: 2039,
+        TX_PHASE_ADJUSTMENT: 3,
+        RX_I_DC_CORRECTION: 0,
+        RX_Q_DC_CORRECTION: 0,
+        RX_I_GAIN_CORRECTION: 2047,
+        RX_Q_GAIN_CORRECTION: 2047,
+        RX_PHASE_ADJUSTMENT: 0,
+        # Signal Processing settings
+        RX_OFFSET: 2.4e-6,
+        FFT_SHIFT: False,
+        RESAMPLING_ENGINE: AUTO,
+        PROFILING: OFF,
+        POST_PROCESSING: INLINE,
+    }
+
+    def __init__(self) -> None:
+        """Initializes the change tracking, the IF frequency and the averages."""
+        self._changed_settings_lock = threading.Lock()
+        self._changed_settings = set()
+        self.settings_lock = threading.RLock()
+        self.if_frequency = self.DEFAULTS[self.IF_FREQUENCY]
+        self.averages = 1
+
+    def mark_setting_changed(self, name: str) -> None:
+        """Records that a setting changed since the last call of take_changed_settings.
+
+        Args:
+            name (str): The name of the setting or TARGET_FREQUENCY
+        """
+        with self._changed_settings_lock:
+            self._changed_settings.add(name)
+
+    def take_changed_settings(self) -> set:
+        """Returns the settings that changed since the last call and forgets them.
+
+        Every setting counts as changed after it was added.
+
+        Returns:
+            set: The names of the changed settings, TARGET_FREQUENCY if the target frequency changed
+        """
+        with self._changed_settings_lock:
+            changed = self._changed_settings
+            self._changed_settings = set()
+        return changed
+
+    def load_profile(self, profile) -> set:
+        """Sets the settings of a profile.
+
+        Only the settings whose values differ are set, so only they are converted for the next measurement. The
+        settings lock is held meanwhile, a measurement therefore never sees a mix of the old and the new profile. The
+        signals of the settings are blocked while their values are set, on_profile_loaded is called once afterwards.
+
+        Args:
+            profile (SettingsProfile): The profile
+
+        Returns:
+            set: The names of the settings that changed
+        """
+        with self.settings_lock:
+            changed = {
+                name: value
+                for name, value in profile.values.items()
+                if self.get_setting_by_name(name).value != value
+            }
+            for name, value in changed.items():
+                setting = self.get_setting_by_name(name)
+                blocked = setting.blockSignals(True)
+                try:
+                    setting.value = value
+                finally:
+                    setting.blockSignals(blocked)
+            for name in changed:
+                self.mark_setting_changed(name)
+        self.on_profile_loaded(profile.name, set(changed))
+        return set(changed)
+
+    def on_profile_loaded(self, name: str, changed: set) -> None:
+        """Called once after a profile has been loaded.
+
+        Args:
+            name (str): The name of the profile
+            changed (set): The names of the settings that changed
+        """
+
+    @property
+    def target_frequency(self):
+        """The target frequency of the spectrometer."""
+        return self._target_frequency
+
+    @target_frequency.setter
+    def target_frequency(self, value):
+        self._target_frequency = value
+        self.mark_setting_changed(self.TARGET_FREQUENCY)
+
+    @property
+    def averages(self):
+        """The number of averages to be taken."""
+        return self._averages
+
+    @averages.setter
+    def averages(self, value):
+        self._averages = value
+
+    @property
+    def if_frequency(self):
+        """The intermediate frequency to which the input signal is down converted during analog-to-digital conversion."""
+        return self._if_frequency
+
+    @if_frequency.setter
+    def if_frequency(self, value):
+        self._if_frequency = value
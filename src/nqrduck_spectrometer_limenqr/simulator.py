@@ -0,0 +1,237 @@
+"""Hardware free stand-in for the LimeDriver.
+
+SimulatedLimeConfig has the interface of limedriver.binding.PyLimeConfig. Instead of running the pulse sequence on a
+LimeSDR it synthesizes the signal of a spin system for the configured pulses and writes it to an HDF file in the
+layout of the LimeDriver, so the complete measurement pipeline can be run and profiled without hardware.
+"""
+
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SpinSystem:
+    """The spin system that is simulated by SimulatedLimeConfig.
+
+    The first pulse of a sequence excites a free induction decay, every later pulse refocuses an echo. The signal is
+    received at the IF frequency of the pulses plus the offsets of the lines.
+
+    Args:
+        lines (list): Tuples of frequency offset in Hz, amplitude in ADC counts per average and T2* in s
+        t2 (float): The transverse relaxation time in s that damps the echoes
+        noise (float): The RMS of the noise in ADC counts per average and quadrature channel
+        seed (int): The seed of the noise generator, None for a different noise in every run
+
+    Attributes:
+        lines (list): Tuples of frequency offset in Hz, amplitude in ADC counts per average and T2* in s
+        t2 (float): The transverse relaxation time in s that damps the echoes
+        noise (float): The RMS of the noise in ADC counts per average and quadrature channel
+        seed (int): The seed of the noise generator
+    """
+
+    def __init__(
+        self,
+        lines: list = None,
+        t2: float = 500e-6,
+        noise: float = 50.0,
+        seed: int = None,
+    ) -> None:
+        """Initializes the SpinSystem."""
+        self.lines = lines if lines is not None else [(20e3, 5000.0, 50e-6)]
+        self.t2 = t2
+        self.noise = noise
+        self.seed = seed
+
+    def signal(self, t: np.ndarray, pulses: list, if_frequency: float) -> np.ndarray:
+        """Returns the complex signal of the spin system for one average.
+
+        Args:
+            t (np.ndarray): The sample times in s
+            pulses (list): Tuples of start and end time of the pulses in s
+            if_frequency (float): The IF frequency in Hz
+
+        Returns:
+            np.ndarray: The signal in ADC counts
+        """
+        signal = np.zeros(len(t), dtype=complex)
+        if not pulses:
+            return signal
+
+        # Start of the receive window, time of the maximum and relative amplitude of the FID and the echoes
+        centers = [(start + end) / 2 for start, end in pulses]
+        components = [(pulses[0][1], pulses[0][1], 1.0)]
+        for index in range(1, len(pulses)):
+            echo_time = 2 * centers[index] - centers[index - 1]
+            echo_amplitude = np.exp(-(echo_time - centers[0]) / self.t2)
+            components.append((pulses[index][1], echo_time, echo_amplitude))
+
+        for offset, amplitude, t2_star in self.lines:
+            shape = np.zeros(len(t))
+            for begin, peak, weight in components:
+                window = t >= begin
+                shape[window] += weight * np.exp(-np.abs(t[window] - peak) / t2_star)
+            signal += amplitude * shape * np.exp(2j * np.pi * (if_frequency + offset) * t)
+        return signal
+
+
+class SimulatedLimeConfig:
+    """Driver configuration with the interface of PyLimeConfig that simulates the acquisition.
+
+    Pulses are reconstructed from the pulse arrays like in the LimeDriver: the start of every pulse sample is offset
+    by p_offs samples from the start of the previous one. Consecutive samples form a pulse. Like the driver, the
+    data is the sum over the averages and every run appends a dataset to an existing file.
+
+    Args:
+        Npulses (int): The number of pulse samples
+
+    Attributes:
+        spin_system (SpinSystem): The simulated spin system, shared by all configurations unless set per instance
+        realtime (bool): Whether a run takes as long as the acquisition on the hardware
+        releases_gil (bool): The simulation does not block other threads, it does not need a driver process
+    """
+
+    BUFFER_SIZE = 4080 * 3
+
+    spin_system = SpinSystem()
+    realtime = False
+    releases_gil = True
+
+    def __init__(self, Npulses: int) -> None:
+        """Initializes the SimulatedLimeConfig with the defaults of the LimeDriver."""
+        self.Npulses = Npulses
+        self.srate = 30.72e6
+        self.channel = 0
+        self.TX_matching = 0
+        self.RX_matching = 0
+        self.frq = 50e6
+        self.RX_LPF = 5e6
+        self.TX_LPF = 130e6
+        self.RX_gain = 20
+        self.TX_gain = 30
+        self.TX_IcorrDC = -45
+        self.TX_QcorrDC = 0
+        self.TX_IcorrGain = 2047
+        self.TX_QcorrGain = 2039
+        self.TX_IQcorrPhase = 3
+        self.RX_IcorrGain = 2047
+        self.RX_QcorrGain = 2047
+        self.RX_IQcorrPhase = 0
+        self.p_frq = [0.0] * Npulses
+        self.p_dur = [0.0] * Npulses
+        self.p_amp = [0.0] * Npulses
+        self.p_offs = [0] * Npulses
+        self.p_pha = [0.0] * Npulses
+        self.c3_tim = [0, 70, 56, -5]
+        self.averages = 6
+        self.repetitions = 4
+        self.reptime_secs = 4e-3
+        self.rectime_secs = 0.2e-3
+        self.override_init = 0
+        self.override_save = 0
+        self.file_pattern = "test"
+        self.file_stamp = datetime.now().strftime("%G%m%d_%H%M%S")
+        self.save_path = "./data/"
+
+    def get_path(self) -> str:
+        """Returns the path of the HDF file the data is written to."""
+        return self.save_path + self.file_stamp + "_" + self.file_pattern + ".h5"
+
+    def pulses(self) -> list:
+        """Returns the start and end times of the pulses in s."""
+        starts = np.cumsum(self.p_offs)
+        durations = np.round(np.asarray(self.p_dur, dtype=float) * self.srate)
+        ends = starts + durations
+        active = np.asarray(self.p_amp, dtype=float) > 0
+
+        pulses = []
+        for start, end in zip(starts[active], ends[active]):
+            # Samples that start at most one sample after the end of the previous one belong to the same pulse
+            if pulses and start <= pulses[-1][1] + 1:
+                pulses[-1][1] = max(pulses[-1][1], end)
+            else:
+                pulses.append([start, end])
+        return [(float(start / self.srate), float(end / self.srate)) for start, end in pulses]
+
+    def run(self) -> int:
+        """Simulates the acquisition and writes the data.
+
+        Returns:
+            int: 0 like the LimeDriver for a successful run
+        """
+        started = time.perf_counter()
+        rec_len = int(np.ceil(self.rectime_secs * self.srate / self.BUFFER_SIZE) * self.BUFFER_SIZE)
+        t = np.arange(rec_len) / self.srate
+        if_frequency = self.p_frq[0] if self.Npulses else 0.0
+        pulses = self.pulses()
+        logger.debug("Simulating %s pulses and %s samples", len(pulses), rec_len)
+
+        spin_system = self.spin_system
+        signal = spin_system.signal(t, pulses, if_frequency) * self.averages
+        rng = np.random.default_rng(spin_system.seed)
+        noise_level = spin_system.noise * np.sqrt(self.averages)
+
+        data = np.empty((self.repetitions, 2 * rec_len), dtype=np.int32)
+        for row in range(self.repetitions):
+            noise = rng.normal(0.0, noise_level, (2, rec_len))
+            data[row, ::2] = np.round(signal.real + noise[0])
+            data[row, 1::2] = np.round(signal.imag + noise[1])
+
+        if self.override_save <= 0:
+            self.save(data, rec_len)
+
+        if self.realtime:
+            remaining = self.averages * self.repetitions * self.reptime_secs - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+        return 0
+
+    def save(self, data: np.ndarray, rec_len: int) -> None:
+        """Writes the data as a new dataset with the attributes of the LimeDriver.
+
+        Args:
+            data (np.ndarray): The interleaved I and Q samples, one row per repetition
+            rec_len (int): The number of samples per repetition
+        """
+        import h5py
+
+        path = Path(self.get_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The pulse arrays of long sequences exceed the 64 kB limit of compact attributes, the latest file format
+        # stores them densely
+        with h5py.File(path, "a", libver="latest") as file:
+            name = f"Acqbuf_{len(file.keys()):02d}"
+            dataset = file.create_dataset(name, data=data, chunks=(1, 2 * rec_len))
+            attributes = (
+                ("sra", "SampleRate [Hz]", np.float32(self.srate)),
+                ("chn", "Channel", np.int32(self.channel)),
+                ("rmt", "RX Matching", np.int32(self.RX_matching)),
+                ("tmt", "TX Matching", np.int32(self.TX_matching)),
+                ("lof", "LO Frequency [Hz]", np.float32(self.frq)),
+                ("rlp", "RX LowPass BW [Hz]", np.float32(self.RX_LPF)),
+                ("tlp", "TX LowPass BW [Hz]", np.float32(self.TX_LPF)),
+                ("rgn", "RX Gain [dB]", np.int32(self.RX_gain)),
+                ("tgn", "TX Gain [dB]", np.int32(self.TX_gain)),
+                ("npu", "Number of Pulses", np.int32(self.Npulses)),
+                ("pdr", "Pulse Duration [s]", np.asarray(self.p_dur, dtype=np.float64)),
+                ("pof", "Pulse Offset [Sa]", np.asarray(self.p_offs, dtype=np.int32)),
+                ("pam", "IF Pulse Amplitude", np.asarray(self.p_amp, dtype=np.float64)),
+                ("pfr", "IF Pulse Frequency [Hz]", np.asarray(self.p_frq, dtype=np.float64)),
+                ("pph", "IF Pulse Phase", np.asarray(self.p_pha, dtype=np.float64)),
+                ("t3d", "Trigger3 Timing [Sa]", np.asarray(self.c3_tim, dtype=np.int32)),
+                ("nrp", "Nmbr of Repetitions", np.int32(self.repetitions)),
+                ("nav", "Nmbr of Averages", np.int32(self.averages)),
+                ("trp", "Repetition Time [s]", np.float64(self.reptime_secs)),
+                ("tac", "Acquisition Time [s]", np.float64(self.rectime_secs)),
+                ("///", "Acquisition Time [Sa]", np.int32(rec_len)),
+                ("bsz", "Buffersize", np.int32(self.BUFFER_SIZE)),
+                ("fpa", "Filename Pattern", self.file_pattern),
+                ("spt", "Save Path", self.save_path),
+                ("noi", "Don't init if >0", np.int32(self.override_init)),
+                ("fst", "Filename Timestamp", self.file_stamp),
+            )
+            for key, description, value in attributes:
+                dataset.attrs[f"-{key} {description}"] = value
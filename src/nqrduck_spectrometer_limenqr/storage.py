@@ -0,0 +1,120 @@
+"""Storage of the acquisition files that the LimeDriver writes.
+
+The driver writes every measurement to an HDF file at save_path + file_stamp + "_" + file_pattern + ".h5". The file
+stamp has a resolution of one second, so measurements in the same directory are kept apart by their file pattern.
+AcquisitionStorage hands out a directory and a unique file pattern per measurement and owns the directory until the
+measurement is released, so it can not be removed while the driver is still writing.
+"""
+
+import logging
+import shutil
+import tempfile
+import threading
+import weakref
+from itertools import count
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Storage locations
+TEMPORARY = "Temporary directory"
+SPOOL = "Spool directory"
+RAM_SPOOL = "RAM spool"
+
+LOCATIONS = [TEMPORARY, SPOOL, RAM_SPOOL]
+
+# tmpfs mount that keeps the files in memory
+RAM_DIRECTORY = Path("/dev/shm")
+
+
+class AcquisitionStorage:
+    """Allocates the directories and file patterns of the acquisitions and removes the files when they are released.
+
+    TEMPORARY creates a new temporary directory per measurement and removes it on release. SPOOL and RAM_SPOOL reuse
+    a single directory that is created on first use, in the temporary directory or in RAM_DIRECTORY, and only remove
+    the file of a measurement on release. If RAM_DIRECTORY does not exist RAM_SPOOL falls back to SPOOL.
+
+    Attributes:
+        prefix (str): The prefix of the created directories and file patterns
+    """
+
+    prefix = "limenqr"
+
+    def __init__(self) -> None:
+        """Initializes the AcquisitionStorage."""
+        self._lock = threading.Lock()
+        self._counter = count()
+        self._allocated = {}
+        self._spools = {}
+
+    def allocate(self, location: str = TEMPORARY) -> tuple:
+        """Allocates the storage of a measurement.
+
+        Args:
+            location (str): One of LOCATIONS
+
+        Returns:
+            tuple: The save path, ending with a slash, and the file pattern for the driver
+        """
+        file_pattern = f"{self.prefix}_{next(self._counter):06d}"
+        if location in (SPOOL, RAM_SPOOL):
+            directory = self._spool(location)
+            owner = None
+        else:
+            owner = tempfile.TemporaryDirectory(prefix=f"{self.prefix}_")
+            directory = Path(owner.name)
+
+        save_path = str(directory) + "/"
+        with self._lock:
+            self._allocated[(save_path, file_pattern)] = owner
+        logger.debug("Allocated %s%s in %s", save_path, file_pattern, location)
+        return save_path, file_pattern
+
+    def release(self, save_path: str, file_pattern: str) -> None:
+        """Removes the files of a measurement.
+
+        Args:
+            save_path (str): The save path returned by allocate
+            file_pattern (str): The file pattern returned by allocate
+        """
+        with self._lock:
+            if (save_path, file_pattern) not in self._allocated:
+                return
+            owner = self._allocated.pop((save_path, file_pattern))
+
+        if owner is not None:
+            owner.cleanup()
+        else:
+            for path in Path(save_path).glob(f"*_{file_pattern}.h5"):
+                path.unlink(missing_ok=True)
+        logger.debug("Released %s%s", save_path, file_pattern)
+
+    def close(self) -> None:
+        """Releases all measurements and removes the spool directories."""
+        with self._lock:
+            allocated = list(self._allocated)
+            spools = list(self._spools.values())
+            self._spools.clear()
+        for save_path, file_pattern in allocated:
+            self.release(save_path, file_pattern)
+        for _, remove in spools:
+            remove()
+
+    def _spool(self, location: str) -> Path:
+        """Returns the spool directory of a location, it is created on first use."""
+        parent = None
+        if location == RAM_SPOOL:
+            if RAM_DIRECTORY.is_dir():
+                parent = RAM_DIRECTORY
+            else:
+                logger.warning("%s does not exist, spooling to the temporary directory", RAM_DIRECTORY)
+                location = SPOOL
+
+        with self._lock:
+            if location not in self._spools:
+                directory = tempfile.mkdtemp(prefix=f"{self.prefix}_spool_", dir=parent)
+                # The spool is removed by close or, at the latest, when the interpreter exits
+                remove = weakref.finalize(self, shutil.rmtree, directory, ignore_errors=True)
+                self._spools[location] = (Path(directory), remove)
+                logger.debug("Created spool directory %s", directory)
+            return self._spools[location][0]
@@ -0,0 +1,164 @@
+"""Acquisition of the averages of a measurement in blocks.
+
+The driver returns the sum over all averages only when the whole acquisition is finished. In streaming mode the
+averages are acquired in blocks that are run one after another, the sum of every block is added to a running
+average that is emitted after each block. The block size is adapted to the measured time per average, so an update
+is emitted about once per update interval. The acquisition can be stopped early, by the user or once the running
+average reaches a target signal to noise ratio.
+"""
+
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AverageStream:
+    """The running average of the blocks of a streamed acquisition.
+
+    The noise is estimated from the scatter of the block averages around the running average, so it does not depend
+    on the shape of the signal. An estimate needs at least two blocks.
+
+    Args:
+        averages (int): The total number of averages
+        update_interval (float): The target time between two updates in s
+        target_snr (float): The signal to noise ratio at which the acquisition stops, 0 to acquire all averages
+        initial_block (int): The number of averages of the first block
+        max_growth (float): The factor by which a block can be larger than the previous block
+
+    Attributes:
+        averages (int): The total number of averages
+        update_interval (float): The target time between two updates in s
+        target_snr (float): The signal to noise ratio at which the acquisition stops, 0 to acquire all averages
+        initial_block (int): The number of averages of the first block
+        max_growth (float): The factor by which a block can be larger than the previous block
+        completed (int): The number of acquired averages
+        n_blocks (int): The number of acquired blocks
+        stopped (bool): Whether the acquisition was stopped before all averages were acquired
+    """
+
+    # Weight of the latest block in the estimate of the time per average
+    SMOOTHING = 0.5
+
+    def __init__(
+        self,
+        averages: int,
+        update_interval: float,
+        target_snr: float = 0,
+        initial_block: int = 1,
+        max_growth: float = 4,
+    ) -> None:
+        """Initializes the AverageStream."""
+        if averages < 1:
+            raise ValueError(f"A streamed acquisition needs at least one average, not {averages}")
+        self.averages = averages
+        self.update_interval = update_interval
+        self.target_snr = target_snr
+        self.initial_block = initial_block
+        self.max_growth = max_growth
+        self.completed = 0
+        self.n_blocks = 0
+        self.stopped = False
+        self._sum = None
+        self._weighted_squares = None
+        self._time_per_average = None
+        self._last_block = None
+
+    @property
+    def remaining(self) -> int:
+        """The number of averages that are still to be acquired."""
+        return self.averages - self.completed
+
+    @property
+    def done(self) -> bool:
+        """Whether all averages are acquired or the acquisition was stopped."""
+        return self.stopped or self.remaining <= 0
+
+    @property
+    def mean(self) -> np.ndarray:
+        """The running average of the acquired blocks."""
+        if self._sum is None:
+            return None
+        return self._sum / self.completed
+
+    def next_block(self) -> int:
+        """Returns the number of averages of the next block.
+
+        The block is as large as the averages that fit into the update interval at the measured time per average,
+        but at most max_growth times the previous block, so a fixed overhead per run does not make it overshoot.
+
+        Returns:
+            int: The number of averages, at least one and at most the remaining averages
+        """
+        if self._time_per_average is None:
+            block = self.initial_block
+        elif self._time_per_average > 0:
+            block = int(self.update_interval / self._time_per_average)
+            block = min(block, int(self._last_block * self.max_growth))
+        else:
+            block = self.remaining
+        return max(1, min(block, self.remaining))
+
+    def add(self, block_sum: np.ndarray, averages: int, elapsed: float) -> None:
+        """Adds the sum of the samples of a block to the running average.
+
+        Args:
+            block_sum (np.ndarray): The complex samples summed over the averages of the block
+            averages (int): The number of averages of the block
+            elapsed (float): The time the block took in s, from the start of the run to the read samples
+        """
+        # The squared block average weighted with its averages is |sum|^2 / averages
+        weighted_square = np.abs(block_sum) ** 2 / averages
+        if self._sum is None:
+            self._sum = np.array(block_sum, dtype=complex)
+            self._weighted_squares = weighted_square
+        else:
+            self._sum += block_sum
+            self._weighted_squares += weighted_square
+        self.completed += averages
+        self.n_blocks += 1
+        self._last_block = averages
+
+        time_per_average = elapsed / averages
+        if self._time_per_average is None:
+            self._time_per_average = time_per_average
+        else:
+            self._time_per_average += self.SMOOTHING * (time_per_average - self._time_per_average)
+
+        if self.target_snr and self.remaining > 0:
+            snr = self.snr()
+            if snr is not None and snr >= self.target_snr:
+                logger.debug("Reached a SNR of %s after %s averages", snr, self.completed)
+                self.stopped = True
+
+    def stop(self) -> None:
+        """Stops the acquisition after the current block."""
+        self.stopped = True
+
+    def noise(self) -> float:
+        """Returns the RMS noise magnitude of the running average.
+
+        The variance of a single average is estimated per sample from the block averages m_i with n_i averages as
+        sum(n_i |m_i - m|^2) / (blocks - 1) and averaged over the samples.
+
+        Returns:
+            float: The RMS noise or None if less than two blocks were acquired
+        """
+        if self.n_blocks < 2:
+            return None
+        # sum(n_i |m_i - m|^2) = sum(n_i |m_i|^2) - N |m|^2
+        scatter = self._weighted_squares - np.abs(self._sum) ** 2 / self.completed
+        variance = max(float(np.mean(scatter)), 0.0) / (self.n_blocks - 1)
+        return np.sqrt(variance / self.completed)
+
+    def snr(self) -> float:
+        """Returns the signal to noise ratio of the running average.
+
+        Returns:
+            float: The peak magnitude divided by the RMS noise or None if the noise can not be estimated yet
+        """
+        noise = self.noise()
+        if noise is None:
+            return None
+        peak = float(np.max(np.abs(self.mean))) if self.mean.size else 0.0
+        return np.inf if noise == 0 else peak / noise
@@ -1,4 +1,6 @@
 """View  for LimeNQR spectrometer."""
+from PyQt6.QtCore import pyqtSlot
+from PyQt6.QtWidgets import QCheckBox, QComboBox, QLineEdit
 from nqrduck_spectrometer.base_spectrometer_view import BaseSpectrometerView
 
 
@@ -11,3 +13,39 @@ class LimeNQRView(BaseSpectrometerView):
 
         # Setting UI is automatically generated based on the settings specified in the model
         self.widget = self.load_settings_ui()
+
+        self.module.model.profile_loaded.connect(self.on_profile_loaded)
+
+    @pyqtSlot(str, set)
+    def on_profile_loaded(self, name: str, changed: set) -> None:
+        """Shows the values of the settings that changed when a settings profile was loaded.
+
+        The signals of the widgets are blocked, so the values are not set again.
+
+        Args:
+            name (str): The name of the profile
+            changed (set): The names of the settings that changed
+        """
+        for setting_name in changed:
+            setting = self.module.model.get_setting_by_name(setting_name)
+            widget = setting.widget
+            if hasattr(widget, "spin_box"):
+                widgets = [widget.spin_box, getattr(widget, "slider", None)]
+            else:
+                widgets = [widget]
+            for edit in widgets:
+                if edit is None:
+                    continue
+                edit.blockSignals(True)
+                try:
+                    if isinstance(edit, QCheckBox):
+                        edit.setChecked(bool(setting.value))
+                    elif isinstance(edit, QComboBox):
+                        edit.setCurrentText(str(setting.value))
+                    elif isinstance(edit, QLineEdit):
+                        edit.setText(str(setting.value))
+                    else:
+                        # Spin box or slider
+                        edit.setValue(type(edit.value())(setting.value))
+                finally:
+                    edit.blockSignals(False)
@@ -0,0 +1,397 @@
+"""Background execution of LimeNQR measurements.
+
+The LimeDriver binding keeps the GIL for the whole duration of ``lime.run()``, so running it on a
+thread alone would still freeze the Qt event loop. The worker therefore prepares measurements on one
+thread, serializes the acquisitions on a second thread and runs the driver itself in a child process.
+The driver process is kept alive between measurements and only receives the attributes that changed.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from functools import partial
+
+from .profiling import DISABLED
+from .session import LimeSession
+
+logger = logging.getLogger(__name__)
+
+# Attributes of the PyLimeConfig object that are set by the controller and need to be transferred to the driver process
+LIME_CONFIG_ATTRIBUTES = (
+    "srate",
+    "channel",
+    "TX_matching",
+    "RX_matching",
+    "frq",
+    "RX_LPF",
+    "TX_LPF",
+    "RX_gain",
+    "TX_gain",
+    "TX_IcorrDC",
+    "TX_QcorrDC",
+    "TX_IcorrGain",
+    "TX_QcorrGain",
+    "TX_IQcorrPhase",
+    "RX_IcorrGain",
+    "RX_QcorrGain",
+    "RX_IQcorrPhase",
+    "p_frq",
+    "p_dur",
+    "p_amp",
+    "p_offs",
+    "p_pha",
+    "c3_tim",
+    "averages",
+    "repetitions",
+    "reptime_secs",
+    "rectime_secs",
+    "override_init",
+    "override_save",
+    "file_pattern",
+    "file_stamp",
+    "save_path",
+)
+
+
+def snapshot_lime_config(lime) -> dict:
+    """Returns the attributes of a PyLimeConfig object as a picklable dictionary.
+
+    Args:
+        lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+
+    Returns:
+        dict: The values of the attributes listed in LIME_CONFIG_ATTRIBUTES
+    """
+    return {name: getattr(lime, name) for name in LIME_CONFIG_ATTRIBUTES}
+
+
+def serve_driver(driver_class, connection) -> None:
+    """Runs driver configurations that are sent through a connection.
+
+    This is the entry point of the driver process. The process keeps its configuration between runs, every
+    message contains the number of pulses and the attributes that changed since the previous run. A new
+    configuration is created when the number of pulses changes. The process exits when it receives None.
+
+    Args:
+        driver_class (type): The driver class, usually PyLimeConfig
+        connection (Connection): The connection to the measurement worker
+    """
+    lime = None
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+
+        n_pulses, changes = message
+        try:
+            if lime is None or lime.Npulses != n_pulses:
+                lime = driver_class(n_pulses)
+            for name, value in changes.items():
+                setattr(lime, name, value)
+            lime.run()
+            connection.send(True)
+        except Exception:
+            logger.exception("Driver run failed")
+            lime = None
+            connection.send(False)
+
+
+class MeasurementWorker:
+    """Runs the measurement pipeline of a LimeNQRController without blocking the caller.
+
+    Measurements are prepared on a dedicated thread, so the sequence translation of a queued measurement
+    overlaps with the acquisition of the current one. Acquisitions are executed one after another on a
+    second thread, which starts the processing of the acquired data and continues with the next acquisition.
+    A third thread waits for the processed data and emits the measurements in the order they were acquired.
+    Cancelling drops all queued measurements and terminates the running driver process.
+    The LimeSession decides whether the device needs to be initialized and which attributes are sent to the driver.
+
+    Args:
+        controller (LimeNQRController): The controller whose pipeline is executed
+        isolate_driver (bool): Whether the driver is run in a child process
+
+    Attributes:
+        controller (LimeNQRController): The controller whose pipeline is executed
+        isolate_driver (bool): Whether the driver is run in a child process
+        session (LimeSession): The state of the device and of the driver process
+        poll_interval (float): The interval in seconds in which a running driver process is checked for cancellation
+    """
+
+    poll_interval = 0.1
+
+    def __init__(self, controller, isolate_driver: bool = True) -> None:
+        """Initializes the MeasurementWorker."""
+        self.controller = controller
+        self.isolate_driver = isolate_driver
+        self._prepare_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="limenqr-prepare"
+        )
+        self._acquire_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="limenqr-acquire"
+        )
+        self._finish_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="limenqr-finish"
+        )
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._process = None
+        self._connection = None
+        self.session = LimeSession()
+
+    def submit(self) -> Future:
+        """Queues a measurement.
+
+        Returns:
+            Future: Resolves to the emitted Measurement or None if the measurement failed or was cancelled
+        """
+        with self._lock:
+            generation = self._generation
+        prepared = self._prepare_executor.submit(self._prepare, generation)
+        acquired = self._acquire_executor.submit(self._run, generation, prepared)
+        return self._finish_executor.submit(self._finish, acquired)
+
+    def submit_serial(self, setup) -> Future:
+        """Queues a measurement that is prepared on the acquisition thread after calling setup.
+
+        The measurement is only prepared when the measurements before it have been processed, so setup can change
+        the settings without affecting them. This is used for the points of a sweep.
+
+        Args:
+            setup (callable): Called before the measurement is prepared unless it has been cancelled
+
+        Returns:
+            Future: Resolves to the emitted Measurement or None if the measurement failed or was cancelled
+        """
+        with self._lock:
+            generation = self._generation
+        acquired = self._acquire_executor.submit(self._run_serial, generation, setup)
+        return self._finish_executor.submit(self._finish, acquired)
+
+    def submit_task(self, function) -> Future:
+        """Queues a function on the acquisition thread, it runs after the queued acquisitions even if they are cancelled.
+
+        Args:
+            function (callable): The function that is called
+
+        Returns:
+            Future: Resolves to the return value of the function
+        """
+        return self._acquire_executor.submit(function)
+
+    def cancel(self) -> None:
+        """Cancels all queued measurements and terminates the running acquisition."""
+        with self._lock:
+            self._generation += 1
+            process = self._process
+        if process is not None and process.is_alive():
+            logger.debug("Terminating driver process %s", process.pid)
+            process.terminate()
+
+    def is_cancelled(self, generation: int) -> bool:
+        """Checks if the measurements of a generation have been cancelled.
+
+        Args:
+            generation (int): The generation the measurement was submitted in
+
+        Returns:
+            bool: True if cancel was called after the measurement was submitted
+        """
+        with self._lock:
+            return generation != self._generation
+
+    def shutdown(self) -> None:
+        """Cancels all measurements and stops the worker threads and the driver process."""
+        self.cancel()
+        self._prepare_executor.shutdown(wait=False, cancel_futures=True)
+        self._acquire_executor.shutdown(wait=False, cancel_futures=True)
+        self._finish_executor.shutdown(wait=False, cancel_futures=True)
+        self._stop_driver_process()
+
+    def run_driver(self, lime) -> bool:
+        """Runs the driver for a prepared configuration.
+
+        Args:
+            lime (PyLimeConfig): The PyLimeConfig object that is used to communicate with the pulseN driver
+
+        Returns:
+            bool: True if the driver finished successfully, False if it failed or was terminated
+        """
+        # Drivers that do not hold the GIL, like the simulator, can run on the acquisition thread
+        if not self.isolate_driver or getattr(lime, "releases_gil", False):
+            self.session.prepare(lime)
+            try:
+                lime.run()
+            except Exception:
+                self.session.reset()
+                raise
+            self.session.commit(lime)
+            return True
+
+        connection, process = self._start_driver_process(type(lime))
+        self.session.prepare(lime)
+        changes = self.session.changes(snapshot_lime_config(lime), lime.Npulses)
+        connection.send((lime.Npulses, changes))
+        succeeded = False
+        while True:
+            if connection.poll(self.poll_interval):
+                try:
+                    succeeded = connection.recv()
+                    break
+                except EOFError:
+                    # The process is terminating, wait for it to exit
+                    process.join(self.poll_interval)
+            if not process.is_alive():
+                logger.debug("Driver process exited with code %s", process.exitcode)
+                self._stop_driver_process()
+                break
+
+        if succeeded:
+            self.session.commit(lime)
+        else:
+            self.session.reset()
+        return succeeded
+
+    def _start_driver_process(self, driver_class) -> tuple:
+        """Returns the connection to the driver process and the process, which is started if it is not running."""
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                return self._connection, self._process
+
+        self._stop_driver_process()
+        context = multiprocessing.get_context("spawn")
+        connection, child_connection = context.Pipe()
+        process = context.Process(
+            target=serve_driver,
+            args=(driver_class, child_connection),
+            name="limenqr-driver",
+            daemon=True,
+        )
+        process.start()
+        child_connection.close()
+        # A new process has no configuration and the device state is unknown
+        self.session.reset()
+        with self._lock:
+            self._process = process
+            self._connection = connection
+        return connection, process
+
+    def _stop_driver_process(self) -> None:
+        """Stops the driver process if there is one."""
+        with self._lock:
+            process, connection = self._process, self._connection
+            self._process = self._connection = None
+        if process is None:
+            return
+        if process.is_alive():
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            process.join(self.poll_interval)
+            if process.is_alive():
+                process.terminate()
+        connection.close()
+
+    def _prepare(self, generation: int) -> tuple:
+        """Prepares a measurement unless it has been cancelled.
+
+        Returns:
+            tuple: The prepared PyLimeConfig object or None, the measurement context and the profile of the measurement
+        """
+        if self.is_cancelled(generation):
+            return None, None, DISABLED
+        profile = self.controller.create_measurement_profile()
+        try:
+            lime, context = self.controller.prepare_measurement(profile)
+            return lime, context, profile
+        except Exception:
+            profile.close()
+            raise
+
+    def _run_serial(self, generation: int, setup) -> tuple:
+        """Calls setup, prepares the measurement and acquires it."""
+        prepared = Future()
+        try:
+            if not self.is_cancelled(generation):
+                setup()
+            prepared.set_result(self._prepare(generation))
+        except Exception as e:
+            prepared.set_exception(e)
+        return self._run(generation, prepared)
+
+    def _run(self, generation: int, prepared: Future) -> tuple:
+        """Acquires a prepared measurement and starts processing it.
+
+        Returns:
+            tuple: The PyLimeConfig object, the profile and the future of the processing or None if the measurement
+            failed or was cancelled
+        """
+        lime, profile = None, DISABLED
+        acquired = None
+        try:
+            lime, context, profile = prepared.result()
+            if self.is_cancelled(generation):
+                self.controller.emit_measurement_cancelled()
+                return None
+            if lime is None:
+                return None
+
+            self.controller.emit_measurement_progress(1 / 3)
+            with profile.stage("perform_measurement"):
+                measured = self.controller.perform_measurement(
+                    lime, context, partial(self.is_cancelled, generation)
+                )
+            if self.is_cancelled(generation):
+                self.controller.emit_measurement_cancelled()
+                return None
+            if not measured:
+                self.controller.emit_status_message("Measurement failed")
+                self.controller.emit_measurement_error(
+                    "Error with measurement data. Did you set an RX event?"
+                )
+                return None
+
+            self.controller.emit_measurement_progress(2 / 3)
+            acquired = (
+                lime,
+                profile,
+                self.controller.start_processing(lime, context, profile),
+            )
+            return acquired
+        except Exception as e:
+            logger.exception("Measurement worker failed")
+            self.controller.emit_measurement_error(f"Measurement failed: {e}")
+            return None
+        finally:
+            # Otherwise the storage and the profile are released when the measurement is finished
+            if acquired is None:
+                if lime is not None:
+                    self.controller.release_temporary_storage(lime)
+                profile.close()
+
+    def _finish(self, acquired: Future):
+        """Waits for an acquisition and its processing and emits the measurement."""
+        try:
+            acquisition = acquired.result()
+        except CancelledError:
+            return None
+        if acquisition is None:
+            return None
+
+        lime, profile, processing = acquisition
+        try:
+            measurement_data = self.controller.finish_measurement(lime, processing, profile)
+            if measurement_data is not None:
+                self.controller.emit_measurement_progress(1.0)
+            return measurement_data
+        except Exception as e:
+            logger.exception("Measurement worker failed")
+            self.controller.emit_measurement_error(f"Measurement failed: {e}")
+            return None
+        finally:
+            self.controller.release_temporary_storage(lime)
+            profile.close()
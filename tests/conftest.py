@@ -0,0 +1,31 @@
+"""Fixtures shared by the tests."""
+
+import os
+import sys
+
+import pytest
+
+# Packages that need a QApplication when they are imported, the nqrduck spectrometer package builds its GUI on import
+GUI_PACKAGES = ("PyQt6", "matplotlib", "nqrduck_spectrometer", "nqrduck_pulseprogrammer")
+
+
+@pytest.fixture
+def gui_packages(tmp_path, monkeypatch):
+    """Puts packages in front of the path that fail to import like the GUI packages without a QApplication.
+
+    The path is also passed to subprocesses and the spawned processes of process pools, so an import of the GUI fails
+    there too, whether nqrduck is installed or not.
+
+    Returns:
+        Path: The directory of the packages
+    """
+    directory = tmp_path / "gui"
+    for name in GUI_PACKAGES:
+        package = directory / name
+        package.mkdir(parents=True)
+        (package / "__init__.py").write_text(
+            'raise RuntimeError("QWidget: Must construct a QApplication before a QWidget")\n'
+        )
+    monkeypatch.syspath_prepend(str(directory))
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(sys.path))
+    return directory
@@ -0,0 +1,91 @@
+"""Tests of the batch runner with the simulated driver."""
+
+import json
+
+import numpy as np
+import pytest
+
+from nqrduck_spectrometer_limenqr.batch import load_batch, run_batch
+from nqrduck_spectrometer_limenqr.headless import HeadlessLimeNQR
+from nqrduck_spectrometer_limenqr.settings import LimeNQRSettings
+
+FID = [
+    {"name": "pi/2", "duration": "3e-6", "tx": {"amplitude": 100}},
+    {"name": "dead time", "duration": "20e-6"},
+    {"name": "rx", "duration": "100e-6", "rx": True},
+    {"name": "repetition", "duration": "1e-3"},
+]
+
+
+@pytest.fixture
+def batch_file(tmp_path):
+    """A batch whose second measurement overrides the TX gain of the campaign."""
+    batch = {
+        "settings": {LimeNQRSettings.RX_GAIN: 40, LimeNQRSettings.ACQUISITION_TIME: 200e-6},
+        "sequences": {"fid": FID},
+        "measurements": [
+            {"sequence": "fid", "target_frequency": 83.50e6, "averages": 2},
+            {"sequence": "fid", "target_frequency": 83.55e6, "averages": 2, "settings": {LimeNQRSettings.TX_GAIN: 20}},
+            {"sequence": "fid", "target_frequency": [83.60e6, 83.65e6], "averages": 2},
+        ],
+    }
+    path = tmp_path / "campaign.json"
+    path.write_text(json.dumps(batch))
+    return path
+
+
+def test_points_have_all_settings(batch_file):
+    """Checks that every point carries the defaults, the campaign and its own settings."""
+    points = load_batch(batch_file)
+
+    assert len(points) == 4
+    for point in points:
+        assert set(point.settings) == set(LimeNQRSettings.DEFAULTS)
+        assert point.settings[LimeNQRSettings.RX_GAIN] == 40
+    assert [point.settings[LimeNQRSettings.TX_GAIN] for point in points] == [30, 20, 30, 30]
+
+
+def test_settings_revert_after_point_with_overrides(batch_file, tmp_path, monkeypatch):
+    """Checks that the settings of a point do not stay set for the points after it."""
+    applied = []
+    configure = HeadlessLimeNQR.configure
+
+    def record(self, *args, **kwargs):
+        configure(self, *args, **kwargs)
+        applied.append(self.model.get_setting_by_name(LimeNQRSettings.TX_GAIN).value)
+
+    monkeypatch.setattr(HeadlessLimeNQR, "configure", record)
+    points = load_batch(batch_file)
+    output = tmp_path / "results"
+    simulate = {LimeNQRSettings.DRIVER_BACKEND: LimeNQRSettings.SIMULATOR}
+
+    summary = run_batch(points, output, simulate)
+
+    assert summary["completed"] == 4
+    assert applied == [30, 20, 30, 30]
+    for point in points:
+        with np.load(output / point.file_name) as result:
+            settings = json.loads(str(result["settings"]))
+        assert settings[LimeNQRSettings.TX_GAIN] == point.settings[LimeNQRSettings.TX_GAIN]
+
+
+def test_resumed_run_does_not_depend_on_skipped_points(batch_file, tmp_path, monkeypatch):
+    """Checks that a resumed run measures the remaining points with their own settings."""
+    points = load_batch(batch_file)
+    output = tmp_path / "results"
+    simulate = {LimeNQRSettings.DRIVER_BACKEND: LimeNQRSettings.SIMULATOR}
+    run_batch(points[:2], output, simulate)
+
+    applied = []
+    configure = HeadlessLimeNQR.configure
+
+    def record(self, *args, **kwargs):
+        configure(self, *args, **kwargs)
+        applied.append(self.model.get_setting_by_name(LimeNQRSettings.TX_GAIN).value)
+
+    monkeypatch.setattr(HeadlessLimeNQR, "configure", record)
+    summary = run_batch(points, output, simulate)
+
+    assert summary["skipped"] == 2
+    assert summary["completed"] == 2
+    assert applied == [30, 30]
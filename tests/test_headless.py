@@ -0,0 +1,42 @@
+"""Tests of the headless API without Qt and the GUI of nqrduck."""
+
+import json
+import subprocess
+import sys
+
+from nqrduck_spectrometer_limenqr.headless import HeadlessLimeNQR, PulseSequence, blank_event, rx_event, tx_event
+from nqrduck_spectrometer_limenqr.postprocessing import MeasurementResult
+from nqrduck_spectrometer_limenqr.settings import LimeNQRSettings
+
+IMPORT = """
+import json, sys
+import nqrduck_spectrometer_limenqr.batch
+import nqrduck_spectrometer_limenqr.headless
+print(json.dumps(sorted(name for name in sys.modules if name.split(".")[0] in {packages!r})))
+"""
+
+
+def test_headless_api_imports_without_gui(gui_packages):
+    """Checks that the headless API and the batch runner import none of the GUI packages."""
+    packages = tuple(package.name for package in gui_packages.iterdir())
+    result = subprocess.run([sys.executable, "-c", IMPORT.format(packages=packages)], capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == []
+
+
+def test_measure_returns_result():
+    """Checks that a measurement with the simulated driver returns the processed data."""
+    sequence = PulseSequence(
+        "FID",
+        [tx_event("pi/2", "3e-6"), blank_event("dead time", "20e-6"), rx_event("rx", "100e-6"), blank_event("tr", "1e-3")],
+    )
+    settings = {LimeNQRSettings.DRIVER_BACKEND: LimeNQRSettings.SIMULATOR, LimeNQRSettings.RX_DWELL_TIME: "1u"}
+
+    with HeadlessLimeNQR(settings, isolate_driver=False) as spectrometer:
+        measurement_data = spectrometer.measure(sequence, target_frequency=83.56e6, averages=4)
+
+    assert isinstance(measurement_data, MeasurementResult)
+    assert measurement_data.target_frequency == 83.56e6
+    assert len(measurement_data.tdx) == len(measurement_data.tdy) > 0
+    assert "FID" in measurement_data.name
@@ -0,0 +1,76 @@
+"""Tests of the processing of acquisitions in the process pool without the GUI packages."""
+
+import numpy as np
+import pytest
+
+from nqrduck_spectrometer_limenqr.postprocessing import (
+    MeasurementResult,
+    ProcessingJob,
+    ProcessingPool,
+    process_acquisition,
+)
+
+SRATE = 30.72e6
+N_SAMPLES = 4096
+
+
+def streamed_job() -> ProcessingJob:
+    """Returns a job with the buffers of a streamed acquisition."""
+    rng = np.random.default_rng(0)
+    tdx = 1 / (SRATE * 1e-6) * np.arange(N_SAMPLES)
+    tdy = rng.normal(size=N_SAMPLES) + 1j * rng.normal(size=N_SAMPLES)
+    return ProcessingJob("streamed", 83.56e6, buffers=(tdx, tdy), frequency_shift=5e6, if_frequency=5e6)
+
+
+def file_job(path) -> ProcessingJob:
+    """Returns a job that reads and resamples an acquisition file written like the LimeDriver does."""
+    h5py = pytest.importorskip("h5py")
+    rng = np.random.default_rng(1)
+    with h5py.File(path, "w") as file:
+        dataset = file.create_dataset("0", data=rng.integers(-2000, 2000, (2, 2 * N_SAMPLES), dtype=np.int16))
+        dataset.attrs["-sra SampleRate [Hz]"] = np.float32(SRATE)
+    return ProcessingJob(
+        "archived",
+        83.56e6,
+        path=str(path),
+        rx_begin=10.0,
+        rx_stop=120.0,
+        scale=2,
+        if_frequency=5e6,
+        dwell_time=1.0,
+        srate=SRATE,
+        archive_path=str(path),
+    )
+
+
+def test_pool_processes_without_gui(gui_packages, tmp_path):
+    """Checks that the spawned pool processes acquisitions while the GUI packages cannot be imported."""
+    jobs = [streamed_job(), file_job(tmp_path / "acquisition.h5")]
+    pool = ProcessingPool(max_workers=2)
+    try:
+        pooled = [pool.submit(job).result(timeout=120) for job in jobs]
+    finally:
+        pool.shutdown()
+
+    for job, (measurement_data, _) in zip(jobs, pooled):
+        inline, _ = process_acquisition(job)
+        assert isinstance(measurement_data, MeasurementResult)
+        np.testing.assert_array_equal(measurement_data.tdx, inline.tdx)
+        np.testing.assert_array_equal(measurement_data.tdy, inline.tdy)
+        assert measurement_data.name == job.name
+        assert measurement_data.IF_frequency == job.if_frequency
+        assert measurement_data.archive_path == job.archive_path
+
+
+def test_result_has_measurement_fields(tmp_path):
+    """Checks the fields of a processed and resampled acquisition."""
+    job = file_job(tmp_path / "acquisition.h5")
+
+    measurement_data, _ = process_acquisition(job)
+
+    assert measurement_data.target_frequency == job.target_frequency
+    assert len(measurement_data.tdx) == len(measurement_data.tdy)
+    np.testing.assert_allclose(np.diff(measurement_data.tdx), job.dwell_time, rtol=1e-2)
+    assert measurement_data.tdx[0] == 0
+    assert measurement_data.profile is None
+    assert measurement_data.snr is None
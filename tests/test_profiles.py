@@ -0,0 +1,130 @@
+"""Tests of the keys of the settings profiles and of loading them."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from nqrduck_spectrometer_limenqr.headless import HeadlessModel
+from nqrduck_spectrometer_limenqr.profiles import LOCAL_SETTINGS, SettingsProfile
+from nqrduck_spectrometer_limenqr.settings import LimeNQRSettings
+
+DEFAULT_PROFILE = """
+import json
+from nqrduck_spectrometer_limenqr.headless import HeadlessModel
+from nqrduck_spectrometer_limenqr.profiles import SettingsProfile
+profile = SettingsProfile("default")
+print(json.dumps([profile.key, profile.values["Archive directory"]]))
+"""
+
+LOCAL_VALUES = {
+    LimeNQRSettings.DRIVER_BACKEND: LimeNQRSettings.SIMULATOR,
+    LimeNQRSettings.ACQUISITION_STORAGE: LimeNQRSettings.OPTIONS[LimeNQRSettings.ACQUISITION_STORAGE][-1],
+    LimeNQRSettings.RAW_ARCHIVE: LimeNQRSettings.OPTIONS[LimeNQRSettings.RAW_ARCHIVE][-1],
+    LimeNQRSettings.ARCHIVE_DIRECTORY: "/data/other/limenqr_archive",
+    LimeNQRSettings.PROFILING: LimeNQRSettings.OPTIONS[LimeNQRSettings.PROFILING][-1],
+    LimeNQRSettings.POST_PROCESSING: LimeNQRSettings.OPTIONS[LimeNQRSettings.POST_PROCESSING][-1],
+}
+
+
+def test_local_values_differ_from_defaults():
+    """Checks that the test changes every local setting."""
+    assert set(LOCAL_VALUES) == set(LOCAL_SETTINGS)
+    for name, value in LOCAL_VALUES.items():
+        assert value != LimeNQRSettings.DEFAULTS[name], name
+
+
+@pytest.mark.parametrize("name", LOCAL_SETTINGS)
+def test_key_ignores_local_setting(name):
+    """Checks that a setting of the local machine changes the values but not the key."""
+    profile = SettingsProfile("profile", {LimeNQRSettings.RX_GAIN: 40})
+    local = SettingsProfile("profile", {LimeNQRSettings.RX_GAIN: 40, name: LOCAL_VALUES[name]})
+
+    assert local.key == profile.key
+    assert local.differences(profile) == {name: LOCAL_VALUES[name]}
+    assert local != profile
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        (LimeNQRSettings.RX_GAIN, 40),
+        (LimeNQRSettings.RX_DWELL_TIME, "1u"),
+        (LimeNQRSettings.RESAMPLING_ENGINE, LimeNQRSettings.OPTIONS[LimeNQRSettings.RESAMPLING_ENGINE][-1]),
+        (LimeNQRSettings.FFT_SHIFT, True),
+    ],
+)
+def test_key_covers_acquisition_and_processing(name, value):
+    """Checks that the acquisition and processing settings change the key."""
+    assert SettingsProfile("profile", {name: value}).key != SettingsProfile("profile").key
+
+
+def test_key_is_independent_of_home(tmp_path):
+    """Checks that the default profile has the same key with different home directories."""
+    results = []
+    for home in ("first", "second"):
+        (tmp_path / home).mkdir()
+        result = subprocess.run(
+            [sys.executable, "-c", DEFAULT_PROFILE],
+            capture_output=True,
+            text=True,
+            env={"HOME": str(tmp_path / home), "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        assert result.returncode == 0, result.stderr
+        results.append(json.loads(result.stdout))
+
+    (first_key, first_directory), (second_key, second_directory) = results
+    assert first_directory != second_directory
+    assert first_key == second_key
+
+
+class RecordingModel(HeadlessModel):
+    """A headless model that records the change notifications and the loaded profiles."""
+
+    def __init__(self, settings: dict = None) -> None:
+        """Initializes the RecordingModel."""
+        self.events = []
+        super().__init__(settings)
+        self.take_changed_settings()
+        self.events.clear()
+
+    def mark_setting_changed(self, name: str) -> None:
+        """Records the notification with the values of the settings at that time."""
+        self.events.append(("changed", name, self.to_dict() if hasattr(self, "settings") else None))
+        super().mark_setting_changed(name)
+
+    def on_profile_loaded(self, name: str, changed: set) -> None:
+        """Records the loaded profile."""
+        self.events.append(("profile_loaded", name, changed))
+
+
+def test_load_profile_notifies_once_after_all_values():
+    """Checks that loading a profile sets all values before any notification and reports the profile once."""
+    model = RecordingModel()
+    profile = SettingsProfile(
+        "channel 1",
+        {LimeNQRSettings.CHANNEL: "1", LimeNQRSettings.RX_GAIN: 50, LimeNQRSettings.GATE_SHIFT: 60},
+    )
+
+    changed = model.load_profile(profile)
+
+    assert changed == {LimeNQRSettings.CHANNEL, LimeNQRSettings.RX_GAIN, LimeNQRSettings.GATE_SHIFT}
+    assert model.events[-1] == ("profile_loaded", "channel 1", changed)
+    assert [event[0] for event in model.events].count("profile_loaded") == 1
+    for kind, name, values in model.events[:-1]:
+        assert kind == "changed"
+        assert values == profile.values, name
+    assert model.take_changed_settings() == changed
+
+
+def test_load_profile_keeps_notifications_of_settings():
+    """Checks that the settings notify again after a profile has been loaded."""
+    model = RecordingModel()
+    model.load_profile(SettingsProfile("gain", {LimeNQRSettings.RX_GAIN: 50}))
+    model.events.clear()
+
+    model.get_setting_by_name(LimeNQRSettings.RX_GAIN).value = 40
+
+    assert [event[:2] for event in model.events] == [("changed", LimeNQRSettings.RX_GAIN)]
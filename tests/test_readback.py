@@ -0,0 +1,141 @@
+"""Tests of the RX window selection against the boolean mask selection of the full time axis."""
+
+import numpy as np
+import pytest
+
+from nqrduck_spectrometer_limenqr.readback import AcquisitionReader, TimeAxis
+
+# The driver stores the sampling rate as float32, the conversion to MHz is done like in limedriver.hdf_reader
+SAMPLING_RATES = (np.float32(30.72e6) * 1e-6, np.float32(15.36e6) * 1e-6, 30.72e6 * 1e-6, 7.0)
+N_SAMPLES = (1, 2, 16, 4097)
+
+
+def select_with_mask(tdx: np.ndarray, rx_begin: float, rx_stop: float) -> np.ndarray:
+    """The selection that was used before the closed form window."""
+    return np.where((tdx > rx_begin) & (tdx < rx_stop))[0]
+
+
+def select_with_window(axis: TimeAxis, rx_begin: float, rx_stop: float) -> slice:
+    """The closed form selection of AcquisitionReader.find_window."""
+    start = axis.index_after(rx_begin)
+    return slice(start, max(axis.index_from(rx_stop), start))
+
+
+def boundary_times(tdx: np.ndarray) -> list:
+    """The sample times and their neighbouring floats at the first, a middle and the last sample."""
+    times = []
+    for index in sorted({0, len(tdx) // 2, len(tdx) - 1}):
+        time = float(tdx[index])
+        times += [time, float(np.nextafter(time, -np.inf)), float(np.nextafter(time, np.inf))]
+    return times + [-1.0, float(tdx[-1]) + 1.0]
+
+
+@pytest.mark.parametrize("srate_mhz", SAMPLING_RATES)
+@pytest.mark.parametrize("n_samples", N_SAMPLES)
+def test_time_axis_values(srate_mhz, n_samples):
+    """Checks that the time axis has the values of the full time axis."""
+    axis = TimeAxis(srate_mhz, n_samples)
+
+    np.testing.assert_array_equal(axis.values(0, n_samples), 1 / srate_mhz * np.arange(n_samples))
+    assert axis[n_samples - 1] == axis.values(0, n_samples)[-1]
+
+
+@pytest.mark.parametrize("srate_mhz", SAMPLING_RATES)
+@pytest.mark.parametrize("n_samples", N_SAMPLES)
+def test_indices_match_comparisons(srate_mhz, n_samples):
+    """Checks the sample indices against the comparisons with the full time axis."""
+    axis = TimeAxis(srate_mhz, n_samples)
+    tdx = axis.values(0, n_samples)
+
+    for time in boundary_times(tdx):
+        assert axis.index_after(time) == np.count_nonzero(tdx <= time), time
+        assert axis.index_from(time) == np.count_nonzero(tdx < time), time
+
+
+@pytest.mark.parametrize("srate_mhz", SAMPLING_RATES)
+@pytest.mark.parametrize("n_samples", N_SAMPLES)
+def test_window_matches_mask_at_boundaries(srate_mhz, n_samples):
+    """Checks the window against the mask for boundaries at and next to the samples."""
+    axis = TimeAxis(srate_mhz, n_samples)
+    tdx = axis.values(0, n_samples)
+    times = boundary_times(tdx)
+
+    for rx_begin in times:
+        for rx_stop in times:
+            window = select_with_window(axis, rx_begin, rx_stop)
+            np.testing.assert_array_equal(
+                np.arange(n_samples)[window],
+                select_with_mask(tdx, rx_begin, rx_stop),
+                err_msg=f"{rx_begin} to {rx_stop} µs",
+            )
+
+
+def test_window_matches_mask_for_random_windows():
+    """Checks the window against the mask for random windows of a long acquisition."""
+    rng = np.random.default_rng(0)
+    axis = TimeAxis(np.float32(30.72e6) * 1e-6, 100_003)
+    tdx = axis.values(0, len(axis))
+
+    for index in rng.integers(0, len(tdx), 200):
+        stop_index = min(index + rng.integers(0, 1000), len(tdx) - 1)
+        for rx_begin in (tdx[index], np.nextafter(tdx[index], np.inf), tdx[index] - 1e-3):
+            for rx_stop in (tdx[stop_index], np.nextafter(tdx[stop_index], -np.inf), tdx[stop_index] + 1e-3):
+                window = select_with_window(axis, float(rx_begin), float(rx_stop))
+                np.testing.assert_array_equal(
+                    np.arange(len(tdx))[window], select_with_mask(tdx, rx_begin, rx_stop)
+                )
+
+
+@pytest.mark.parametrize(
+    "rx_begin, rx_stop",
+    [
+        # Exact sample times are excluded on both sides
+        (0.0, 0.0),
+        (5.0, 5.0),
+        # Reversed windows
+        (10.0, 3.0),
+        # Before and after the acquisition
+        (-10.0, -1.0),
+        (1e6, 2e6),
+    ],
+)
+def test_empty_windows(rx_begin, rx_stop):
+    """Checks that windows without samples are empty."""
+    axis = TimeAxis(1.0, 100)
+
+    window = select_with_window(axis, rx_begin, rx_stop)
+
+    assert window.stop - window.start == 0
+    assert select_with_mask(axis.values(0, 100), rx_begin, rx_stop).size == 0
+
+
+def test_first_and_last_sample():
+    """Checks the windows that contain only the first or the last sample."""
+    axis = TimeAxis(1.0, 100)
+
+    # The first sample is at 0 µs and the last one at 99 µs
+    assert select_with_window(axis, -1.0, 0.5) == slice(0, 1)
+    assert select_with_window(axis, 0.0, 0.5) == slice(1, 1)
+    assert select_with_window(axis, 98.5, 100.0) == slice(99, 100)
+    assert select_with_window(axis, 98.5, 99.0) == slice(99, 99)
+    assert select_with_window(axis, -1.0, 100.0) == slice(0, 100)
+
+
+def test_reader_find_window(tmp_path):
+    """Checks the window of the reader against the mask for an acquisition file."""
+    h5py = pytest.importorskip("h5py")
+    srate = np.float32(30.72e6)
+    n_samples = 4097
+    path = tmp_path / "acquisition.h5"
+    with h5py.File(path, "w") as file:
+        dataset = file.create_dataset("0", data=np.zeros((2, 2 * n_samples), dtype=np.int16))
+        dataset.attrs["-sra SampleRate [Hz]"] = srate
+    tdx = 1 / (srate * 1e-6) * np.arange(n_samples)
+
+    with AcquisitionReader(path) as reader:
+        for rx_begin in boundary_times(tdx):
+            for rx_stop in boundary_times(tdx):
+                np.testing.assert_array_equal(
+                    np.arange(n_samples)[reader.find_window(rx_begin, rx_stop)],
+                    select_with_mask(tdx, rx_begin, rx_stop),
+                )
@@ -0,0 +1,419 @@
+"""Tests of the LimeSession and of the driver messages of the MeasurementWorker with the mock driver."""
+
+import pytest
+
+from fakes import INIT_ATTRIBUTES, MockLimeConfig
+from nqrduck_spectrometer_limenqr import session as session_module
+from nqrduck_spectrometer_limenqr.session import DEVICE_ATTRIBUTES, ENFORCE_INIT, SKIP_INIT, LimeSession
+from nqrduck_spectrometer_limenqr.worker import (
+    LIME_CONFIG_ATTRIBUTES,
+    MeasurementWorker,
+    serve_driver,
+    snapshot_lime_config,
+)
+
+N_PULSES = 4
+
+
+@pytest.fixture(autouse=True)
+def instant_driver(monkeypatch):
+    """The mock driver runs without waiting on a device that was not initialized yet."""
+    monkeypatch.setattr(MockLimeConfig, "init_time", 0)
+    monkeypatch.setattr(MockLimeConfig, "run_time", 0)
+    monkeypatch.setattr(MockLimeConfig, "device", None)
+
+
+def changed_value(lime, name):
+    """Returns a value that differs from the value of an attribute."""
+    value = getattr(lime, name)
+    if isinstance(value, list):
+        return [element + 1 for element in value]
+    if isinstance(value, str):
+        return value + "_changed"
+    return value + 1
+
+
+class FakeConnection:
+    """The worker side of the pipe to the driver process, it records the messages and answers them.
+
+    Args:
+        replies (list): The answers to the messages, None lets the process exit without an answer
+    """
+
+    def __init__(self, replies: list) -> None:
+        """Initializes the FakeConnection."""
+        self.replies = list(replies)
+        self.messages = []
+        self.process = FakeProcess()
+
+    def send(self, message) -> None:
+        """Records a message."""
+        self.messages.append(message)
+
+    def poll(self, timeout: float) -> bool:
+        """An answer is available unless the process was terminated."""
+        if self.replies[0] is None:
+            self.replies.pop(0)
+            self.process.alive = False
+            return False
+        return True
+
+    def recv(self):
+        """Returns the next answer."""
+        return self.replies.pop(0)
+
+
+class FakeProcess:
+    """A driver process that is alive until it is terminated."""
+
+    def __init__(self) -> None:
+        """Initializes the FakeProcess."""
+        self.alive = True
+        self.exitcode = None
+
+    def is_alive(self) -> bool:
+        """Whether the process is running."""
+        return self.alive
+
+
+@pytest.fixture
+def isolated_worker(monkeypatch):
+    """Returns a function that creates a worker whose driver process is replaced by a FakeConnection."""
+    workers = []
+
+    def create(replies: list) -> tuple:
+        worker = MeasurementWorker(None)
+        connection = FakeConnection(replies)
+
+        def start_driver_process(driver_class):
+            # The session is not reset when the process is replaced, so the tests see the resets of run_driver
+            if not connection.process.alive:
+                connection.process = FakeProcess()
+            return connection, connection.process
+
+        monkeypatch.setattr(worker, "_start_driver_process", start_driver_process)
+        monkeypatch.setattr(worker, "_stop_driver_process", lambda: None)
+        workers.append(worker)
+        return worker, connection
+
+    yield create
+    for worker in workers:
+        worker.shutdown()
+
+
+def test_first_run_initializes():
+    """Checks that the first run of a session initializes the device."""
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+
+    assert session.prepare(lime)
+    assert lime.override_init == ENFORCE_INIT
+
+
+def test_unchanged_device_settings_skip_initialization():
+    """Checks that runs with the same device settings skip the initialization."""
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+    session.prepare(lime)
+    session.commit(lime)
+
+    # Attributes that are not device settings do not initialize the device
+    lime.averages = 100
+    lime.p_frq = [1e6] * N_PULSES
+    lime.file_pattern = "next"
+
+    assert not session.prepare(lime)
+    assert lime.override_init == SKIP_INIT
+
+
+@pytest.mark.parametrize("name", DEVICE_ATTRIBUTES)
+def test_changed_device_setting_enforces_initialization(name):
+    """Checks that a changed device setting enforces the initialization."""
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+    session.prepare(lime)
+    session.commit(lime)
+
+    setattr(lime, name, changed_value(lime, name))
+
+    assert session.prepare(lime)
+    assert lime.override_init == ENFORCE_INIT
+
+
+def test_commit_counts_runs_and_initializations():
+    """Checks the counts of the runs and the initializations."""
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+    for gain in (50, 50, 55, 55):
+        lime.RX_gain = gain
+        session.prepare(lime)
+        lime.run()
+        session.commit(lime)
+
+    assert lime.runs == [ENFORCE_INIT, SKIP_INIT, ENFORCE_INIT, SKIP_INIT]
+    assert session.init_count == 2
+    assert session.run_count == 4
+
+
+def run_session(session: LimeSession, lime) -> None:
+    """Runs a configuration like the worker on the acquisition thread."""
+    session.prepare(lime)
+    lime.run()
+    session.commit(lime)
+
+
+def test_device_attributes_are_written_only_by_initialization():
+    """Checks that the session initializes for the attributes that the driver only writes during the initialization."""
+    assert set(DEVICE_ATTRIBUTES) == set(INIT_ATTRIBUTES)
+
+
+@pytest.mark.parametrize("name", INIT_ATTRIBUTES)
+def test_changed_device_setting_reaches_device(name):
+    """Checks that a changed device setting is written to the device by the run after it."""
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+    run_session(session, lime)
+
+    value = changed_value(lime, name)
+    setattr(lime, name, value)
+    run_session(session, lime)
+
+    assert lime.acquisitions[-1][name] == value
+
+
+def test_frequency_sweep_acquires_at_every_frequency():
+    """Checks that every point of a frequency sweep is acquired at its LO frequency."""
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+    frequencies = [78e6, 78.5e6, 79e6, 79.5e6]
+
+    for frequency in frequencies:
+        lime.frq = frequency
+        run_session(session, lime)
+
+    assert [device["frq"] for device in lime.acquisitions] == frequencies
+    assert session.init_count == len(frequencies)
+
+
+def test_skipped_initialization_keeps_previous_frequency(monkeypatch):
+    """Checks that the driver keeps the LO frequency of the last initialization if frq would not initialize."""
+    monkeypatch.setattr(session_module, "DEVICE_ATTRIBUTES", tuple(name for name in DEVICE_ATTRIBUTES if name != "frq"))
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+
+    for frequency in (78e6, 79e6):
+        lime.frq = frequency
+        run_session(session, lime)
+
+    assert [device["frq"] for device in lime.acquisitions] == [78e6, 78e6]
+
+
+def test_pulse_and_timing_sweeps_keep_session():
+    """Checks that nutation and relaxation sweeps only initialize the device for the first point."""
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+
+    for duration in (2e-6, 4e-6, 6e-6):
+        lime.p_dur = [duration] * N_PULSES
+        run_session(session, lime)
+    for reptime in (1e-3, 1e-2, 1e-1):
+        lime.reptime_secs = reptime
+        lime.averages = 4
+        run_session(session, lime)
+
+    assert lime.runs == [ENFORCE_INIT] + [SKIP_INIT] * 5
+    assert session.init_count == 1
+
+
+def test_prepare_without_commit_keeps_initializing():
+    """Checks that a run that was not committed does not change the session."""
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+    session.prepare(lime)
+
+    assert session.prepare(lime)
+    assert session.init_count == 0
+
+
+def test_changes_contain_only_changed_attributes():
+    """Checks that only the changed attributes are sent after the first configuration."""
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+    first = session.changes(snapshot_lime_config(lime), N_PULSES)
+
+    lime.TX_gain = 20
+    lime.averages = 10
+    second = session.changes(snapshot_lime_config(lime), N_PULSES)
+    third = session.changes(snapshot_lime_config(lime), N_PULSES)
+
+    assert set(first) == set(LIME_CONFIG_ATTRIBUTES)
+    assert second == {"TX_gain": 20, "averages": 10}
+    assert third == {}
+
+
+def test_changed_number_of_pulses_sends_everything():
+    """Checks that a new number of pulses sends the complete configuration."""
+    session = LimeSession()
+    session.changes(snapshot_lime_config(MockLimeConfig(N_PULSES)), N_PULSES)
+
+    changes = session.changes(snapshot_lime_config(MockLimeConfig(N_PULSES + 1)), N_PULSES + 1)
+
+    assert set(changes) == set(LIME_CONFIG_ATTRIBUTES)
+
+
+def test_reset_enforces_initialization_and_full_configuration():
+    """Checks that a reset session initializes and sends the complete configuration."""
+    session = LimeSession()
+    lime = MockLimeConfig(N_PULSES)
+    session.prepare(lime)
+    session.changes(snapshot_lime_config(lime), N_PULSES)
+    session.commit(lime)
+
+    session.reset()
+
+    assert session.prepare(lime)
+    assert set(session.changes(snapshot_lime_config(lime), N_PULSES)) == set(LIME_CONFIG_ATTRIBUTES)
+
+
+def test_driver_process_receives_only_changes(isolated_worker):
+    """Checks the messages that the worker sends to the driver process."""
+    worker, connection = isolated_worker([True, True, True])
+    lime = MockLimeConfig(N_PULSES)
+
+    assert worker.run_driver(lime)
+    assert worker.run_driver(lime)
+    lime.RX_gain = 40
+    assert worker.run_driver(lime)
+
+    (pulses, first), (_, second), (_, third) = connection.messages
+    assert pulses == N_PULSES
+    assert set(first) == set(LIME_CONFIG_ATTRIBUTES)
+    assert first["override_init"] == ENFORCE_INIT
+    assert second == {"override_init": SKIP_INIT}
+    assert third == {"RX_gain": 40, "override_init": ENFORCE_INIT}
+    assert worker.session.init_count == 2
+    assert worker.session.run_count == 3
+
+
+def test_failed_driver_run_resets_session(isolated_worker):
+    """Checks that a failed run in the driver process resets the session."""
+    worker, connection = isolated_worker([True, False, True])
+    lime = MockLimeConfig(N_PULSES)
+
+    assert worker.run_driver(lime)
+    assert not worker.run_driver(lime)
+    assert worker.run_driver(lime)
+
+    _, failed, retried = (changes for _, changes in connection.messages)
+    assert failed == {"override_init": SKIP_INIT}
+    # The driver process dropped its configuration, so everything is sent again and the device is initialized
+    assert set(retried) == set(LIME_CONFIG_ATTRIBUTES)
+    assert retried["override_init"] == ENFORCE_INIT
+    assert worker.session.run_count == 2
+
+
+def test_terminated_driver_process_resets_session(isolated_worker):
+    """Checks that a terminated driver process resets the session."""
+    worker, connection = isolated_worker([True, None, True])
+    lime = MockLimeConfig(N_PULSES)
+
+    assert worker.run_driver(lime)
+    assert not worker.run_driver(lime)
+    assert worker.run_driver(lime)
+
+    retried = connection.messages[-1][1]
+    assert set(retried) == set(LIME_CONFIG_ATTRIBUTES)
+    assert retried["override_init"] == ENFORCE_INIT
+
+
+def test_failed_run_in_process_resets_session(monkeypatch):
+    """Checks that a failed run on the acquisition thread resets the session."""
+    worker = MeasurementWorker(None, isolate_driver=False)
+    lime = MockLimeConfig(N_PULSES)
+    try:
+        assert worker.run_driver(lime)
+        monkeypatch.setattr(MockLimeConfig, "fail", True)
+        with pytest.raises(RuntimeError):
+            worker.run_driver(lime)
+        monkeypatch.setattr(MockLimeConfig, "fail", False)
+        assert worker.run_driver(lime)
+    finally:
+        worker.shutdown()
+
+    assert lime.runs == [ENFORCE_INIT, ENFORCE_INIT]
+    assert worker.session.init_count == 2
+
+
+class PipeEnd:
+    """The driver side of the pipe, it replays messages and records the answers."""
+
+    def __init__(self, messages: list) -> None:
+        """Initializes the PipeEnd."""
+        self.messages = list(messages)
+        self.answers = []
+
+    def recv(self):
+        """Returns the next message."""
+        return self.messages.pop(0)
+
+    def send(self, answer) -> None:
+        """Records an answer."""
+        self.answers.append(answer)
+
+
+def test_serve_driver_applies_changes_to_kept_configuration():
+    """Checks that the driver process applies the changes to the configuration it keeps."""
+    configurations = []
+
+    class RecordingConfig(MockLimeConfig):
+        def __init__(self, Npulses: int) -> None:
+            super().__init__(Npulses)
+            configurations.append(self)
+
+    lime = MockLimeConfig(N_PULSES)
+    full = snapshot_lime_config(lime)
+    connection = PipeEnd(
+        [
+            (N_PULSES, full),
+            (N_PULSES, {"RX_gain": 40, "override_init": SKIP_INIT}),
+            (N_PULSES + 1, {"averages": 5}),
+            None,
+        ]
+    )
+
+    serve_driver(RecordingConfig, connection)
+
+    assert connection.answers == [True, True, True]
+    assert len(configurations) == 2
+    kept = configurations[0]
+    assert kept.RX_gain == 40
+    assert kept.runs == [full["override_init"], SKIP_INIT]
+    assert configurations[1].averages == 5
+
+
+def test_serve_driver_drops_configuration_after_failure():
+    """Checks that the driver process creates a new configuration after a failed run."""
+    configurations = []
+
+    class FailingConfig(MockLimeConfig):
+        def __init__(self, Npulses: int) -> None:
+            super().__init__(Npulses)
+            configurations.append(self)
+
+        def run(self) -> int:
+            if self.averages < 0:
+                raise RuntimeError("Simulated driver error")
+            return super().run()
+
+    connection = PipeEnd(
+        [
+            (N_PULSES, {"averages": -1}),
+            (N_PULSES, {"averages": 1}),
+            None,
+        ]
+    )
+
+    serve_driver(FailingConfig, connection)
+
+    assert connection.answers == [False, True]
+    assert len(configurations) == 2